@@ -4,4 +4,21 @@ __all__ = [
     "scanner",
     "database",
     "ui",
+    "asyncscan",
+    "synscan",
+    "rawsyn",
+    "timing",
+    "ratelimit",
+    "services",
+    "portspec",
+    "targets",
+    "discovery",
+    "sharding",
+    "resolver",
+    "topports",
+    "checkpoint",
+    "bench",
+    "profiling",
+    "writer",
+    "retention",
 ]
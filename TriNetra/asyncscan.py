@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import asyncio
+import socket
+import threading
+import time
+from typing import Callable, Dict, Iterable, Sequence, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from .scanner import _classify_errno, _is_rtt_sample, _normalize_timeout, address_family
+from .ratelimit import RateLimiter
+from .timing import RttEstimator
+
+# File descriptors kept free for the interpreter, logging, the DB, etc.
+_FD_RESERVE = 64
+
+
+def _max_concurrency(requested: int) -> int:
+    """Clamp the number of in-flight connects to what RLIMIT_NOFILE allows."""
+    concurrency = max(1, int(requested))
+    if resource is None:
+        return concurrency
+
+    try:
+        soft_limit, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    except (OSError, ValueError):
+        return concurrency
+
+    if soft_limit == resource.RLIM_INFINITY:
+        return concurrency
+    return max(1, min(concurrency, soft_limit - _FD_RESERVE))
+
+
+async def _async_probe_once(
+    ip_address: str,
+    port: int,
+    timeout: float,
+    keep_open: bool = False,
+) -> Tuple[str, socket.socket | None]:
+    """Connect once; with ``keep_open`` an OPEN port's socket is returned, not closed."""
+    loop = asyncio.get_running_loop()
+    sock = None
+    status = "ERROR"
+    try:
+        # Running out of descriptors or buffers (EMFILE, ENOBUFS) is a local
+        # failure: it makes this probe an ERROR instead of aborting gather().
+        try:
+            sock = socket.socket(address_family(ip_address), socket.SOCK_STREAM)
+            sock.setblocking(False)
+        except OSError:
+            return "ERROR", None
+        await asyncio.wait_for(loop.sock_connect(sock, (ip_address, port)), timeout)
+        status = "OPEN"
+    except asyncio.TimeoutError:
+        status = "FILTERED"
+    except ConnectionRefusedError:
+        status = "CLOSED"
+    except OSError as error:
+        status = _classify_errno(getattr(error, "errno", None))
+    except Exception:
+        status = "ERROR"
+    finally:
+        if sock is not None and not (keep_open and status == "OPEN"):
+            sock.close()
+    return status, sock if keep_open and status == "OPEN" else None
+
+
+async def _async_probe_port(
+    ip_address: str,
+    port: int,
+    timeout: float,
+    rtt: RttEstimator | None,
+    limiter: RateLimiter | None,
+    keep_open: bool = False,
+) -> Tuple[str, socket.socket | None]:
+    if limiter is not None:
+        await limiter.acquire_async()
+    attempt_timeout = rtt.timeout() if rtt is not None else timeout
+    started = time.monotonic()
+    status, sock = await _async_probe_once(ip_address, port, attempt_timeout, keep_open)
+    if rtt is not None and _is_rtt_sample(status):
+        rtt.update(time.monotonic() - started)
+    if limiter is not None:
+        limiter.record(status)
+    return status, sock
+
+
+async def _async_probe_all(
+    items: Iterable[Tuple[str, int]],
+    timeout: float,
+    concurrency: int,
+    rtt_for: Callable[[str], RttEstimator | None],
+    limiter: RateLimiter | None,
+    on_result: Callable[..., None],
+    stop: threading.Event | None,
+    keep_open: bool = False,
+) -> None:
+    item_iter = iter(items)
+
+    # A fixed set of workers pulls from one iterator, so memory stays flat
+    # however many probes there are (no task per port).
+    async def worker() -> None:
+        for host, port in item_iter:
+            if stop is not None and stop.is_set():
+                return
+            status, sock = await _async_probe_port(host, port, timeout, rtt_for(host), limiter, keep_open)
+            if keep_open:
+                on_result(host, port, status, sock)
+            else:
+                on_result(host, port, status)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+def async_probe_targets(
+    items: Iterable[Tuple[str, int]],
+    count: int,
+    timeout: float = 0.8,
+    concurrency: int = 1000,
+    rtt_for: Callable[[str], RttEstimator | None] | None = None,
+    limiter: RateLimiter | None = None,
+    on_result: Callable[..., None] | None = None,
+    stop: threading.Event | None = None,
+    keep_open: bool = False,
+) -> None:
+    """Probe ``count`` (host, port) items once each on one event loop.
+
+    The multi-host form of async_probe_ports(): items are consumed in the
+    order given, ``rtt_for(host)`` picks each host's RTT estimator, and
+    ``on_result(host, port, status)`` fires as each probe finishes. With
+    ``keep_open`` it is called as ``on_result(host, port, status, sock)``
+    instead, where ``sock`` is the still-connected (non-blocking) socket of
+    an OPEN port, or None; the callback then owns and must close it.
+    """
+    if count <= 0:
+        return
+
+    effective_timeout = _normalize_timeout(timeout)
+    in_flight = _max_concurrency(min(int(concurrency), count))
+    asyncio.run(
+        _async_probe_all(
+            items,
+            effective_timeout,
+            in_flight,
+            rtt_for or (lambda host: None),
+            limiter,
+            on_result or (lambda *result: None),
+            stop,
+            keep_open,
+        )
+    )
+
+
+def async_probe_ports(
+    ip_address: str,
+    ports: Sequence[int],
+    timeout: float = 0.8,
+    concurrency: int = 1000,
+    rtt: RttEstimator | None = None,
+    limiter: RateLimiter | None = None,
+    on_result: Callable[[int, str], None] | None = None,
+    stop: threading.Event | None = None,
+) -> Dict[int, str]:
+    """Probe each port once with non-blocking sockets on one event loop.
+
+    Up to ``concurrency`` connects are in flight at once (clamped to the
+    process file-descriptor limit). Returns {port: status}, classified
+    exactly like check_port(). With ``on_result(port, status)`` each result
+    is handed over as its probe finishes instead and the returned dict
+    stays empty, so memory does not grow with the port count. No new probe
+    starts once ``stop`` is set. An ``rtt`` estimator makes probe timeouts
+    adaptive and a ``limiter`` paces connects, as in check_port(). Retries
+    and service detection are left to scan_ports_iter().
+    """
+    statuses: Dict[int, str] = {}
+
+    def record(host: str, port: int, status: str) -> None:
+        if on_result is not None:
+            on_result(port, status)
+        else:
+            statuses[port] = status
+
+    async_probe_targets(
+        ((ip_address, port) for port in ports),
+        len(ports),
+        timeout,
+        concurrency,
+        lambda host: rtt,
+        limiter,
+        record,
+        stop,
+    )
+    return statuses
@@ -0,0 +1,387 @@
+"""Loopback benchmark for the scan engines.
+
+    python -m TriNetra.bench --open 20 --closed 2000 --filtered 20
+
+Starts a fixture on 127.0.0.1 with three kinds of ports and scans it with
+every engine through both scan_ports() (the library path) and
+perform_scan() (the CLI path, including Rich rendering, sent to
+/dev/null):
+
+* open: listeners that accept, send an SSH-style banner and close;
+* closed: unused ports below the ephemeral range, answered with a RST;
+* filtered: listeners with a full accept queue that are never accepted
+  from, so the kernel silently drops further SYNs (no iptables needed).
+
+Each run reports ports/sec, p50/p99 latency of answered probes, peak
+threads, open file descriptors and RSS, and how many ports came back in
+an unexpected state. ``--json`` writes the same numbers to a file, so
+runs can be compared across commits.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import selectors
+import socket
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Sequence
+
+from .cli import perform_scan
+from .scanner import _RAW_SOCKETS_AVAILABLE, _SCAPY_AVAILABLE, _normalize_timeout, is_root, scan_ports
+from .targets import ScanTarget
+from .timing import RttEstimator
+from .ui import console, print_benchmark, print_error
+
+BENCH_HOST = "127.0.0.1"
+BENCH_BANNER = b"SSH-2.0-OpenSSH_9.6 TriNetraBench\r\n"
+
+# Closed ports come from below the usual ephemeral range (32768+), so the
+# scanner's own source ports never collide with them.
+_CLOSED_PORT_START = 20000
+_CLOSED_PORT_END = 32767
+
+BENCH_TARGETS = ("scan_ports", "perform_scan")
+
+
+class BenchResult(NamedTuple):
+    target: str
+    engine: str
+    ports: int
+    seconds: float
+    ports_per_second: float
+    p50_ms: float | None
+    p99_ms: float | None
+    latency_samples: int
+    peak_threads: int
+    peak_fds: int | None
+    peak_rss_mb: float | None
+    mismatches: int
+
+
+class LoopbackFixture:
+    """Open, closed and filtered ports on 127.0.0.1; use as a context manager."""
+
+    def __init__(self, open_count: int = 20, closed_count: int = 2000, filtered_count: int = 20) -> None:
+        self.open_count = max(0, int(open_count))
+        self.closed_count = max(0, int(closed_count))
+        self.filtered_count = max(0, int(filtered_count))
+        self.expected: Dict[int, str] = {}
+        self._sockets: List[socket.socket] = []
+        self._selector = selectors.DefaultSelector()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def ports(self) -> List[int]:
+        return sorted(self.expected)
+
+    def _listen(self, backlog: int) -> socket.socket:
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind((BENCH_HOST, 0))
+        listener.listen(backlog)
+        self._sockets.append(listener)
+        return listener
+
+    def _start_open(self) -> None:
+        for _ in range(self.open_count):
+            listener = self._listen(socket.SOMAXCONN)
+            listener.setblocking(False)
+            self._selector.register(listener, selectors.EVENT_READ)
+            self.expected[listener.getsockname()[1]] = "OPEN"
+
+    def _start_filtered(self) -> None:
+        for _ in range(self.filtered_count):
+            listener = self._listen(0)
+            port = listener.getsockname()[1]
+            # One queued connection fills a backlog-0 queue; the second
+            # makes sure of it. Later SYNs to this port are dropped.
+            for _ in range(2):
+                filler = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                filler.setblocking(False)
+                filler.connect_ex((BENCH_HOST, port))
+                self._sockets.append(filler)
+            self.expected[port] = "FILTERED"
+
+    def _pick_closed(self) -> None:
+        found = 0
+        for port in range(_CLOSED_PORT_START, _CLOSED_PORT_END + 1):
+            if found >= self.closed_count:
+                return
+            if port in self.expected:
+                continue
+            probe = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            try:
+                probe.bind((BENCH_HOST, port))
+            except OSError:
+                continue
+            finally:
+                probe.close()
+            self.expected[port] = "CLOSED"
+            found += 1
+        raise RuntimeError(f"Only found {found} free ports for the closed set.")
+
+    def _serve(self) -> None:
+        while not self._stop.is_set():
+            for key, _ in self._selector.select(timeout=0.1):
+                try:
+                    connection, _ = key.fileobj.accept()
+                except OSError:
+                    continue
+                try:
+                    connection.sendall(BENCH_BANNER)
+                except OSError:
+                    pass
+                connection.close()
+
+    def __enter__(self) -> "LoopbackFixture":
+        try:
+            self._start_open()
+            self._start_filtered()
+            self._pick_closed()
+        except BaseException:
+            self.close()
+            raise
+        self._thread = threading.Thread(target=self._serve, name="bench-fixture", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._selector.close()
+        for sock in self._sockets:
+            sock.close()
+        self._sockets.clear()
+
+
+class _LatencyRecorder(RttEstimator):
+    """Collects every RTT sample but keeps the timeout fixed, so timing stays comparable."""
+
+    def __init__(self, timeout: float) -> None:
+        super().__init__(_normalize_timeout(timeout))
+        self.values: List[float] = []
+
+    def update(self, rtt: float) -> None:
+        super().update(rtt)
+        self.values.append(rtt)
+
+    def timeout(self) -> float:
+        return self.initial_timeout
+
+
+def _fd_count() -> int | None:
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+def _rss_mb() -> float | None:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is the lifetime peak, in KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class _ResourceSampler:
+    """Polls thread count, open FDs and RSS in the background and keeps the peaks."""
+
+    def __init__(self, interval: float = 0.01) -> None:
+        self.interval = interval
+        self.peak_threads = 0
+        self.peak_fds: int | None = None
+        self.peak_rss_mb: float | None = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="bench-sampler", daemon=True)
+
+    def _sample(self) -> None:
+        # The sampler's own thread is not part of the scan.
+        self.peak_threads = max(self.peak_threads, threading.active_count() - 1)
+        fds = _fd_count()
+        if fds is not None:
+            self.peak_fds = fds if self.peak_fds is None else max(self.peak_fds, fds)
+        rss = _rss_mb()
+        if rss is not None:
+            self.peak_rss_mb = rss if self.peak_rss_mb is None else max(self.peak_rss_mb, rss)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self) -> "_ResourceSampler":
+        self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+def _percentile_ms(values: Sequence[float], fraction: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index] * 1000
+
+
+def _run_scan_ports(ports: Sequence[int], engine: str, timeout: float, recorder: _LatencyRecorder) -> Dict[int, str]:
+    return {port: status for port, _, status in scan_ports(BENCH_HOST, ports, timeout, engine=engine, rtt=recorder)}
+
+
+def _run_perform_scan(ports: Sequence[int], engine: str, timeout: float, recorder: _LatencyRecorder) -> Dict[int, str]:
+    saved_file = console.file
+    with open(os.devnull, "w") as sink:
+        console.file = sink
+        try:
+            rows = perform_scan(
+                [([ScanTarget(BENCH_HOST, BENCH_HOST)], ports)],
+                timeout,
+                rtt={BENCH_HOST: recorder},
+                engine=engine,
+            )
+        finally:
+            console.file = saved_file
+    return {port: status for _, port, _, _, status in rows}
+
+
+_RUNNERS: Dict[str, Callable[[Sequence[int], str, float, _LatencyRecorder], Dict[int, str]]] = {
+    "scan_ports": _run_scan_ports,
+    "perform_scan": _run_perform_scan,
+}
+
+
+def available_engines() -> List[str]:
+    """Engines that can run here: thread and async always, SYN engines with root."""
+    engines = ["thread", "async"]
+    if is_root() and _RAW_SOCKETS_AVAILABLE:
+        engines.append("rawsyn")
+    if is_root() and _SCAPY_AVAILABLE:
+        engines.append("syn")
+    return engines
+
+
+def run_benchmark(
+    fixture: LoopbackFixture,
+    target: str,
+    engine: str,
+    timeout: float = 0.3,
+) -> BenchResult:
+    """Scan every fixture port once through ``target`` with ``engine``."""
+    ports = fixture.ports
+    recorder = _LatencyRecorder(timeout)
+    with _ResourceSampler() as sampler:
+        started = time.perf_counter()
+        statuses = _RUNNERS[target](ports, engine, timeout, recorder)
+        seconds = time.perf_counter() - started
+
+    mismatches = sum(1 for port, expected in fixture.expected.items() if statuses.get(port) != expected)
+    return BenchResult(
+        target=target,
+        engine=engine,
+        ports=len(ports),
+        seconds=seconds,
+        ports_per_second=len(ports) / seconds if seconds > 0 else 0.0,
+        p50_ms=_percentile_ms(recorder.values, 0.50),
+        p99_ms=_percentile_ms(recorder.values, 0.99),
+        latency_samples=len(recorder.values),
+        peak_threads=sampler.peak_threads,
+        peak_fds=sampler.peak_fds,
+        peak_rss_mb=sampler.peak_rss_mb,
+        mismatches=mismatches,
+    )
+
+
+def _csv_choices(value: str, allowed: Sequence[str], what: str) -> List[str]:
+    chosen = [item.strip() for item in value.split(",") if item.strip()]
+    unknown = [item for item in chosen if item not in allowed]
+    if unknown or not chosen:
+        raise argparse.ArgumentTypeError(f"Unknown {what}: {', '.join(unknown) or value!r} (choose from {', '.join(allowed)})")
+    return chosen
+
+
+def build_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m TriNetra.bench",
+        description="Benchmark TriNetra's scan engines against a loopback fixture.",
+    )
+    parser.add_argument("--open", type=int, default=20, help="Open listeners (default: 20)")
+    parser.add_argument("--closed", type=int, default=2000, help="Closed ports (default: 2000)")
+    parser.add_argument("--filtered", type=int, default=20, help="Filtered ports: listeners that never accept (default: 20)")
+    parser.add_argument("--timeout", type=float, default=0.3, help="Probe timeout in seconds (default: 0.3)")
+    parser.add_argument(
+        "--engines",
+        default=",".join(available_engines()),
+        help="Comma-separated engines to run (default: every engine usable here)",
+    )
+    parser.add_argument(
+        "--targets",
+        default=",".join(BENCH_TARGETS),
+        help="Comma-separated code paths: scan_ports, perform_scan (default: both)",
+    )
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write the results to this JSON file")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = build_argument_parser()
+    args = parser.parse_args(argv)
+    try:
+        engines = _csv_choices(args.engines, ("thread", "async", "syn", "rawsyn"), "engine")
+        targets = _csv_choices(args.targets, BENCH_TARGETS, "target")
+    except argparse.ArgumentTypeError as error:
+        parser.error(str(error))
+
+    results: List[BenchResult] = []
+    try:
+        with LoopbackFixture(args.open, args.closed, args.filtered) as fixture:
+            console.print(
+                f"[bold bright_cyan]Fixture:[/bold bright_cyan] {args.open} open, "
+                f"{args.closed} closed, {args.filtered} filtered ports on {BENCH_HOST}"
+            )
+            for target in targets:
+                for engine in engines:
+                    # No spinner: perform_scan() runs its own Rich progress display.
+                    console.print(f"[dim]  running {target} / {engine}...[/dim]")
+                    results.append(run_benchmark(fixture, target, engine, args.timeout))
+    except (OSError, RuntimeError) as error:
+        print_error(f"Benchmark failed: {error}")
+        return 1
+
+    print_benchmark(results)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as handle:
+            json.dump(
+                {
+                    "fixture": {"open": args.open, "closed": args.closed, "filtered": args.filtered},
+                    "timeout": args.timeout,
+                    "results": [result._asdict() for result in results],
+                },
+                handle,
+                indent=2,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,122 @@
+"""Checkpoints for long scans, so a killed run can pick up where it stopped.
+
+A checkpointed scan writes its finished rows in batches while it runs
+(from a background thread, see TriNetra.writer), into one scan run per
+target started at the scan's shared timestamp, and keeps a row in
+``scan_checkpoints`` with the targets, the port options and a progress
+count. Resuming reloads that row, reads back which (target, port) pairs
+already have a stored result and scans only the rest.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Dict, Iterable, List, Mapping, Sequence, Set, Tuple
+
+from .database import finish_scan_runs, update_checkpoint
+from .profiling import ScanProfile
+from .targets import ScanTarget
+from .writer import ResultWriter
+
+# Flush finished rows at least this often (seconds) ...
+CHECKPOINT_INTERVAL = 10.0
+
+# ... or as soon as this many are waiting.
+CHECKPOINT_ROWS = 1000
+
+
+class Checkpointer:
+    """Persist finished (label, port, service, version, status) rows and track progress.
+
+    Rows go through a ResultWriter, so they are stored in batches on a
+    background thread; each committed batch also bumps the progress
+    count in ``scan_checkpoints``.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        scan_id: int,
+        timestamp: str,
+        completed: int = 0,
+        interval: float = CHECKPOINT_INTERVAL,
+        batch_rows: int = CHECKPOINT_ROWS,
+        profile: ScanProfile | None = None,
+        addresses: Mapping[str, str] | None = None,
+        parameters: Dict[str, object] | None = None,
+        compact: bool = False,
+    ) -> None:
+        self.db_path = db_path
+        self.scan_id = scan_id
+        self.timestamp = timestamp
+        self.completed = completed
+        self.saved_rows = 0
+        self.profile = profile
+        self.addresses = dict(addresses or {})
+        self._writer = ResultWriter(
+            db_path,
+            timestamp,
+            addresses=self.addresses,
+            parameters=parameters,
+            batch_rows=batch_rows,
+            interval=interval,
+            on_commit=self._committed,
+            profile=profile,
+            compact=compact,
+        )
+
+    def _committed(self, count: int) -> None:
+        # Runs on the writer thread, after each batch.
+        self.completed += count
+        self.saved_rows += count
+        update_checkpoint(self.db_path, self.scan_id, self.completed)
+
+    def add(self, row: Tuple[str, int, str, str, str]) -> None:
+        self._writer.put(row)
+
+    def advance(self, count: int) -> None:
+        """Count rows that someone else (a shard worker) already stored."""
+        self.completed += count
+        self.saved_rows += count
+        self._update("running")
+
+    def flush(self, status: str = "running") -> None:
+        """Wait until every added row is stored, then record ``status``."""
+        self._writer.flush()
+        self._update(status)
+
+    def finish(self) -> None:
+        self._writer.close()
+        self._update("complete")
+        finish_scan_runs(self.db_path, list(self.addresses), self.timestamp)
+
+    def _update(self, status: str) -> None:
+        started = time.perf_counter()
+        update_checkpoint(self.db_path, self.scan_id, self.completed, status)
+        if self.profile is not None:
+            self.profile.add_time("database", time.perf_counter() - started)
+
+
+def remaining_work(
+    targets: Sequence[ScanTarget],
+    ports: Sequence[int],
+    done: Iterable[Tuple[str, int]],
+) -> List[Tuple[List[ScanTarget], List[int]]]:
+    """Group the (target, port) pairs not in ``done`` into (targets, ports) batches.
+
+    ``done`` holds (label, port) pairs. Targets left with the same ports
+    share one batch, so the common case (every host stopped after the same
+    ports, since probes interleave port-major) stays a single
+    multi-host scan.
+    """
+    finished: Dict[str, Set[int]] = {}
+    for label, port in done:
+        finished.setdefault(label, set()).add(port)
+
+    groups: Dict[Tuple[int, ...], List[ScanTarget]] = {}
+    for target in targets:
+        skip = finished.get(target.label, set())
+        left = tuple(port for port in ports if port not in skip)
+        if left:
+            groups.setdefault(left, []).append(target)
+    return [(group, list(left)) for left, group in groups.items()]
@@ -1,25 +1,44 @@
 import argparse
+import json
+import sqlite3
 import textwrap
+import time
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Tuple
+from typing import Callable, Dict, List, Sequence, Tuple
 
 from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeElapsedColumn, TaskProgressColumn
 
-from .database import initialize_database, insert_scan_results
+from .checkpoint import Checkpointer, remaining_work
+from .database import (
+    ScanCheckpoint,
+    create_checkpoint,
+    fetch_scan_rows,
+    initialize_database,
+    load_checkpoint,
+)
+from .discovery import discover_hosts
+from .profiling import ScanProfile
 from .scanner import (
-    detect_service,
-    detect_service_version,
+    SCAN_ENGINES,
     get_scan_mode_message,
-    parse_port_range,
-    resolve_target,
-    scan_port,
+    scan_hosts_iter,
 )
+from .ratelimit import RateLimiter
+from .sharding import scan_sharded
+from .targets import ScanTarget, parse_targets
+from .timing import RttEstimator
+from .topports import MAX_TOP_PORTS, select_ports
 from .ui import (
     console,
     print_banner,
+    print_checkpoint,
+    print_discovery,
     print_error,
+    print_profile,
     print_results_header,
     print_result_row,
+    print_rtt_stats,
     print_scan_mode,
     print_scan_target,
     print_summary,
@@ -46,10 +65,37 @@ def build_argument_parser() -> argparse.ArgumentParser:
               %(prog)s 127.0.0.1 20-80
               %(prog)s scanme.nmap.org 22,80,443 --timeout 0.3
               %(prog)s 192.168.1.1 1-1024 --db data/custom.db
+              %(prog)s 10.0.0.5 1-65535 --engine async --concurrency 2000
+              %(prog)s 192.168.1.0/24 22,80,443
+              %(prog)s 10.0.0.5-20,10.0.1.7 1-1024
+              %(prog)s 10.0.0.0/16 22,80,443 --processes 8
+              %(prog)s scanme.nmap.org --top-ports 100
+              %(prog)s --resume 12
 
             ━━━━━ Flags ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
               --timeout   Socket timeout in seconds (default 0.5)
+              --top-ports N
+                          Scan the N most commonly open ports first
+                          (N up to the 150 ranked by frequency)
+              --likely-first
+                          Order any port spec by open likelihood
+              --adaptive-timeout
+                          Derive timeouts from measured RTT
+              --rate      Max probes per second (backs off on timeouts)
+              --engine    auto, thread, async, syn or rawsyn
+              --threads   Worker threads for the thread engine (default 100)
+              --concurrency
+                          In-flight connects for the async engine (default 1000)
+              --processes Worker processes to shard large scans across
+              --discovery / --no-discovery
+                          Skip hosts that do not answer pings first
+              --all-addresses
+                          Scan every A/AAAA address of a hostname
+              --resume    Continue an interrupted scan by its scan id
+              --profile / --profile-json PATH
+                          Show (or save) where the scan spent its time
+              --compact   Store closed/filtered ports as a 2-bit bitmap
               --db        Path to SQLite database file
               -h, --help  Show this help message
 
@@ -61,18 +107,108 @@ def build_argument_parser() -> argparse.ArgumentParser:
     )
     parser.add_argument(
         "target",
-        help="Target IP address or domain name (e.g. 127.0.0.1, scanme.nmap.org)",
+        nargs="?",
+        default=None,
+        help="Targets: IP, domain, CIDR or address range, comma-separated (e.g. 127.0.0.1, scanme.nmap.org, 10.0.0.0/24, 10.0.0.5-20)",
     )
     parser.add_argument(
         "ports",
-        help="Port specification: range '1-1024' or comma-separated '22,80,443'",
+        nargs="?",
+        default=None,
+        help="Port specification: range '1-1024' or comma-separated '22,80,443' (optional with --top-ports)",
+    )
+    parser.add_argument(
+        "--top-ports",
+        type=int,
+        default=None,
+        metavar="N",
+        help=(
+            "Scan the N ports most often found open, most likely first (within the port spec, if one is given); "
+            f"N is capped at the {MAX_TOP_PORTS} ports ranked by open frequency"
+        ),
+    )
+    parser.add_argument(
+        "--likely-first",
+        action="store_true",
+        help="Scan the given ports in order of how often they are found open, so open ports show up early",
     )
     parser.add_argument(
         "--timeout",
         type=float,
-        default=0.5,
+        default=None,
         help="Socket timeout in seconds (default: 0.5)",
     )
+    parser.add_argument(
+        "--adaptive-timeout",
+        action="store_true",
+        default=None,
+        help="Shrink or grow the timeout from measured round-trip times (--timeout is the starting value)",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=None,
+        help="Maximum probes (connections or SYN packets) per second; backs off automatically when timeouts spike",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=SCAN_ENGINES,
+        default=None,
+        help="Probe engine (default: auto picks SYN when privileged, threads otherwise)",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=None,
+        help="Worker threads for the thread engine (default: 100, max 200)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Connects kept in flight by the async engine (default: 1000)",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="Shard the scan across this many worker processes, which write rows straight to the database (default: 1)",
+    )
+    parser.add_argument(
+        "--discovery",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Ping hosts first and sweep only those that answer (default: on for more than one host)",
+    )
+    parser.add_argument(
+        "--all-addresses",
+        action="store_true",
+        help="Scan every A/AAAA address a hostname resolves to, not just the first (IPv4 preferred)",
+    )
+    parser.add_argument(
+        "--resume",
+        type=int,
+        default=None,
+        metavar="SCAN_ID",
+        help="Continue an interrupted scan from its checkpoint in --db, scanning only the ports it had not finished",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time each phase (DNS, discovery, probes, service grabs, output, database) and show probe latency histograms",
+    )
+    parser.add_argument(
+        "--profile-json",
+        default=None,
+        metavar="PATH",
+        help="Write the --profile data to this JSON file (implies --profile)",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        default=None,
+        help="Store CLOSED and FILTERED ports as a 2-bit-per-port bitmap per run (about 16 KB per host); only OPEN and ERROR ports get full rows",
+    )
     parser.add_argument(
         "--db",
         default=str(Path("data") / "trinetra_scans.db"),
@@ -81,10 +217,11 @@ def build_argument_parser() -> argparse.ArgumentParser:
     return parser
 
 
-def perform_scan(ip_address: str, ports: List[int], timeout: float) -> List[Tuple[int, str, str, str]]:
-    results: List[Tuple[int, str, str, str]] = []
+ScanWork = Sequence[Tuple[Sequence[ScanTarget], Sequence[int]]]
 
-    progress = Progress(
+
+def _progress_bar() -> Progress:
+    return Progress(
         SpinnerColumn(spinner_name="dots", style="bright_yellow"),
         TextColumn("[bold bright_blue]{task.description}"),
         BarColumn(bar_width=40, style="dim", complete_style="bright_yellow", finished_style="green"),
@@ -95,33 +232,234 @@ def perform_scan(ip_address: str, ports: List[int], timeout: float) -> List[Tupl
         console=console,
     )
 
-    with progress:
-        task_id = progress.add_task("Scanning ports", total=len(ports))
-        print_results_header()
-        for port in ports:
-            status = scan_port(ip_address, port, timeout=timeout)
-            service = "Unknown"
-            version = ""
-            if status == "OPEN":
-                service = detect_service(ip_address, port, timeout=timeout)
-                version = detect_service_version(ip_address, port, timeout=timeout)
-            results.append((port, service, version, status))
-            print_result_row(port, service, version, status)
-            progress.advance(task_id)
+
+def _show_hosts(work: ScanWork) -> bool:
+    return len({target.address for targets, _ in work for target in targets}) > 1
+
+
+def perform_scan(
+    work: ScanWork,
+    timeout: float,
+    rtt: Dict[str, RttEstimator] | None = None,
+    limiter: RateLimiter | None = None,
+    engine: str = "auto",
+    max_threads: int = 100,
+    concurrency: int = 1000,
+    on_row: Callable[[Tuple[str, int, str, str, str]], None] | None = None,
+    profile: ScanProfile | None = None,
+) -> List[Tuple[str, int, str, str, str]]:
+    """Scan each (targets, ports) batch and return (target label, port, service, version, status) rows.
+
+    ``on_row`` sees every row as it arrives (the CLI uses it to checkpoint).
+    With a ``profile``, time spent drawing rows counts as the render phase.
+    """
+    results: List[Tuple[str, int, str, str, str]] = []
+    multi_host = _show_hosts(work)
+
+    with _progress_bar() as progress:
+        task_id = progress.add_task("Scanning ports", total=sum(len(targets) * len(ports) for targets, ports in work))
+        print_results_header(show_host=multi_host)
+        for targets, ports in work:
+            labels = {target.address: target.label for target in targets}
+            for address, port, service, version, status in scan_hosts_iter(
+                list(labels),
+                ports,
+                timeout=timeout,
+                max_threads=max_threads,
+                engine=engine,
+                concurrency=concurrency,
+                rtt=rtt,
+                versions=True,
+                limiter=limiter,
+                profile=profile,
+            ):
+                row = (labels[address], port, service, version, status)
+                results.append(row)
+                if on_row is not None:
+                    on_row(row)
+                started = time.perf_counter()
+                print_result_row(port, service, version, status, host=row[0] if multi_host else "")
+                progress.advance(task_id)
+                if profile is not None:
+                    profile.add_time("render", time.perf_counter() - started)
 
     return results
 
 
+def perform_sharded_scan(
+    work: ScanWork,
+    timeout: float,
+    processes: int,
+    db_path: str,
+    timestamp: str,
+    adaptive_timeout: bool = False,
+    rate: float | None = None,
+    engine: str = "auto",
+    max_threads: int = 100,
+    concurrency: int = 1000,
+    on_saved: Callable[[int], None] | None = None,
+    profile: ScanProfile | None = None,
+    run_parameters: Dict[str, object] | None = None,
+    compact: bool = False,
+) -> Tuple[List[Tuple[str, int, str, str, str]], int]:
+    """Scan on worker processes that store their own rows under ``timestamp``; returns (rows, rows saved).
+
+    Rows print and the progress bar advances as each shard finishes;
+    ``on_saved(count)`` is told how many rows that shard stored.
+    """
+    results: List[Tuple[str, int, str, str, str]] = []
+    saved_rows = 0
+    multi_host = _show_hosts(work)
+
+    with _progress_bar() as progress:
+        task_id = progress.add_task(
+            f"Scanning ports ({processes} processes)",
+            total=sum(len(targets) * len(ports) for targets, ports in work),
+        )
+        print_results_header(show_host=multi_host)
+
+        for targets, ports in work:
+            labels = {target.address: target.label for target in targets}
+
+            def show_shard(rows: List[tuple]) -> None:
+                started = time.perf_counter()
+                for address, port, service, version, status in rows:
+                    print_result_row(port, service, version, status, host=labels[address] if multi_host else "")
+                progress.advance(task_id, len(rows))
+                if profile is not None:
+                    profile.add_time("render", time.perf_counter() - started, calls=len(rows))
+                if on_saved is not None:
+                    on_saved(len(rows))
+
+            report = scan_sharded(
+                list(labels),
+                ports,
+                processes=processes,
+                timeout=timeout,
+                max_threads=max_threads,
+                engine=engine,
+                concurrency=concurrency,
+                rate=rate,
+                versions=True,
+                adaptive_timeout=adaptive_timeout,
+                db_path=db_path,
+                labels=labels,
+                timestamp=timestamp,
+                on_shard=show_shard,
+                profile=profile,
+                run_parameters=run_parameters,
+                compact=compact,
+            )
+            saved_rows += report.saved_rows
+            results.extend(
+                (labels[address], port, service, version, status)
+                for address, port, service, version, status in report.results
+            )
+
+    return results, saved_rows
+
+
+def _previous_rows(checkpoint: ScanCheckpoint, db_path: str) -> List[Tuple[str, int, str, str, str]]:
+    """Rows an interrupted scan already stored, shaped like perform_scan() rows."""
+    labels = [label for label, _ in checkpoint.targets]
+    return [
+        (label, port, service or "Unknown", version, status)
+        for label, port, service, version, status in fetch_scan_rows(db_path, labels, checkpoint.timestamp)
+    ]
+
+
+def _port_options(args: argparse.Namespace) -> Dict[str, object]:
+    """The port arguments, stored with a checkpoint so --resume rebuilds the same port list."""
+    return {"port_range": args.ports, "top": args.top_ports, "likely_first": args.likely_first}
+
+
+# Scan options stored with a checkpoint, with the values used when a flag
+# is left out. Their parser defaults are None, so a flag given explicitly
+# (even with its default value) can be told apart from one left out.
+_SCAN_DEFAULTS: Dict[str, object] = {
+    "timeout": 0.5,
+    "adaptive_timeout": False,
+    "rate": None,
+    "engine": "auto",
+    "threads": 100,
+    "concurrency": 1000,
+    "processes": 1,
+    "discovery": None,
+    "compact": False,
+}
+
+
+def _scan_settings(args: argparse.Namespace) -> Dict[str, object]:
+    return {name: getattr(args, name) for name in _SCAN_DEFAULTS}
+
+
+def _apply_defaults(args: argparse.Namespace) -> None:
+    for name, default in _SCAN_DEFAULTS.items():
+        if getattr(args, name) is None:
+            setattr(args, name, default)
+
+
+def _describe_flag(name: str, value: object) -> str:
+    flag = "--" + name.replace("_", "-")
+    if value is True:
+        return flag
+    if value is False or value is None:
+        return f"without {flag}"
+    return f"with {flag} {value}"
+
+
+def _restore_settings(args: argparse.Namespace, checkpoint: ScanCheckpoint) -> None:
+    """Put a checkpoint's scan options back into ``args``, rejecting flags that contradict them."""
+    for name, stored in checkpoint.settings.items():
+        if name not in _SCAN_DEFAULTS:
+            continue
+        given = getattr(args, name)
+        if given is not None and given != stored:
+            flag = "--" + name.replace("_", "-")
+            raise ValueError(
+                f"Scan {checkpoint.scan_id} was started {_describe_flag(name, stored)}; leave out {flag} to resume it."
+            )
+        setattr(args, name, stored)
+
+
 def run() -> int:
     parser = build_argument_parser()
     args = parser.parse_args()
 
     print_banner()
 
+    checkpoint: ScanCheckpoint | None = None
+    profile = ScanProfile() if args.profile or args.profile_json else None
     try:
-        ports = parse_port_range(args.ports)
-        ip_address = resolve_target(args.target)
+        started = time.perf_counter()
         initialize_database(args.db)
+        if profile is not None:
+            profile.add_time("database", time.perf_counter() - started)
+        if args.resume is not None:
+            if args.target or args.ports or args.top_ports:
+                raise ValueError("--resume continues a stored scan; leave out the target and ports.")
+            checkpoint = load_checkpoint(args.db, args.resume)
+            if checkpoint is None:
+                raise ValueError(f"No scan with id {args.resume} in {args.db}.")
+            if checkpoint.status == "complete":
+                raise ValueError(f"Scan {args.resume} already finished; nothing to resume.")
+            _restore_settings(args, checkpoint)
+            target_spec = checkpoint.target_spec
+            ports = select_ports(**checkpoint.port_spec)
+            targets = [ScanTarget(label, address) for label, address in checkpoint.targets]
+        else:
+            if not args.target:
+                raise ValueError("Give a target to scan, or --resume SCAN_ID to continue a stored scan.")
+            target_spec = args.target
+            ports = select_ports(args.ports, args.top_ports, args.likely_first)
+            started = time.perf_counter()
+            targets = parse_targets(args.target, all_addresses=args.all_addresses)
+            if profile is not None:
+                profile.add_time("resolve", time.perf_counter() - started)
+        _apply_defaults(args)
+        if args.timeout <= 0:
+            raise ValueError("--timeout must be greater than zero.")
+        limiter = RateLimiter(args.rate) if args.rate else None
     except ValueError as error:
         print_error(str(error))
         return 2
@@ -129,19 +467,130 @@ def run() -> int:
         print_error(f"Network or database initialization failed: {error}")
         return 1
 
-    print_scan_target(args.target, ip_address, len(ports))
+    if len(targets) == 1:
+        ip_address = targets[0].address
+    else:
+        ip_address = f"{len(targets)} hosts"
+    print_scan_target(target_spec, ip_address, len(ports))
     print_scan_mode(get_scan_mode_message())
 
+    skipped_hosts: List[str] = list(checkpoint.skipped) if checkpoint is not None else []
+    run_discovery = args.discovery if args.discovery is not None else len(targets) > 1
+    if run_discovery and checkpoint is None:
+        started = time.perf_counter()
+        with console.status("[bold bright_blue]Discovering live hosts...", spinner="dots"):
+            discovery = discover_hosts(
+                [target.address for target in targets],
+                timeout=args.timeout,
+                concurrency=args.concurrency,
+                rate=args.rate,
+            )
+        if profile is not None:
+            profile.add_time("discovery", time.perf_counter() - started)
+        live = set(discovery.live)
+        skipped_hosts = [target.label for target in targets if target.address not in live]
+        targets = [target for target in targets if target.address in live]
+        print_discovery(len(targets), skipped_hosts)
+        if not targets:
+            print_error("No live hosts found; nothing to scan. Use --no-discovery to scan anyway.")
+            return 0
+
+    if checkpoint is None:
+        timestamp = datetime.now(timezone.utc).isoformat()
+        scan_id = create_checkpoint(
+            args.db, target_spec, _port_options(args), targets, timestamp, skipped_hosts, _scan_settings(args)
+        )
+        previous: List[Tuple[str, int, str, str, str]] = []
+        work: ScanWork = [(targets, ports)]
+    else:
+        scan_id, timestamp = checkpoint.scan_id, checkpoint.timestamp
+        previous = _previous_rows(checkpoint, args.db)
+        work = remaining_work(targets, ports, ((label, port) for label, port, *_ in previous))
+    print_checkpoint(scan_id, resumed_rows=len(previous) if checkpoint is not None else None)
+    run_parameters = {
+        **(checkpoint.port_spec if checkpoint is not None else _port_options(args)),
+        **_scan_settings(args),
+    }
+    checkpointer = Checkpointer(
+        args.db,
+        scan_id,
+        timestamp,
+        completed=len(previous),
+        profile=profile,
+        addresses={target.label: target.address for target in targets},
+        parameters=run_parameters,
+        compact=args.compact,
+    )
+
+    sharded = args.processes > 1
+    rtt = None
+    if args.adaptive_timeout and not sharded:
+        rtt = {target.address: RttEstimator(args.timeout) for target in targets}
+
     try:
-        results = perform_scan(ip_address, ports, timeout=args.timeout)
-        saved_rows = insert_scan_results(args.db, args.target, results)
-    except OSError as error:
-        print_error(f"Scan failed: {error}")
+        if sharded:
+            results, _ = perform_sharded_scan(
+                work,
+                timeout=args.timeout,
+                processes=args.processes,
+                db_path=args.db,
+                timestamp=timestamp,
+                adaptive_timeout=args.adaptive_timeout,
+                rate=args.rate,
+                engine=args.engine,
+                max_threads=args.threads,
+                concurrency=args.concurrency,
+                on_saved=checkpointer.advance,
+                profile=profile,
+                run_parameters=run_parameters,
+                compact=args.compact,
+            )
+        else:
+            results = perform_scan(
+                work,
+                timeout=args.timeout,
+                rtt=rtt,
+                limiter=limiter,
+                engine=args.engine,
+                max_threads=args.threads,
+                concurrency=args.concurrency,
+                on_row=checkpointer.add,
+                profile=profile,
+            )
+        checkpointer.finish()
+    except KeyboardInterrupt:
+        checkpointer.flush()
+        print_error(f"Scan interrupted. Finished results are saved; continue with --resume {scan_id}.")
+        return 130
+    except (OSError, sqlite3.Error) as error:
+        try:
+            checkpointer.flush()
+        except (OSError, sqlite3.Error):
+            # The database itself is failing; batches committed so far still resume.
+            pass
+        print_error(f"Scan failed: {error}. Finished results are saved; continue with --resume {scan_id}.")
         return 1
 
-    open_count = sum(1 for _, _, _, status in results if status == "OPEN")
+    results = previous + results
+    open_count = sum(1 for *_, status in results if status == "OPEN")
     closed_count = len(results) - open_count
-    print_summary(args.target, ip_address, open_count, closed_count, saved_rows, args.db)
+    print_summary(target_spec, ip_address, open_count, closed_count, checkpointer.saved_rows, args.db, len(skipped_hosts))
+    if rtt is not None:
+        for target in targets:
+            stats = rtt[target.address].snapshot()
+            if len(targets) == 1 or stats["samples"]:
+                print_rtt_stats(stats, host=target.label if len(targets) > 1 else "")
+    if profile is not None:
+        profile.finish()
+        report = profile.to_dict()
+        print_profile(report)
+        if args.profile_json:
+            try:
+                with open(args.profile_json, "w", encoding="utf-8") as handle:
+                    json.dump(report, handle, indent=2)
+            except OSError as error:
+                print_error(f"Could not write profile to {args.profile_json}: {error}")
+                return 1
     return 0
 
 
@@ -1,29 +1,325 @@
+import json
+import os
 import sqlite3
+import threading
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Iterable, Tuple
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Sequence, Tuple
 
 
-def get_connection(db_path: str) -> sqlite3.Connection:
-    db_file = Path(db_path)
+class ScanCheckpoint(NamedTuple):
+    """A resumable scan: what was asked for, which hosts it covers and how far it got.
+
+    Finished rows belong to the runs started at ``timestamp``; ``port_spec`` holds
+    the port options (ports, top_ports, likely_first) needed to rebuild the
+    port list, and ``settings`` the scan options (engine, timeout, ...) a
+    resumed scan keeps using.
+    """
+
+    scan_id: int
+    target_spec: str
+    port_spec: Dict[str, object]
+    targets: List[Tuple[str, str]]
+    skipped: List[str]
+    timestamp: str
+    completed: int
+    status: str
+    settings: Dict[str, object]
+
+
+# Seconds a connection waits on a locked database before giving up.
+BUSY_TIMEOUT = 10.0
+
+_local = threading.local()
+_initialized: set = set()
+_initialized_lock = threading.Lock()
+
+
+def _open_connection(db_file: Path) -> sqlite3.Connection:
     db_file.parent.mkdir(parents=True, exist_ok=True)
-    return sqlite3.connect(db_file)
+    connection = sqlite3.connect(db_file, timeout=BUSY_TIMEOUT)
+    # Only takes effect on a new, empty file (see TriNetra.retention for
+    # converting an existing one); must come before the switch to WAL.
+    connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    # WAL lets readers (history pages, other workers) run while a scan
+    # writes; NORMAL sync is safe under WAL and skips an fsync per commit.
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute(f"PRAGMA busy_timeout={int(BUSY_TIMEOUT * 1000)}")
+    # Off by default in SQLite; the schema's ON DELETE CASCADE relies on it.
+    connection.execute("PRAGMA foreign_keys=ON")
+    return connection
 
 
-def initialize_database(db_path: str) -> None:
-    with get_connection(db_path) as connection:
-        connection.execute(
-            """
-            CREATE TABLE IF NOT EXISTS scans (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                target TEXT NOT NULL,
-                port INTEGER NOT NULL,
-                status TEXT NOT NULL,
-                timestamp TEXT NOT NULL
+def get_connection(db_path: str) -> sqlite3.Connection:
+    """Return this thread's connection to ``db_path``, opening it on first use.
+
+    Connections are cached per thread and per process (a forked worker
+    opens its own instead of sharing its parent's). Use them as
+    ``with get_connection(path) as connection:``, which commits or rolls
+    back but leaves the connection open for the next call.
+    """
+    db_file = Path(os.path.abspath(db_path))
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    # Entries inherited across fork() stay referenced, never closed, so
+    # the child cannot disturb the parent's locks or WAL file.
+    key = (os.getpid(), str(db_file))
+    connection = connections.get(key)
+    if connection is None:
+        connection = connections[key] = _open_connection(db_file)
+    return connection
+
+
+# Scan history: one scan_runs row per target per scan, one scan_results
+# row per port. ``scans`` is kept as a read-only view in the old shape.
+# Runs rolled up by TriNetra.retention keep only their OPEN rows plus a
+# scan_run_summaries row with the per-status counts.
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS scan_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        target TEXT NOT NULL,
+        resolved_ip TEXT NOT NULL DEFAULT '',
+        parameters TEXT NOT NULL DEFAULT '{}',
+        started_at TEXT NOT NULL,
+        finished_at TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS scan_results (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_id INTEGER NOT NULL REFERENCES scan_runs(id) ON DELETE CASCADE,
+        port INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        service TEXT NOT NULL DEFAULT '',
+        version TEXT NOT NULL DEFAULT ''
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_scan_results_run_port ON scan_results(run_id, port)",
+    """
+    CREATE TABLE IF NOT EXISTS scan_run_summaries (
+        run_id INTEGER PRIMARY KEY REFERENCES scan_runs(id) ON DELETE CASCADE,
+        status_counts TEXT NOT NULL,
+        rolled_up_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS scan_port_states (
+        run_id INTEGER PRIMARY KEY REFERENCES scan_runs(id) ON DELETE CASCADE,
+        states BLOB NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS scan_checkpoints (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        target_spec TEXT NOT NULL,
+        port_spec TEXT NOT NULL,
+        targets TEXT NOT NULL,
+        skipped TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        completed INTEGER NOT NULL DEFAULT 0,
+        status TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        settings TEXT NOT NULL DEFAULT '{}'
+    )
+    """,
+)
+
+# Targets per IN (...) query.
+_QUERY_BATCH = 500
+
+# Compact runs keep every port's state as 2 bits in scan_port_states
+# (16 KiB per run) and only OPEN / ERROR ports as scan_results rows.
+# Code 0 is "not scanned" and code 3 is "see scan_results".
+_STATE_CODES = {"CLOSED": 1, "FILTERED": 2}
+_CODE_STATES = {code: status for status, code in _STATE_CODES.items()}
+_DETAIL_CODE = 3
+PORT_STATES_SIZE = 65536 // 4
+
+
+def encode_port_states(results: Iterable[Tuple[int, str]], states: bytes | None = None) -> bytes:
+    """Pack (port, status) pairs into a 2-bit-per-port blob, on top of ``states`` if given."""
+    packed = bytearray(states or bytes(PORT_STATES_SIZE))
+    for port, status in results:
+        code = _STATE_CODES.get(status, _DETAIL_CODE)
+        index, shift = divmod(port, 4)
+        shift *= 2
+        packed[index] = (packed[index] & ~(3 << shift)) | (code << shift)
+    return bytes(packed)
+
+
+def expand_port_states(states: bytes) -> Iterator[Tuple[int, str]]:
+    """Yield (port, status) for every CLOSED or FILTERED port in a blob, in port order.
+
+    Ports with code 3 have a scan_results row and are left to the caller.
+    """
+    for index, byte in enumerate(states):
+        if not byte:
+            continue
+        for offset in range(4):
+            status = _CODE_STATES.get((byte >> (offset * 2)) & 3)
+            if status is not None:
+                yield index * 4 + offset, status
+
+
+def merge_port_states(states: bytes, other: bytes) -> bytes:
+    """Combine two blobs: ports set in ``other`` win, ports it never scanned keep ``states``."""
+    merged = bytearray(states)
+    for index, byte in enumerate(other):
+        if not byte:
+            continue
+        for shift in (0, 2, 4, 6):
+            code = (byte >> shift) & 3
+            if code:
+                merged[index] = (merged[index] & ~(3 << shift)) | (code << shift)
+    return bytes(merged)
+
+
+_LEGACY_VIEW = """
+    CREATE VIEW IF NOT EXISTS scans AS
+    SELECT scan_results.id AS id, scan_runs.target AS target, scan_results.port AS port,
+           scan_results.status AS status, scan_runs.started_at AS timestamp
+    FROM scan_results JOIN scan_runs ON scan_runs.id = scan_results.run_id
+"""
+
+
+def _add_checkpoint_settings(connection: sqlite3.Connection) -> None:
+    """Add the ``settings`` column to a scan_checkpoints table created before it existed."""
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(scan_checkpoints)")}
+    if "settings" not in columns:
+        connection.execute("ALTER TABLE scan_checkpoints ADD COLUMN settings TEXT NOT NULL DEFAULT '{}'")
+
+
+def _migrate_legacy_scans(connection: sqlite3.Connection) -> None:
+    """Move rows from the old flat ``scans`` table into scan_runs / scan_results.
+
+    Each (target, timestamp) group becomes one run. The old table is
+    dropped afterwards, all in the caller's transaction.
+    """
+    legacy = connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'scans'").fetchone()
+    if legacy is None:
+        return
+
+    connection.execute(
+        """
+        INSERT INTO scan_runs(target, started_at, finished_at)
+        SELECT target, timestamp, timestamp FROM scans GROUP BY target, timestamp ORDER BY MIN(id)
+        """
+    )
+    connection.execute(
+        """
+        INSERT INTO scan_results(run_id, port, status)
+        SELECT scan_runs.id, scans.port, scans.status
+        FROM scans JOIN scan_runs ON scan_runs.target = scans.target AND scan_runs.started_at = scans.timestamp
+        ORDER BY scans.id
+        """
+    )
+    connection.execute("DROP TABLE scans")
+
+
+# One run per (target, started_at): concurrent writers of the same scan
+# (shard workers) must all land in the same run.
+_RUN_KEY_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS uq_scan_runs_target_started ON scan_runs(target, started_at)"
+
+
+def _merge_duplicate_runs(connection: sqlite3.Connection) -> None:
+    """Fold runs that share a (target, started_at) into the oldest of them.
+
+    Older versions could create such duplicates when several processes
+    wrote the same scan at once; the unique index needs them gone.
+    """
+    duplicates = connection.execute(
+        """
+        SELECT dup.id, MIN(keep.id) FROM scan_runs AS dup
+        JOIN scan_runs AS keep ON keep.target = dup.target AND keep.started_at = dup.started_at AND keep.id < dup.id
+        GROUP BY dup.id
+        """
+    ).fetchall()
+    for duplicate, keeper in duplicates:
+        connection.execute("UPDATE scan_results SET run_id = ? WHERE run_id = ?", (keeper, duplicate))
+        states = connection.execute("SELECT states FROM scan_port_states WHERE run_id = ?", (duplicate,)).fetchone()
+        if states is not None:
+            kept = connection.execute("SELECT states FROM scan_port_states WHERE run_id = ?", (keeper,)).fetchone()
+            connection.execute(
+                "INSERT OR REPLACE INTO scan_port_states(run_id, states) VALUES (?, ?)",
+                (keeper, merge_port_states(kept[0], states[0]) if kept is not None else states[0]),
             )
+        connection.execute(
             """
+            UPDATE scan_runs SET finished_at = (SELECT MAX(finished_at) FROM scan_runs WHERE id IN (?, ?))
+            WHERE id = ?
+            """,
+            (keeper, duplicate, keeper),
         )
-        connection.commit()
+        connection.execute("DELETE FROM scan_port_states WHERE run_id = ?", (duplicate,))
+        connection.execute("DELETE FROM scan_run_summaries WHERE run_id = ?", (duplicate,))
+        connection.execute("DELETE FROM scan_runs WHERE id = ?", (duplicate,))
+
+
+def initialize_database(db_path: str) -> None:
+    """Create the schema (and migrate old data) once per process per database."""
+    key = os.path.abspath(db_path)
+    if key in _initialized:
+        return
+    with _initialized_lock:
+        if key in _initialized:
+            return
+        with get_connection(db_path) as connection:
+            # One transaction, taken up front, so processes starting
+            # together do not migrate the same data twice.
+            connection.execute("BEGIN IMMEDIATE")
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            _add_checkpoint_settings(connection)
+            _migrate_legacy_scans(connection)
+            _merge_duplicate_runs(connection)
+            connection.execute("DROP INDEX IF EXISTS idx_scan_runs_target_started")
+            connection.execute(_RUN_KEY_INDEX)
+            connection.execute(_LEGACY_VIEW)
+            connection.commit()
+        _initialized.add(key)
+
+
+def _result_row(entry: tuple) -> Tuple[int, str, str, str]:
+    """Normalize a result tuple to (port, status, service, version)."""
+    if len(entry) == 2:
+        port, status = entry
+        return port, status, "", ""
+    if len(entry) == 3:
+        port, service, status = entry
+        return port, status, service or "", ""
+    if len(entry) == 4:
+        port, service, version, status = entry
+        return port, status, service or "", version or ""
+    raise ValueError("Each scan result must be (port, status), (port, service, status), or (port, service, version, status).")
+
+
+def _run_id(
+    connection: sqlite3.Connection,
+    target: str,
+    started_at: str,
+    resolved_ip: str,
+    parameters: Dict[str, object] | None,
+) -> int:
+    """Find the run for (target, started_at), creating it on first use.
+
+    Call inside a write transaction; the unique (target, started_at)
+    index makes a concurrent creator's insert a no-op.
+    """
+    connection.execute(
+        """
+        INSERT INTO scan_runs(target, resolved_ip, parameters, started_at) VALUES (?, ?, ?, ?)
+        ON CONFLICT(target, started_at) DO NOTHING
+        """,
+        (target, resolved_ip, json.dumps(parameters or {}), started_at),
+    )
+    row = connection.execute(
+        "SELECT id FROM scan_runs WHERE target = ? AND started_at = ?",
+        (target, started_at),
+    ).fetchone()
+    return int(row[0])
 
 
 def insert_scan_results(
@@ -31,25 +327,159 @@ def insert_scan_results(
     target: str,
     results: Iterable[Tuple[int, str] | Tuple[int, str, str] | Tuple[int, str, str, str]],
     timestamp: str | None = None,
+    resolved_ip: str = "",
+    parameters: Dict[str, object] | None = None,
+    finished: bool = True,
+    compact: bool = False,
 ) -> int:
+    """Store per-port results under the run for (``target``, ``timestamp``).
+
+    The run is created on the first call for that pair (with
+    ``resolved_ip`` and ``parameters``) and reused by later calls, so a
+    scan can be written in several batches. ``finished`` stamps the run's
+    finished_at; pass False for intermediate batches and call
+    finish_scan_runs() at the end. With ``compact``, CLOSED and FILTERED
+    ports only go into the run's port-state blob (see
+    encode_port_states()). Returns the number of results stored.
+    """
     timestamp = timestamp or datetime.now(timezone.utc).isoformat()
-    rows = []
-    for entry in results:
-        if len(entry) == 2:
-            port, status = entry
-        elif len(entry) == 3:
-            port, _, status = entry
-        elif len(entry) == 4:
-            port, _, _, status = entry
-        else:
-            raise ValueError("Each scan result must be (port, status), (port, service, status), or (port, service, version, status).")
-        rows.append((target, port, status, timestamp))
+    rows = [_result_row(entry) for entry in results]
 
     with get_connection(db_path) as connection:
+        # Take the write lock before reading, so concurrent writers of one
+        # run (shard workers) are serialized.
+        connection.execute("BEGIN IMMEDIATE")
+        run_id = _run_id(connection, target, timestamp, resolved_ip, parameters)
+        detail_rows = rows
+        if compact:
+            detail_rows = [row for row in rows if row[1] not in _STATE_CODES]
+            # Read-merge-write of the blob; safe because the write lock is held.
+            existing = connection.execute("SELECT states FROM scan_port_states WHERE run_id = ?", (run_id,)).fetchone()
+            connection.execute(
+                "INSERT OR REPLACE INTO scan_port_states(run_id, states) VALUES (?, ?)",
+                (run_id, encode_port_states(((port, status) for port, status, *_ in rows), existing and existing[0])),
+            )
         connection.executemany(
-            "INSERT INTO scans(target, port, status, timestamp) VALUES (?, ?, ?, ?)",
-            rows,
+            "INSERT INTO scan_results(run_id, port, status, service, version) VALUES (?, ?, ?, ?, ?)",
+            [(run_id, *row) for row in detail_rows],
         )
+        if finished:
+            connection.execute(
+                "UPDATE scan_runs SET finished_at = ? WHERE id = ?",
+                (datetime.now(timezone.utc).isoformat(), run_id),
+            )
         connection.commit()
 
     return len(rows)
+
+
+def finish_scan_runs(db_path: str, targets: Sequence[str], started_at: str) -> None:
+    """Stamp finished_at on the runs of one scan (``targets`` started at ``started_at``)."""
+    finished_at = datetime.now(timezone.utc).isoformat()
+    with get_connection(db_path) as connection:
+        connection.executemany(
+            "UPDATE scan_runs SET finished_at = ? WHERE target = ? AND started_at = ?",
+            [(finished_at, target, started_at) for target in targets],
+        )
+        connection.commit()
+
+
+def create_checkpoint(
+    db_path: str,
+    target_spec: str,
+    port_spec: Dict[str, object],
+    targets: Sequence[Tuple[str, str]],
+    timestamp: str,
+    skipped: Sequence[str] = (),
+    settings: Dict[str, object] | None = None,
+) -> int:
+    """Record a new scan as running and return its scan id."""
+    with get_connection(db_path) as connection:
+        cursor = connection.execute(
+            """
+            INSERT INTO scan_checkpoints(target_spec, port_spec, targets, skipped, timestamp, status, updated_at, settings)
+            VALUES (?, ?, ?, ?, ?, 'running', ?, ?)
+            """,
+            (
+                target_spec,
+                json.dumps(port_spec),
+                json.dumps([list(target) for target in targets]),
+                json.dumps(list(skipped)),
+                timestamp,
+                datetime.now(timezone.utc).isoformat(),
+                json.dumps(settings or {}),
+            ),
+        )
+        connection.commit()
+        return int(cursor.lastrowid)
+
+
+def update_checkpoint(db_path: str, scan_id: int, completed: int, status: str = "running") -> None:
+    with get_connection(db_path) as connection:
+        connection.execute(
+            "UPDATE scan_checkpoints SET completed = ?, status = ?, updated_at = ? WHERE id = ?",
+            (completed, status, datetime.now(timezone.utc).isoformat(), scan_id),
+        )
+        connection.commit()
+
+
+def load_checkpoint(db_path: str, scan_id: int) -> ScanCheckpoint | None:
+    with get_connection(db_path) as connection:
+        row = connection.execute(
+            """
+            SELECT id, target_spec, port_spec, targets, skipped, timestamp, completed, status, settings
+            FROM scan_checkpoints WHERE id = ?
+            """,
+            (scan_id,),
+        ).fetchone()
+    if row is None:
+        return None
+    scan_id, target_spec, port_spec, targets, skipped, timestamp, completed, status, settings = row
+    return ScanCheckpoint(
+        scan_id,
+        target_spec,
+        json.loads(port_spec),
+        [tuple(target) for target in json.loads(targets)],
+        json.loads(skipped),
+        timestamp,
+        completed,
+        status,
+        json.loads(settings),
+    )
+
+
+def fetch_scan_rows(db_path: str, targets: Sequence[str], started_at: str) -> List[Tuple[str, int, str, str, str]]:
+    """Return (target, port, service, version, status) for every result of one scan.
+
+    Compact runs are expanded: their CLOSED / FILTERED ports come back
+    with an empty service and version, after the run's stored rows.
+    """
+    rows: List[Tuple[str, int, str, str, str]] = []
+    with get_connection(db_path) as connection:
+        # Batched to stay under SQLite's bound-parameter limit.
+        for begin in range(0, len(targets), _QUERY_BATCH):
+            batch = list(targets[begin:begin + _QUERY_BATCH])
+            placeholders = ", ".join("?" for _ in batch)
+            rows.extend(
+                connection.execute(
+                    f"""
+                    SELECT scan_runs.target, scan_results.port, scan_results.service,
+                           scan_results.version, scan_results.status
+                    FROM scan_runs JOIN scan_results ON scan_results.run_id = scan_runs.id
+                    WHERE scan_runs.target IN ({placeholders}) AND scan_runs.started_at = ?
+                    ORDER BY scan_results.id
+                    """,
+                    (*batch, started_at),
+                ).fetchall()
+            )
+            for target, states in connection.execute(
+                f"""
+                SELECT scan_runs.target, scan_port_states.states
+                FROM scan_runs JOIN scan_port_states ON scan_port_states.run_id = scan_runs.id
+                WHERE scan_runs.target IN ({placeholders}) AND scan_runs.started_at = ?
+                ORDER BY scan_runs.id
+                """,
+                (*batch, started_at),
+            ):
+                rows.extend((target, port, "", "", status) for port, status in expand_port_states(states))
+    return rows
@@ -0,0 +1,220 @@
+"""Host discovery: find out which targets answer before sweeping their ports.
+
+Unprivileged discovery makes TCP connects to a few common ports; a
+completed handshake or a refusal (RST) both prove the host is up. With
+root on Linux, a batch of ICMP echo requests and cookie-tagged TCP SYN
+pings (see TriNetra.rawsyn) go out first, which finds most live hosts in
+a single round trip.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import select
+import socket
+import struct
+import time
+from typing import Callable, Iterable, List, NamedTuple, Sequence, Set
+
+from .scanner import _RAW_SOCKETS_AVAILABLE, _normalize_timeout, is_root
+from .ratelimit import RateLimiter
+
+# Ports for unprivileged connect pings, most likely to answer first.
+DISCOVERY_PORTS = (80, 443, 22, 445, 3389)
+
+# Ports for privileged TCP SYN pings.
+PING_PORTS = (443, 80)
+
+# Default probes per second for the privileged sweeps.
+DEFAULT_PING_RATE = 1000.0
+
+_ICMP_ECHO_REQUEST = 8
+_ICMP_ECHO_REPLY = 0
+
+
+class DiscoveryResult(NamedTuple):
+    """Hosts that answered (``live``) and those skipped (``down``), in input order."""
+
+    live: List[str]
+    down: List[str]
+
+
+def build_echo_request(identifier: int, sequence: int) -> bytes:
+    from .rawsyn import _checksum
+
+    header = struct.pack("!BBHHH", _ICMP_ECHO_REQUEST, 0, 0, identifier, sequence)
+    payload = b"trinetra"
+    checksum = _checksum(header + payload)
+    return struct.pack("!BBHHH", _ICMP_ECHO_REQUEST, 0, checksum, identifier, sequence) + payload
+
+
+def _echo_reply_source(packet: bytes, identifier: int) -> str | None:
+    if len(packet) < 20:
+        return None
+    header_length = (packet[0] & 0x0F) * 4
+    if packet[9] != socket.IPPROTO_ICMP or len(packet) < header_length + 8:
+        return None
+    icmp_type, _, _, reply_identifier, _ = struct.unpack("!BBHHH", packet[header_length:header_length + 8])
+    if icmp_type != _ICMP_ECHO_REPLY or reply_identifier != identifier:
+        return None
+    return socket.inet_ntoa(packet[12:16])
+
+
+def _drain(receiver: socket.socket, wait: float, on_packet: Callable[[bytes], None]) -> None:
+    """Hand every packet that arrives within ``wait`` seconds to ``on_packet``."""
+    deadline = time.monotonic() + wait
+    while True:
+        remaining = deadline - time.monotonic()
+        readable, _, _ = select.select([receiver], [], [], max(0.0, remaining))
+        if readable:
+            try:
+                on_packet(receiver.recv(65535))
+            except OSError:
+                pass
+            continue
+        if remaining <= 0:
+            return
+
+
+def _sweep(
+    targets: Sequence[str],
+    timeout: float,
+    limiter: RateLimiter,
+    receiver: socket.socket,
+    send: Callable[[str], None],
+    on_packet: Callable[[bytes], None],
+) -> None:
+    """Send one round of probes, reading replies between sends, then wait out ``timeout``."""
+    for host in targets:
+        limiter.acquire()
+        try:
+            send(host)
+        except OSError:
+            continue
+        _drain(receiver, 0.0, on_packet)
+    _drain(receiver, timeout, on_packet)
+
+
+def _icmp_sweep(hosts: Sequence[str], timeout: float, limiter: RateLimiter) -> Set[str]:
+    wanted = set(hosts)
+    alive: Set[str] = set()
+    identifier = os.getpid() & 0xFFFF
+
+    def on_packet(packet: bytes) -> None:
+        source = _echo_reply_source(packet, identifier)
+        if source in wanted:
+            alive.add(source)
+
+    with socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP) as icmp:
+        sequence = iter(range(1, 1 << 30))
+
+        def send(host: str) -> None:
+            icmp.sendto(build_echo_request(identifier, next(sequence) & 0xFFFF), (host, 0))
+
+        _sweep(hosts, timeout, limiter, icmp, send, on_packet)
+    return alive
+
+
+def _syn_ping_sweep(hosts: Sequence[str], timeout: float, limiter: RateLimiter) -> Set[str]:
+    from .rawsyn import _source_address, build_syn_packet, parse_reply
+
+    wanted = set(hosts)
+    alive: Set[str] = set()
+    local_addresses = {}
+    source_port = random.randint(40000, 60000)
+
+    def on_packet(packet: bytes) -> None:
+        if len(packet) < 20:
+            return
+        source = socket.inet_ntoa(packet[12:16])
+        # Either a SYN/ACK or a RST acknowledging our cookie proves the host is up.
+        if source in wanted and parse_reply(packet, socket.inet_ntoa(packet[16:20])) is not None:
+            alive.add(source)
+
+    sender = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_RAW)
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP)
+    try:
+        for port in PING_PORTS:
+            def send(host: str) -> None:
+                if host not in local_addresses:
+                    local_addresses[host] = _source_address(host)
+                sender.sendto(build_syn_packet(local_addresses[host], host, source_port, port), (host, 0))
+
+            _sweep([host for host in hosts if host not in alive], timeout, limiter, receiver, send, on_packet)
+    finally:
+        sender.close()
+        receiver.close()
+    return alive
+
+
+def _connect_ping_sweep(
+    hosts: Sequence[str],
+    ports: Iterable[int],
+    timeout: float,
+    concurrency: int,
+    limiter: RateLimiter | None,
+) -> Set[str]:
+    from .asyncscan import async_probe_targets
+
+    alive: Set[str] = set()
+    port_list = list(ports)
+
+    def record(host: str, port: int, status: str) -> None:
+        if status in ("OPEN", "CLOSED"):
+            alive.add(host)
+
+    # Pairs are generated lazily, so a host that already answered is not
+    # probed on its remaining ports.
+    items = ((host, port) for port in port_list for host in hosts if host not in alive)
+    async_probe_targets(items, len(hosts) * len(port_list), timeout, concurrency, None, limiter, record)
+    return alive
+
+
+def discover_hosts(
+    hosts: Sequence[str],
+    timeout: float = 1.0,
+    ports: Sequence[int] = DISCOVERY_PORTS,
+    concurrency: int = 1000,
+    privileged: bool | None = None,
+    rate: float | None = None,
+) -> DiscoveryResult:
+    """Split ``hosts`` (IP addresses) into live and down ones.
+
+    When ``privileged`` (default: running as root on Linux), ICMP echo and
+    TCP SYN pings to PING_PORTS are tried first for IPv4 hosts. Hosts
+    still silent then get TCP connects to ``ports``, up to ``concurrency``
+    at once. A host that never answers within ``timeout`` is reported as
+    down. ``rate`` caps probes per second (the privileged sweeps default
+    to DEFAULT_PING_RATE).
+    """
+    host_list = list(dict.fromkeys(hosts))
+    if not host_list:
+        return DiscoveryResult([], [])
+
+    effective_timeout = _normalize_timeout(timeout)
+    if privileged is None:
+        privileged = is_root() and _RAW_SOCKETS_AVAILABLE
+
+    alive: Set[str] = set()
+    if privileged:
+        ping_limiter = RateLimiter(rate if rate and rate > 0 else DEFAULT_PING_RATE)
+        for sweep in (_icmp_sweep, _syn_ping_sweep):
+            # The raw sweeps speak IPv4 only; IPv6 hosts get connect pings.
+            remaining = [host for host in host_list if host not in alive and ":" not in host]
+            if not remaining:
+                break
+            try:
+                alive |= sweep(remaining, effective_timeout, ping_limiter)
+            except OSError:
+                continue
+
+    remaining = [host for host in host_list if host not in alive]
+    if remaining and ports:
+        limiter = RateLimiter(rate) if rate and rate > 0 else None
+        alive |= _connect_ping_sweep(remaining, ports, effective_timeout, concurrency, limiter)
+
+    return DiscoveryResult(
+        [host for host in host_list if host in alive],
+        [host for host in host_list if host not in alive],
+    )
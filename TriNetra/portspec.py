@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections.abc import Sequence
+from itertools import islice
+from typing import Iterable, Iterator, List, Tuple
+
+MIN_PORT = 1
+MAX_PORT = 65535
+
+
+class PortSpec(Sequence):
+    """An ordered, duplicate-free set of TCP ports stored as merged intervals.
+
+    '1-65535' costs one (start, end) pair instead of a 65535-element set
+    and sorted list. Bounds are validated once at construction, so scan
+    code can iterate, index, test membership and split into chunks without
+    re-checking every port. Anything that accepts a list of ports accepts
+    a PortSpec.
+    """
+
+    __slots__ = ("_starts", "_ends", "_offsets", "_length")
+
+    def __init__(self, intervals: Iterable[Tuple[int, int]] = ()) -> None:
+        merged: List[List[int]] = []
+        for start, end in sorted(intervals):
+            if start > end:
+                raise ValueError(f"Invalid range '{start}-{end}': start cannot be greater than end.")
+            if start < MIN_PORT or end > MAX_PORT:
+                raise ValueError("Ports must be in the range 1-65535.")
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+
+        self._starts = [start for start, _ in merged]
+        self._ends = [end for _, end in merged]
+        # _offsets[i] is the sequence index of _starts[i].
+        self._offsets: List[int] = []
+        total = 0
+        for start, end in merged:
+            self._offsets.append(total)
+            total += end - start + 1
+        self._length = total
+
+    @classmethod
+    def parse(cls, port_range: str) -> "PortSpec":
+        """Parse a port range string such as '1-1024' or '22,80,443'."""
+        intervals: List[Tuple[int, int]] = []
+
+        for chunk in port_range.split(","):
+            chunk = chunk.strip()
+            if not chunk:
+                continue
+
+            if "-" in chunk:
+                start_str, end_str = chunk.split("-", maxsplit=1)
+                start = int(start_str)
+                end = int(end_str)
+                if start > end:
+                    raise ValueError(f"Invalid range '{chunk}': start cannot be greater than end.")
+                intervals.append((start, end))
+            else:
+                port = int(chunk)
+                intervals.append((port, port))
+
+        if not intervals:
+            raise ValueError("No ports were provided.")
+
+        return cls(intervals)
+
+    @classmethod
+    def from_ports(cls, ports: Iterable[int]) -> "PortSpec":
+        return cls((port, port) for port in ports)
+
+    def intervals(self) -> List[Tuple[int, int]]:
+        return list(zip(self._starts, self._ends))
+
+    def chunks(self, size: int) -> Iterator["PortSpec"]:
+        """Split into consecutive PortSpecs of at most ``size`` ports."""
+        size = max(1, int(size))
+        for begin in range(0, self._length, size):
+            yield self[begin:begin + size]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __bool__(self) -> bool:
+        return self._length > 0
+
+    def __contains__(self, port: object) -> bool:
+        if not isinstance(port, int):
+            return False
+        position = bisect_right(self._starts, port) - 1
+        return position >= 0 and port <= self._ends[position]
+
+    def __iter__(self) -> Iterator[int]:
+        for start, end in zip(self._starts, self._ends):
+            yield from range(start, end + 1)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            begin, stop, step = index.indices(self._length)
+            if step != 1:
+                return list(islice(self, begin, stop, step))
+            return self._slice(begin, stop)
+
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("PortSpec index out of range")
+        position = bisect_right(self._offsets, index) - 1
+        return self._starts[position] + index - self._offsets[position]
+
+    def _slice(self, begin: int, stop: int) -> "PortSpec":
+        if begin >= stop:
+            return PortSpec()
+        return PortSpec(self._index_intervals(begin, stop))
+
+    def _index_intervals(self, begin: int, stop: int) -> Iterator[Tuple[int, int]]:
+        position = bisect_right(self._offsets, begin) - 1
+        while position < len(self._starts) and self._offsets[position] < stop:
+            offset = self._offsets[position]
+            start = self._starts[position] + max(0, begin - offset)
+            end = min(self._ends[position], self._starts[position] + (stop - 1 - offset))
+            yield start, end
+            position += 1
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, PortSpec):
+            return self._starts == other._starts and self._ends == other._ends
+        if isinstance(other, (list, tuple)):
+            return len(other) == self._length and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((tuple(self._starts), tuple(self._ends)))
+
+    def __str__(self) -> str:
+        return ",".join(
+            str(start) if start == end else f"{start}-{end}"
+            for start, end in zip(self._starts, self._ends)
+        )
+
+    def __repr__(self) -> str:
+        return f"PortSpec('{self}')"
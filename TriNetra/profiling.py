@@ -0,0 +1,158 @@
+"""Where a scan spends its time.
+
+A ScanProfile is handed to scan_hosts_iter() / scan_ports_iter() /
+scan_ports() (``profile=``) and, by the CLI's ``--profile``, to the
+stages around the scan. It collects:
+
+* per-phase time: resolve, discovery, probe, service, render, database.
+  Probes and service grabs overlap (they are pipelined), and service
+  time is summed over the grabs running in parallel, so phase times can
+  add up to more than the wall time;
+* a latency histogram per probe outcome (OPEN, CLOSED, FILTERED, ERROR).
+  Connect engines time each attempt from the moment it is taken off the
+  work queue; SYN engines time each reply from its SYN, and count ports
+  that never answered without a latency;
+* retries: probes re-sent in later passes (connect engines; SYN engines
+  re-send inside their own sweep).
+
+Everything is kept as fixed-size counters, so profiling a /16 costs no
+more memory than profiling one host, and profiles from worker processes
+can be merged with merge().
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+PHASES = ("resolve", "discovery", "probe", "service", "render", "database")
+
+# Upper bucket edges in milliseconds; a final bucket catches anything slower.
+LATENCY_BUCKETS_MS = (0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class _Histogram:
+    __slots__ = ("buckets", "count", "unanswered", "total", "maximum")
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.unanswered = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, milliseconds: float) -> None:
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, milliseconds)] += 1
+        self.count += 1
+        self.total += milliseconds
+        self.maximum = max(self.maximum, milliseconds)
+
+    def percentile(self, fraction: float) -> float | None:
+        """Upper edge of the bucket holding the ``fraction`` quantile, capped at the slowest sample."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= rank and bucket:
+                return min(LATENCY_BUCKETS_MS[index], self.maximum) if index < len(LATENCY_BUCKETS_MS) else self.maximum
+        return self.maximum
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "count": self.count,
+            "unanswered": self.unanswered,
+            "total_ms": self.total,
+            "max_ms": self.maximum,
+            "p50_ms": self.percentile(0.50),
+            "p99_ms": self.percentile(0.99),
+            "buckets": [
+                {"le_ms": edge, "count": count}
+                for edge, count in zip(list(LATENCY_BUCKETS_MS) + [None], self.buckets)
+            ],
+        }
+
+
+class ScanProfile:
+    """Thread-safe collector of phase times, probe latencies and retries."""
+
+    def __init__(self) -> None:
+        self.phase_seconds: Dict[str, float] = {phase: 0.0 for phase in PHASES}
+        self.phase_calls: Dict[str, int] = {phase: 0 for phase in PHASES}
+        self.retries = 0
+        self.retry_passes = 0
+        self._histograms: Dict[str, _Histogram] = {}
+        self._started = time.perf_counter()
+        self._wall: float | None = None
+        self._lock = threading.Lock()
+
+    def add_time(self, phase: str, seconds: float, calls: int = 1) -> None:
+        with self._lock:
+            self.phase_seconds[phase] = self.phase_seconds.get(phase, 0.0) + seconds
+            self.phase_calls[phase] = self.phase_calls.get(phase, 0) + calls
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def record_probe(self, status: str, seconds: float | None) -> None:
+        """Count one probe outcome; ``seconds`` is None for a port that never answered."""
+        with self._lock:
+            histogram = self._histograms.get(status)
+            if histogram is None:
+                histogram = self._histograms[status] = _Histogram()
+            if seconds is None:
+                histogram.unanswered += 1
+            else:
+                histogram.add(seconds * 1000)
+
+    def record_retries(self, count: int) -> None:
+        with self._lock:
+            self.retries += count
+            self.retry_passes += 1
+
+    def finish(self) -> None:
+        """Freeze the wall time; to_dict() uses the time so far until this is called."""
+        self._wall = time.perf_counter() - self._started
+
+    def merge(self, data: Dict[str, object]) -> None:
+        """Add a to_dict() result (for example from a worker process) into this profile."""
+        with self._lock:
+            for phase, values in data["phases"].items():
+                self.phase_seconds[phase] = self.phase_seconds.get(phase, 0.0) + values["seconds"]
+                self.phase_calls[phase] = self.phase_calls.get(phase, 0) + values["calls"]
+            self.retries += data["retries"]
+            self.retry_passes = max(self.retry_passes, data["retry_passes"])
+            for status, values in data["latency"].items():
+                histogram = self._histograms.get(status)
+                if histogram is None:
+                    histogram = self._histograms[status] = _Histogram()
+                for index, bucket in enumerate(values["buckets"]):
+                    histogram.buckets[index] += bucket["count"]
+                histogram.count += values["count"]
+                histogram.unanswered += values["unanswered"]
+                histogram.total += values["total_ms"]
+                histogram.maximum = max(histogram.maximum, values["max_ms"])
+
+    def to_dict(self) -> Dict[str, object]:
+        with self._lock:
+            wall = self._wall if self._wall is not None else time.perf_counter() - self._started
+            return {
+                "wall_seconds": wall,
+                "phases": {
+                    phase: {"seconds": seconds, "calls": self.phase_calls.get(phase, 0)}
+                    for phase, seconds in self.phase_seconds.items()
+                },
+                "retries": self.retries,
+                "retry_passes": self.retry_passes,
+                "latency": {status: histogram.to_dict() for status, histogram in sorted(self._histograms.items())},
+            }
+
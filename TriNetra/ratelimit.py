@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Dict
+
+
+class RateLimiter:
+    """Token bucket pacing probes (connections or packets) per second.
+
+    One limiter is shared by every worker of a scan, whatever the engine:
+    threads call acquire(), coroutines await acquire_async(), and SYN
+    senders call acquire() once per packet.
+
+    Outcomes fed through record() drive congestion backoff. Every
+    ``window`` results the share of FILTERED (timed-out) probes is compared
+    with its running baseline; a sharp rise halves the rate (never below
+    ``min_rate``), while a calm window adds back a small fraction of the
+    configured rate. A target that is simply firewalled raises the
+    baseline too, so it does not cause endless backoff.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float | None = None,
+        min_rate: float | None = None,
+        window: int = 64,
+        spike_threshold: float = 0.25,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("Rate must be greater than zero.")
+
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = float(min_rate) if min_rate else max(1.0, self.max_rate / 20)
+        self.burst = float(burst) if burst else max(1.0, self.max_rate / 10)
+        self.window = max(8, int(window))
+        self.spike_threshold = spike_threshold
+        self.backoffs = 0
+
+        self._tokens = self.burst
+        self._last_refill = time.monotonic()
+        self._window_total = 0
+        self._window_timeouts = 0
+        self._baseline: float | None = None
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def record(self, status: str) -> None:
+        with self._lock:
+            self._window_total += 1
+            if status == "FILTERED":
+                self._window_timeouts += 1
+            if self._window_total < self.window:
+                return
+
+            share = self._window_timeouts / self._window_total
+            self._window_total = 0
+            self._window_timeouts = 0
+
+            baseline = self._baseline
+            if baseline is not None and share > baseline + self.spike_threshold:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self.backoffs += 1
+            elif baseline is not None and share <= baseline:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+            self._baseline = share if baseline is None else 0.8 * baseline + 0.2 * share
+
+    def snapshot(self) -> Dict[str, float | int]:
+        with self._lock:
+            return {
+                "max_rate": self.max_rate,
+                "rate": self.rate,
+                "backoffs": self.backoffs,
+            }
@@ -0,0 +1,297 @@
+"""Stateless SYN scanning on Linux raw sockets, without scapy.
+
+Probes are hand-built IPv4/TCP packets written to an IPPROTO_RAW socket.
+Each SYN carries a sequence-number cookie derived from the connection
+4-tuple and a per-process secret, so a reply is accepted only if its ACK
+number equals cookie + 1 — no per-probe state is kept while waiting.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import random
+import select
+import socket
+import struct
+import threading
+import time
+from typing import Callable, Dict, Iterable, Set
+
+from .scanner import _RAW_SOCKETS_AVAILABLE, _normalize_timeout
+from .ratelimit import RateLimiter
+from .timing import RttEstimator
+
+_COOKIE_SECRET = os.urandom(16)
+
+_TCP_SYN = 0x02
+_TCP_RST = 0x04
+_TCP_ACK = 0x10
+
+# MSS=1460 option, so the SYN looks like one from a normal stack.
+_TCP_OPTIONS = struct.pack("!BBH", 2, 4, 1460)
+
+
+def _checksum(data: bytes) -> int:
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    while total >> 16:
+        total = (total & 0xFFFF) + (total >> 16)
+    return ~total & 0xFFFF
+
+
+def _source_address(ip_address: str) -> str:
+    """Ask the routing table which local address would be used for ``ip_address``."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+        probe.connect((ip_address, 9))
+        return probe.getsockname()[0]
+
+
+def syn_cookie(source: str, destination: str, source_port: int, destination_port: int) -> int:
+    """Return the 32-bit initial sequence number for a probe 4-tuple."""
+    digest = hashlib.blake2b(
+        socket.inet_aton(source)
+        + socket.inet_aton(destination)
+        + struct.pack("!HH", source_port, destination_port),
+        key=_COOKIE_SECRET,
+        digest_size=4,
+    ).digest()
+    return struct.unpack("!I", digest)[0]
+
+
+def build_syn_packet(source: str, destination: str, source_port: int, destination_port: int) -> bytes:
+    """Build a complete IPv4 + TCP SYN packet carrying the sequence cookie."""
+    source_raw = socket.inet_aton(source)
+    destination_raw = socket.inet_aton(destination)
+    sequence = syn_cookie(source, destination, source_port, destination_port)
+
+    data_offset = (20 + len(_TCP_OPTIONS)) // 4
+    tcp_header = struct.pack(
+        "!HHIIBBHHH",
+        source_port,
+        destination_port,
+        sequence,
+        0,
+        data_offset << 4,
+        _TCP_SYN,
+        1024,
+        0,
+        0,
+    ) + _TCP_OPTIONS
+    pseudo_header = source_raw + destination_raw + struct.pack("!BBH", 0, socket.IPPROTO_TCP, len(tcp_header))
+    tcp_checksum = _checksum(pseudo_header + tcp_header)
+    tcp_header = tcp_header[:16] + struct.pack("!H", tcp_checksum) + tcp_header[18:]
+
+    ip_header = struct.pack(
+        "!BBHHHBBH4s4s",
+        (4 << 4) | 5,
+        0,
+        20 + len(tcp_header),
+        random.getrandbits(16),
+        0,
+        64,
+        socket.IPPROTO_TCP,
+        0,
+        source_raw,
+        destination_raw,
+    )
+    ip_header = ip_header[:10] + struct.pack("!H", _checksum(ip_header)) + ip_header[12:]
+    return ip_header + tcp_header
+
+
+def parse_reply(packet: bytes, local_address: str, source_port: int | None = None) -> tuple[int, str] | None:
+    """Validate a raw TCP reply and return (port, status), or None.
+
+    A reply is ours only if it is addressed to ``local_address`` (and to
+    ``source_port``, when given) and acknowledges the cookie our SYN would
+    have carried for that 4-tuple.
+    """
+    if len(packet) < 20:
+        return None
+
+    header_length = (packet[0] & 0x0F) * 4
+    if packet[9] != socket.IPPROTO_TCP or len(packet) < header_length + 20:
+        return None
+
+    source = socket.inet_ntoa(packet[12:16])
+    destination = socket.inet_ntoa(packet[16:20])
+    if destination != local_address:
+        return None
+
+    remote_port, local_port, _, ack_number, _, flags = struct.unpack(
+        "!HHIIBB", packet[header_length:header_length + 14]
+    )
+    if not flags & _TCP_ACK:
+        return None
+    if source_port is not None and local_port != source_port:
+        return None
+
+    expected = (syn_cookie(destination, source, local_port, remote_port) + 1) & 0xFFFFFFFF
+    if ack_number != expected:
+        return None
+
+    if flags & (_TCP_SYN | _TCP_ACK) == (_TCP_SYN | _TCP_ACK):
+        return remote_port, "OPEN"
+    if flags & _TCP_RST:
+        return remote_port, "CLOSED"
+    return None
+
+
+def _receive_replies(
+    receiver: socket.socket,
+    ip_address: str,
+    local_address: str,
+    statuses: Dict[int, str],
+    lock: threading.Lock,
+    stop: threading.Event,
+    on_result: Callable[[int, str], None] | None,
+    rtt: RttEstimator | None,
+    sent_at: Dict[int, float],
+    on_sample: Callable[[int, float], None] | None = None,
+    source_port: int | None = None,
+    wanted: Set[int] | None = None,
+    answered: threading.Event | None = None,
+) -> None:
+    # Every raw TCP socket sees every reply, so concurrent sessions to the
+    # same host must drop replies to another session's source port or ports.
+    while not stop.is_set():
+        readable, _, _ = select.select([receiver], [], [], 0.05)
+        if not readable:
+            continue
+        try:
+            packet = receiver.recv(65535)
+        except OSError:
+            continue
+
+        if len(packet) < 20 or socket.inet_ntoa(packet[12:16]) != ip_address:
+            continue
+
+        reply = parse_reply(packet, local_address, source_port)
+        if reply is None:
+            continue
+
+        port, status = reply
+        if wanted is not None and port not in wanted:
+            continue
+        with lock:
+            # The first reply is final, so on_result fires once per port.
+            previous = statuses.get(port)
+            if previous is not None:
+                continue
+            statuses[port] = status
+            if answered is not None and wanted is not None and len(statuses) >= len(wanted):
+                answered.set()
+        if port in sent_at:
+            delay = time.monotonic() - sent_at[port]
+            if rtt is not None:
+                rtt.update(delay)
+            if on_sample is not None:
+                on_sample(port, delay)
+        if on_result is not None:
+            on_result(port, status)
+
+
+def raw_syn_scan(
+    ip_address: str,
+    ports: Iterable[int],
+    timeout: float = 0.8,
+    rate: float | None = 1000.0,
+    retry_count: int = 1,
+    on_result: Callable[[int, str], None] | None = None,
+    rtt: RttEstimator | None = None,
+    limiter: RateLimiter | None = None,
+    on_sample: Callable[[int, float], None] | None = None,
+) -> Dict[int, str]:
+    """SYN-scan ``ports`` on an IPv4 target using only the standard library.
+
+    Same contract as synscan.batch_syn_scan(). SYNs are paced by a shared
+    ``limiter`` or else at ``rate`` packets per second; a ``rate`` of None
+    or zero sends them unpaced. Unanswered ports are re-sent
+    ``retry_count`` times, and anything still silent is FILTERED.
+    ``on_result`` is called from the receiver thread as replies arrive;
+    ``rtt`` and ``on_sample`` behave as in batch_syn_scan(). Only replies
+    to this call's source port and port list count, so concurrent scans of
+    one host keep their results apart. Each wait for replies ends early
+    once every port has answered. Requires Linux and root.
+    """
+    if not _RAW_SOCKETS_AVAILABLE:
+        raise RuntimeError("Raw-socket SYN scanning is only supported on Linux.")
+
+    port_list = list(dict.fromkeys(ports))
+    statuses: Dict[int, str] = {}
+    if not port_list:
+        return statuses
+
+    effective_timeout = _normalize_timeout(timeout)
+    if limiter is None and rate and rate > 0:
+        limiter = RateLimiter(rate)
+    local_address = _source_address(ip_address)
+    source_port = random.randint(40000, 60000)
+    lock = threading.Lock()
+    stop = threading.Event()
+    # Set by the receiver once every port has a reply, ending the wait early.
+    answered = threading.Event()
+    # Send times exist only to feed the RTT estimator and on_sample; reply
+    # matching itself stays stateless.
+    sent_at: Dict[int, float] = {}
+
+    sender = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_RAW)
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP)
+    listener = threading.Thread(
+        target=_receive_replies,
+        args=(
+            receiver, ip_address, local_address, statuses, lock, stop, on_result, rtt, sent_at, on_sample,
+            source_port, set(port_list), answered,
+        ),
+        daemon=True,
+    )
+    listener.start()
+
+    try:
+        pending = port_list
+        for _ in range(max(1, int(retry_count) + 1)):
+            for port in pending:
+                if limiter is not None:
+                    limiter.acquire()
+                packet = build_syn_packet(local_address, ip_address, source_port, port)
+                # Stamped before sending: on loopback the reply can beat
+                # the line after sendto().
+                if rtt is not None or on_sample is not None:
+                    sent_at[port] = time.monotonic()
+                try:
+                    sender.sendto(packet, (ip_address, 0))
+                except OSError:
+                    continue
+
+            answered.wait(rtt.timeout() if rtt is not None else effective_timeout)
+            with lock:
+                if limiter is not None:
+                    for port in pending:
+                        limiter.record(statuses.get(port, "FILTERED"))
+                pending = [port for port in pending if port not in statuses]
+            if not pending:
+                break
+    finally:
+        stop.set()
+        listener.join()
+        sender.close()
+        receiver.close()
+
+    for port in port_list:
+        statuses.setdefault(port, "FILTERED")
+    return statuses
+
+
+def raw_syn_scan_port(
+    ip_address: str,
+    port: int,
+    timeout: float = 0.8,
+    retry_count: int = 1,
+    rtt: RttEstimator | None = None,
+) -> str:
+    """SYN-probe one port; returns as soon as its reply arrives.
+
+    An ``rtt`` estimator gets the SYN-to-reply delay, as in raw_syn_scan().
+    """
+    return raw_syn_scan(ip_address, [port], timeout, retry_count=retry_count, rtt=rtt)[port]
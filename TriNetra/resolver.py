@@ -0,0 +1,221 @@
+"""Cached, TTL-respecting name resolution for scan targets.
+
+Answers are cached per name in a bounded LRU, and the A/AAAA records' own
+TTLs decide how long an entry lives. Those TTLs come from dnspython, which
+requirements.txt installs. Without it the module runs in a reduced mode:
+getaddrinfo() reports no TTL, so every entry lives for a fixed
+``default_ttl`` seconds. Names DNS does not know (NXDOMAIN or no A/AAAA
+records, such as /etc/hosts entries) also go through getaddrinfo() with
+the fixed TTL. Failed lookups are cached briefly too, so a typo repeated
+on every web request does not hit DNS each time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    import dns.exception
+    import dns.resolver
+    _DNSPYTHON_AVAILABLE = True
+except ImportError:
+    dns = None
+    _DNSPYTHON_AVAILABLE = False
+
+DEFAULT_TTL = 300.0
+NEGATIVE_TTL = 30.0
+DEFAULT_CACHE_SIZE = 1024
+
+# Parallel lookups in resolve_many().
+DEFAULT_RESOLVE_WORKERS = 32
+
+
+def is_ip_literal(name: str) -> bool:
+    try:
+        ipaddress.ip_address(name)
+    except ValueError:
+        return False
+    return True
+
+
+def _cache_key(name: str) -> str:
+    return name.lower().rstrip(".")
+
+
+def _order_addresses(addresses: Iterable[str]) -> List[str]:
+    """De-duplicate, keeping IPv4 first (SYN engines are IPv4-only) and lookup order otherwise."""
+    unique = list(dict.fromkeys(addresses))
+    return [address for address in unique if ":" not in address] + [
+        address for address in unique if ":" in address
+    ]
+
+
+class Resolver:
+    """Resolve hostnames to every A/AAAA address, with a bounded TTL cache."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_SIZE,
+        default_ttl: float = DEFAULT_TTL,
+        negative_ttl: float = NEGATIVE_TTL,
+        use_dnspython: bool | None = None,
+    ) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.default_ttl = float(default_ttl)
+        self.negative_ttl = float(negative_ttl)
+        if use_dnspython is None:
+            use_dnspython = _DNSPYTHON_AVAILABLE
+        self.use_dnspython = use_dnspython and _DNSPYTHON_AVAILABLE
+        self.hits = 0
+        self.misses = 0
+        # name -> (expires_at, addresses or the error to re-raise)
+        self._cache: "OrderedDict[str, Tuple[float, List[str] | OSError]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, key: str) -> List[str] | OSError | None:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._cache[key]
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def _store(self, key: str, value: List[str] | OSError, ttl: float) -> None:
+        with self._lock:
+            self._cache[key] = (time.monotonic() + max(0.0, ttl), value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def _lookup_dnspython(self, name: str) -> Tuple[List[str], float]:
+        addresses: List[str] = []
+        ttls: List[float] = []
+        for record_type in ("A", "AAAA"):
+            try:
+                answer = dns.resolver.resolve(name, record_type)
+            except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN):
+                continue
+            except dns.exception.DNSException as error:
+                raise socket.gaierror(socket.EAI_AGAIN, f"DNS lookup failed for {name}: {error}") from None
+            addresses.extend(record.to_text() for record in answer)
+            ttls.append(float(answer.rrset.ttl))
+
+        if not addresses:
+            raise socket.gaierror(socket.EAI_NONAME, f"No A or AAAA records for {name}")
+        return addresses, min(ttls)
+
+    def _lookup_system(self, name: str) -> Tuple[List[str], float]:
+        infos = socket.getaddrinfo(name, None, proto=socket.IPPROTO_TCP)
+        return [info[4][0] for info in infos if info[0] in (socket.AF_INET, socket.AF_INET6)], self.default_ttl
+
+    def _lookup(self, name: str) -> Tuple[List[str], float]:
+        if self.use_dnspython:
+            try:
+                return self._lookup_dnspython(name)
+            except socket.gaierror as error:
+                if error.errno != socket.EAI_NONAME:
+                    raise
+            # NXDOMAIN / no records in DNS: the name may still live in
+            # /etc/hosts or another nsswitch source.
+        return self._lookup_system(name)
+
+    def _resolve_uncached(self, key: str) -> List[str]:
+        try:
+            addresses, ttl = self._lookup(key)
+        except OSError as error:
+            self._store(key, error, self.negative_ttl)
+            raise
+
+        addresses = _order_addresses(addresses)
+        if not addresses:
+            error = socket.gaierror(socket.EAI_NONAME, f"No addresses for {key}")
+            self._store(key, error, self.negative_ttl)
+            raise error
+        self._store(key, addresses, ttl)
+        return list(addresses)
+
+    def resolve(self, name: str) -> List[str]:
+        """Return every address for ``name`` (IPv4 first). Raises socket.gaierror on failure."""
+        name = name.strip()
+        if is_ip_literal(name):
+            return [str(ipaddress.ip_address(name))]
+
+        key = _cache_key(name)
+        cached = self._cached(key)
+        if isinstance(cached, OSError):
+            raise cached
+        if cached is not None:
+            return list(cached)
+        return self._resolve_uncached(key)
+
+    def resolve_many(self, names: Iterable[str], max_workers: int = DEFAULT_RESOLVE_WORKERS) -> Dict[str, List[str] | OSError]:
+        """Resolve many names in parallel; failures are returned, not raised."""
+        unique = list(dict.fromkeys(names))
+        results: Dict[str, List[str] | OSError] = {}
+        if not unique:
+            return results
+
+        def attempt(name: str) -> List[str] | OSError:
+            try:
+                return self.resolve(name)
+            except OSError as error:
+                return error
+
+        with ThreadPoolExecutor(max_workers=max(1, min(int(max_workers), len(unique)))) as pool:
+            for name, outcome in zip(unique, pool.map(attempt, unique)):
+                results[name] = outcome
+        return results
+
+    async def resolve_async(self, name: str) -> List[str]:
+        """Awaitable resolve(): cache hits return at once, misses run off the event loop."""
+        name = name.strip()
+        if is_ip_literal(name):
+            return [str(ipaddress.ip_address(name))]
+
+        key = _cache_key(name)
+        cached = self._cached(key)
+        if isinstance(cached, OSError):
+            raise cached
+        if cached is not None:
+            return list(cached)
+        return await asyncio.get_running_loop().run_in_executor(None, self._resolve_uncached, key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+
+_default_resolver: Resolver | None = None
+_default_lock = threading.Lock()
+
+
+def default_resolver() -> Resolver:
+    """The process-wide resolver shared by the CLI, the web views and resolve_target()."""
+    global _default_resolver
+    if _default_resolver is None:
+        with _default_lock:
+            if _default_resolver is None:
+                _default_resolver = Resolver()
+    return _default_resolver
+
+
+def resolve_all(name: str) -> List[str]:
+    return default_resolver().resolve(name)
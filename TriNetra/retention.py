@@ -0,0 +1,188 @@
+"""Age out old scan history without long write locks.
+
+prune_scans() applies a two-step retention policy:
+
+* runs older than ``detail_days`` are rolled up: the per-status counts
+  go into ``scan_run_summaries`` and everything but the OPEN rows (and
+  any compact port-state blob) is deleted, so the run keeps its open
+  ports with service and version;
+* runs older than ``delete_days`` (if given) are deleted outright, along
+  with checkpoints of that age.
+
+Deletes run in batches of ``batch_size`` rows, each its own short
+transaction, so scans and the web app can keep writing in between.
+Freed pages are then handed back to the file system with
+``PRAGMA incremental_vacuum``. New databases are created with
+``auto_vacuum=INCREMENTAL``; an older file needs one full VACUUM to
+switch over, which enable_incremental_vacuum() does.
+"""
+
+from __future__ import annotations
+
+import json
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import List, NamedTuple, Tuple
+
+from .database import expand_port_states, get_connection
+
+# Rows deleted per transaction.
+PRUNE_BATCH = 500
+
+# Pages released per incremental_vacuum step.
+VACUUM_STEP = 1000
+
+_AUTO_VACUUM_INCREMENTAL = 2
+
+
+class PruneReport(NamedTuple):
+    runs_rolled_up: int
+    runs_deleted: int
+    rows_deleted: int
+    pages_freed: int
+
+
+def _cutoff(days: float, now: datetime | None = None) -> str:
+    return ((now or datetime.now(timezone.utc)) - timedelta(days=days)).isoformat()
+
+
+def _delete_in_batches(connection, table: str, where: str, parameters: tuple, batch_size: int) -> int:
+    """DELETE matching rows ``batch_size`` at a time, committing after each batch."""
+    deleted = 0
+    while True:
+        cursor = connection.execute(
+            f"DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} WHERE {where} LIMIT ?)",
+            (*parameters, batch_size),
+        )
+        connection.commit()
+        deleted += cursor.rowcount
+        if cursor.rowcount < batch_size:
+            return deleted
+
+
+def _status_counts(connection, run_id: int) -> Counter:
+    counts: Counter = Counter(
+        dict(connection.execute("SELECT status, COUNT(*) FROM scan_results WHERE run_id = ? GROUP BY status", (run_id,)))
+    )
+    row = connection.execute("SELECT states FROM scan_port_states WHERE run_id = ?", (run_id,)).fetchone()
+    if row is not None:
+        counts.update(status for _, status in expand_port_states(row[0]))
+    return counts
+
+
+def _roll_up(connection, cutoff: str, batch_size: int) -> Tuple[int, int]:
+    # Unfinished runs are left alone so their scans can still be resumed.
+    run_ids: List[int] = [
+        run_id
+        for (run_id,) in connection.execute(
+            """
+            SELECT id FROM scan_runs
+            WHERE started_at < ? AND finished_at IS NOT NULL
+              AND (
+                  NOT EXISTS (SELECT 1 FROM scan_run_summaries WHERE run_id = scan_runs.id)
+                  OR EXISTS (SELECT 1 FROM scan_port_states WHERE run_id = scan_runs.id)
+                  OR EXISTS (SELECT 1 FROM scan_results WHERE run_id = scan_runs.id AND status != 'OPEN')
+              )
+            ORDER BY id
+            """,
+            (cutoff,),
+        )
+    ]
+    rows_deleted = 0
+    for run_id in run_ids:
+        # Counts are taken once; a rerun after an interruption keeps them.
+        summary = connection.execute("SELECT 1 FROM scan_run_summaries WHERE run_id = ?", (run_id,)).fetchone()
+        if summary is None:
+            connection.execute(
+                "INSERT INTO scan_run_summaries(run_id, status_counts, rolled_up_at) VALUES (?, ?, ?)",
+                (run_id, json.dumps(dict(_status_counts(connection, run_id))), datetime.now(timezone.utc).isoformat()),
+            )
+        connection.execute("DELETE FROM scan_port_states WHERE run_id = ?", (run_id,))
+        connection.commit()
+        rows_deleted += _delete_in_batches(
+            connection, "scan_results", "run_id = ? AND status != 'OPEN'", (run_id,), batch_size
+        )
+    return len(run_ids), rows_deleted
+
+
+def _delete_runs(connection, cutoff: str, batch_size: int) -> Tuple[int, int]:
+    run_ids = [
+        run_id
+        for (run_id,) in connection.execute("SELECT id FROM scan_runs WHERE started_at < ? ORDER BY id", (cutoff,))
+    ]
+    rows_deleted = 0
+    for run_id in run_ids:
+        # Result rows go in batches first, so the cascade below only has
+        # the run's single-row port states and summary left to remove.
+        rows_deleted += _delete_in_batches(connection, "scan_results", "run_id = ?", (run_id,), batch_size)
+        connection.execute("DELETE FROM scan_runs WHERE id = ?", (run_id,))
+        connection.commit()
+    _delete_in_batches(connection, "scan_checkpoints", "timestamp < ?", (cutoff,), batch_size)
+    return len(run_ids), rows_deleted
+
+
+def reclaim_space(db_path: str, step: int = VACUUM_STEP) -> int:
+    """Release free pages with incremental vacuum, ``step`` pages at a time; returns pages freed.
+
+    Does nothing unless the database uses ``auto_vacuum=INCREMENTAL``.
+    """
+    connection = get_connection(db_path)
+    if connection.execute("PRAGMA auto_vacuum").fetchone()[0] != _AUTO_VACUUM_INCREMENTAL:
+        return 0
+    freed = 0
+    while True:
+        free = connection.execute("PRAGMA freelist_count").fetchone()[0]
+        if not free:
+            break
+        # executescript() steps the pragma to completion; execute() frees one page.
+        connection.executescript(f"PRAGMA incremental_vacuum({min(free, max(1, int(step)))})")
+        remaining = connection.execute("PRAGMA freelist_count").fetchone()[0]
+        if remaining >= free:
+            break
+        freed += free - remaining
+    # Shrink the WAL file too, now that the freed pages are out of the database.
+    connection.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    return freed
+
+
+def enable_incremental_vacuum(db_path: str) -> bool:
+    """Switch an existing database to ``auto_vacuum=INCREMENTAL``; returns True if it changed.
+
+    This runs a full VACUUM, which rewrites the file and locks it while
+    it runs, so do it once at a quiet time.
+    """
+    connection = get_connection(db_path)
+    if connection.execute("PRAGMA auto_vacuum").fetchone()[0] == _AUTO_VACUUM_INCREMENTAL:
+        return False
+    connection.commit()
+    connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    connection.execute("VACUUM")
+    return True
+
+
+def prune_scans(
+    db_path: str,
+    detail_days: float = 30,
+    delete_days: float | None = None,
+    batch_size: int = PRUNE_BATCH,
+    vacuum: bool = True,
+    now: datetime | None = None,
+) -> PruneReport:
+    """Roll up runs older than ``detail_days`` and delete runs older than ``delete_days``.
+
+    Call initialize_database() first. With ``vacuum`` the freed pages are
+    returned to the file system afterwards (see reclaim_space()).
+    """
+    if detail_days < 0 or (delete_days is not None and delete_days < 0):
+        raise ValueError("Retention periods must be zero or more days.")
+    if delete_days is not None and delete_days < detail_days:
+        raise ValueError("The full-detail period cannot be longer than the retention period.")
+    batch_size = max(1, int(batch_size))
+
+    connection = get_connection(db_path)
+    runs_deleted = rows_deleted = 0
+    if delete_days is not None:
+        runs_deleted, rows_deleted = _delete_runs(connection, _cutoff(delete_days, now), batch_size)
+    runs_rolled_up, rolled_rows = _roll_up(connection, _cutoff(detail_days, now), batch_size)
+    pages_freed = reclaim_space(db_path) if vacuum else 0
+    return PruneReport(runs_rolled_up, runs_deleted, rows_deleted + rolled_rows, pages_freed)
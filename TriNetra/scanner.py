@@ -2,12 +2,22 @@ from __future__ import annotations
 
 import errno
 import os
+import queue
 import random
 import re
 import socket
+import sys
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, Iterable, List, Tuple
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
+
+from .portspec import PortSpec
+from .profiling import ScanProfile
+from .ratelimit import RateLimiter
+from .resolver import resolve_all
+from .services import service_name
+from .timing import RttEstimator
 
 try:
     from scapy.all import IP, TCP, sr1
@@ -16,34 +26,33 @@ except Exception:
     IP = TCP = sr1 = None
     _SCAPY_AVAILABLE = False
 
+# Hand-built SYN packets (TriNetra.rawsyn) need Linux raw-socket semantics.
+_RAW_SOCKETS_AVAILABLE = sys.platform.startswith("linux") and hasattr(socket, "SOCK_RAW")
 
-def parse_port_range(port_range: str) -> List[int]:
-    """Parse a port range string such as '1-1024' or '22,80,443'."""
-    port_set = set()
+SCAN_ENGINES = ("auto", "thread", "async", "syn", "rawsyn")
 
-    for chunk in port_range.split(","):
-        chunk = chunk.strip()
-        if not chunk:
-            continue
+# Default SYN send rate (packets per second) when no explicit rate is given.
+DEFAULT_SYN_RATE = 1000.0
 
-        if "-" in chunk:
-            start_str, end_str = chunk.split("-", maxsplit=1)
-            start = int(start_str)
-            end = int(end_str)
-            if start > end:
-                raise ValueError(f"Invalid range '{chunk}': start cannot be greater than end.")
-            port_set.update(range(start, end + 1))
-        else:
-            port_set.add(int(chunk))
+# Concurrent banner grabs in the service-detection stage of scan_ports().
+DEFAULT_SERVICE_WORKERS = 16
+
+# Hosts the SYN engines scan side by side in a multi-host scan; each one
+# holds its own sniffer and sender socket.
+SYN_HOST_PARALLELISM = 8
 
-    if not port_set:
-        raise ValueError("No ports were provided.")
+# Delay before the first retry pass over FILTERED/ERROR ports; it doubles
+# for every further pass.
+RETRY_BACKOFF = 0.25
 
-    ports = sorted(port_set)
-    if ports[0] < 1 or ports[-1] > 65535:
-        raise ValueError("Ports must be in the range 1-65535.")
 
-    return ports
+def parse_port_range(port_range: str) -> PortSpec:
+    """Parse a port range string such as '1-1024' or '22,80,443'.
+
+    Returns a PortSpec (merged intervals), which behaves like the sorted,
+    de-duplicated list of ports this used to build.
+    """
+    return PortSpec.parse(port_range)
 
 
 def is_root() -> bool:
@@ -56,14 +65,48 @@ def is_root() -> bool:
 def get_scan_mode_message() -> str:
     if is_root() and _SCAPY_AVAILABLE:
         return "[INFO] Running privileged SYN scan (root detected)"
+    if is_root() and _RAW_SOCKETS_AVAILABLE:
+        return "[INFO] Running raw-socket SYN scan (root detected, scapy unavailable)"
     if is_root() and not _SCAPY_AVAILABLE:
         return "[INFO] Running TCP connect scan (scapy unavailable)"
     return "[INFO] Running TCP connect scan (non-root mode)"
 
 
+def resolve_engine(engine: str) -> str:
+    """Validate an engine name and turn "auto" into a concrete engine.
+
+    "auto" prefers the scapy SYN engine, then the stdlib raw-socket one,
+    then plain connect() threads. SYN engines silently degrade to "thread"
+    when raw packets are not available, mirroring how syn_scan_port()
+    falls back to check_port().
+    """
+    if engine not in SCAN_ENGINES:
+        raise ValueError(f"Unknown scan engine '{engine}'. Choose from: {', '.join(SCAN_ENGINES)}.")
+
+    scapy_syn = is_root() and _SCAPY_AVAILABLE
+    raw_syn = is_root() and _RAW_SOCKETS_AVAILABLE
+    if engine == "auto":
+        if scapy_syn:
+            return "syn"
+        return "rawsyn" if raw_syn else "thread"
+    if engine == "syn" and not scapy_syn:
+        return "rawsyn" if raw_syn else "thread"
+    if engine == "rawsyn" and not raw_syn:
+        return "thread"
+    return engine
+
+
 def resolve_target(target: str) -> str:
-    """Resolve a target domain or IP to an IPv4 address."""
-    return socket.gethostbyname(target)
+    """Resolve a target domain or IP to one address, preferring IPv4.
+
+    Lookups go through the shared TTL cache in TriNetra.resolver; use
+    resolve_all() there to get every A/AAAA record.
+    """
+    return resolve_all(target)[0]
+
+
+def address_family(ip_address: str) -> int:
+    return socket.AF_INET6 if ":" in ip_address else socket.AF_INET
 
 
 def _state_priority(status: str) -> int:
@@ -158,63 +201,133 @@ def _classify_errno(error_number: int | None) -> str:
 
 
 def _standard_service_name(port: int) -> str:
+    return service_name(port)
+
+
+# Ports that stay silent until the client speaks; they get an HTTP nudge.
+_HTTP_NUDGE_PORTS = {80, 8080, 8000, 8888, 443}
+
+_VERSION_PATTERN = re.compile(
+    r"(OpenSSH[_\-/ ]?[0-9A-Za-z.]+|nginx[/ ]?[0-9.]+|Apache[/ ]?[0-9.]+|cloudflare|Postfix[/ ]?[0-9A-Za-z.]+|Exim[/ ]?[0-9A-Za-z.]+|Microsoft-IIS/[0-9.]+)",
+    flags=re.IGNORECASE,
+)
+
+
+def _read_banner(sock: socket.socket, port: int) -> str:
+    """Send the port-appropriate nudge on a connected socket and read once."""
+    if port in _HTTP_NUDGE_PORTS:
+        try:
+            sock.sendall(b"HEAD / HTTP/1.0\r\nHost: target\r\n\r\n")
+        except OSError:
+            pass
+
     try:
-        return socket.getservbyport(port, "tcp").upper()
+        banner = sock.recv(1024)
     except OSError:
+        return ""
+
+    return banner.decode("utf-8", errors="ignore") if banner else ""
+
+
+def _service_from_banner(banner: str) -> str:
+    banner_text = banner.strip().lower()
+    if not banner_text:
         return "Unknown"
 
+    if "ssh-" in banner_text:
+        return "SSH"
+    if "ftp" in banner_text:
+        return "FTP"
+    if "smtp" in banner_text:
+        return "SMTP"
+    if "mysql" in banner_text:
+        return "MySQL"
+    if "postgres" in banner_text or "postgresql" in banner_text:
+        return "PostgreSQL"
+    if "redis" in banner_text:
+        return "Redis"
+    if "mongo" in banner_text or "mongodb" in banner_text:
+        return "MongoDB"
+    if "http/" in banner_text or "server:" in banner_text or "content-type:" in banner_text:
+        if "https" in banner_text:
+            return "HTTPS"
+        return "HTTP"
+
+    return "Unknown"
+
+
+def _version_from_banner(text: str) -> str:
+    if not text:
+        return ""
+
+    server_line = next(
+        (
+            line.split(":", 1)[1].strip()
+            for line in text.splitlines()
+            if line.lower().startswith("server:")
+        ),
+        "",
+    )
+    if server_line:
+        return server_line[:80]
+
+    match = _VERSION_PATTERN.search(text)
+    if match:
+        return match.group(1).replace("_", " ")[:80]
+
+    first_line = text.strip().splitlines()[0].strip() if text.strip() else ""
+    return first_line[:80]
+
+
+def _identify(port: int, banner: str) -> Tuple[str, str]:
+    """Derive (service, version) from a single banner read.
+
+    The service-table name wins for standard ports, exactly as in
+    detect_service(); the banner decides only for unknown ports.
+    """
+    service = _standard_service_name(port)
+    if service == "Unknown":
+        service = _service_from_banner(banner)
+    return service, _version_from_banner(banner)
+
 
 def _detect_banner_service(ip_address: str, port: int, timeout: float) -> str:
     try:
         with socket.create_connection((ip_address, port), timeout=timeout) as sock:
             sock.settimeout(timeout)
+            return _service_from_banner(_read_banner(sock, port))
+    except OSError:
+        return "Unknown"
 
-            if port in {80, 8080, 8000, 8888}:
-                try:
-                    sock.sendall(b"HEAD / HTTP/1.0\r\nHost: target\r\n\r\n")
-                except OSError:
-                    pass
 
-            try:
-                banner = sock.recv(1024)
-            except OSError:
-                return "Unknown"
-
-            if not banner:
-                return "Unknown"
-
-            banner_text = banner.decode("utf-8", errors="ignore").strip().lower()
-
-            if "ssh-" in banner_text:
-                return "SSH"
-            if "ftp" in banner_text:
-                return "FTP"
-            if "smtp" in banner_text:
-                return "SMTP"
-            if "mysql" in banner_text:
-                return "MySQL"
-            if "postgres" in banner_text or "postgresql" in banner_text:
-                return "PostgreSQL"
-            if "redis" in banner_text:
-                return "Redis"
-            if "mongo" in banner_text or "mongodb" in banner_text:
-                return "MongoDB"
-            if "http/" in banner_text or "server:" in banner_text or "content-type:" in banner_text:
-                if "https" in banner_text:
-                    return "HTTPS"
-                return "HTTP"
+def grab_service(ip_address: str, port: int, timeout: float = 1.0) -> Tuple[str, str]:
+    """Open one connection to a known-open port and return (service, version).
+
+    Replaces a detect_service() + detect_service_version() pair, which
+    would connect twice and read the same banner twice.
+    """
+    if not _is_valid_port(port):
+        raise ValueError(f"Invalid port {port}. Port must be in the range 1-65535.")
+
+    effective_timeout = _normalize_timeout(timeout)
+
+    try:
+        with socket.create_connection((ip_address, port), timeout=effective_timeout) as sock:
+            sock.settimeout(effective_timeout)
+            banner = _read_banner(sock, port)
     except OSError:
-        return "Unknown"
+        banner = ""
 
-    return "Unknown"
+    return _identify(port, banner)
 
 
 def detect_service(ip_address: str, port: int, timeout: float = 1.0) -> str:
-    """Detect service using stdlib mapping and banner grabbing.
+    """Detect service using the precomputed service table and banner grabbing.
 
     Priority order (matches Nmap basic behaviour):
-      1. socket.getservbyport() — authoritative for standard ports.
-      2. Banner grabbing — used ONLY when getservbyport returns Unknown.
+      1. TriNetra.services table (/etc/services plus project names) —
+         authoritative for standard ports, an O(1) lookup with no syscall.
+      2. Banner grabbing — used ONLY when the table returns Unknown.
     This ensures common ports (80→HTTP, 443→HTTPS, 22→SSH …) are never
     overridden by ambiguous banner text.
     """
@@ -223,7 +336,7 @@ def detect_service(ip_address: str, port: int, timeout: float = 1.0) -> str:
 
     effective_timeout = _normalize_timeout(timeout)
 
-    # --- First priority: OS / IANA service database ---
+    # --- First priority: precomputed OS / IANA / project service table ---
     standard = _standard_service_name(port)
     if standard != "Unknown":
         return standard
@@ -238,7 +351,7 @@ def detect_service(ip_address: str, port: int, timeout: float = 1.0) -> str:
 
 def _probe_once(ip_address: str, port: int, timeout: float) -> str:
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        with socket.socket(address_family(ip_address), socket.SOCK_STREAM) as sock:
             sock.settimeout(timeout)
             result_code = sock.connect_ex((ip_address, port))
 
@@ -260,14 +373,24 @@ def _probe_once(ip_address: str, port: int, timeout: float) -> str:
         return "ERROR"
 
 
-def syn_scan_port(ip_address: str, port: int, timeout: float = 0.8) -> str:
+def syn_scan_port(
+    ip_address: str,
+    port: int,
+    timeout: float = 0.8,
+    rtt: RttEstimator | None = None,
+) -> str:
+    """SYN-probe one port with scapy's sr1().
+
+    With an ``rtt`` estimator, the SYN-to-reply delay of an OPEN or CLOSED
+    answer is fed to it.
+    """
     if not _is_valid_port(port):
         raise ValueError(f"Invalid port {port}. Port must be in the range 1-65535.")
 
     effective_timeout = _normalize_timeout(timeout)
 
     if not (is_root() and _SCAPY_AVAILABLE):
-        return check_port(ip_address, port, effective_timeout, retry_count=1)
+        return check_port(ip_address, port, effective_timeout, retry_count=1, rtt=rtt)
 
     try:
         packet = IP(dst=ip_address) / TCP(dport=port, flags="S")
@@ -280,9 +403,16 @@ def syn_scan_port(ip_address: str, port: int, timeout: float = 0.8) -> str:
             tcp_layer = response.getlayer(TCP)
             flags = int(tcp_layer.flags)
             if flags & 0x12 == 0x12:
-                return "OPEN"
-            if flags & 0x04:
-                return "CLOSED"
+                status = "OPEN"
+            elif flags & 0x04:
+                status = "CLOSED"
+            else:
+                return "FILTERED"
+            # sr1() stamps the sent packet, so this is the SYN-to-reply delay.
+            sent_time = getattr(packet, "sent_time", None)
+            if rtt is not None and sent_time:
+                rtt.update(float(response.time) - float(sent_time))
+            return status
 
         return "FILTERED"
     except PermissionError:
@@ -293,17 +423,71 @@ def syn_scan_port(ip_address: str, port: int, timeout: float = 0.8) -> str:
         return "ERROR"
 
 
-def scan_port(ip_address: str, port: int, timeout: float = 0.8, retry_count: int = 1) -> str:
-    if is_root() and _SCAPY_AVAILABLE:
-        return syn_scan_port(ip_address, port, timeout)
-    return check_port(ip_address, port, timeout, retry_count)
+def scan_port(
+    ip_address: str,
+    port: int,
+    timeout: float = 0.8,
+    retry_count: int = 1,
+    rtt: RttEstimator | None = None,
+    limiter: RateLimiter | None = None,
+) -> str:
+    if _can_syn_probe(ip_address):
+        if limiter is not None:
+            limiter.acquire()
+        probe_timeout = rtt.timeout() if rtt is not None else timeout
+        # The SYN engines sample the SYN-to-reply delay themselves; the
+        # wall time of the call includes socket and sniffer setup.
+        status = _syn_probe(ip_address, port, probe_timeout, retry_count, rtt)
+        if limiter is not None:
+            limiter.record(status)
+        return status
+    return check_port(ip_address, port, timeout, retry_count, rtt, limiter)
+
+
+def _can_syn_probe(ip_address: str) -> bool:
+    """Raw SYN probes need root and are built for IPv4 only."""
+    return ":" not in ip_address and is_root() and (_SCAPY_AVAILABLE or _RAW_SOCKETS_AVAILABLE)
+
+
+def _syn_probe(
+    ip_address: str,
+    port: int,
+    timeout: float,
+    retry_count: int,
+    rtt: RttEstimator | None = None,
+) -> str:
+    if _SCAPY_AVAILABLE:
+        return syn_scan_port(ip_address, port, timeout, rtt)
+
+    from .rawsyn import raw_syn_scan_port
+
+    if not _is_valid_port(port):
+        raise ValueError(f"Invalid port {port}. Port must be in the range 1-65535.")
+    try:
+        return raw_syn_scan_port(ip_address, port, timeout, retry_count, rtt)
+    except OSError:
+        return check_port(ip_address, port, timeout, retry_count, rtt)
+
+
+def _is_rtt_sample(status: str) -> bool:
+    # Only a completed handshake or an RST proves the round trip finished.
+    return status in ("OPEN", "CLOSED")
 
 
-def check_port(ip_address: str, port: int, timeout: float = 0.8, retry_count: int = 1) -> str:
+def check_port(
+    ip_address: str,
+    port: int,
+    timeout: float = 0.8,
+    retry_count: int = 1,
+    rtt: RttEstimator | None = None,
+    limiter: RateLimiter | None = None,
+) -> str:
     """Check a single TCP port and return OPEN/CLOSED/FILTERED/ERROR.
 
     Signature remains compatible with existing calls using
-    check_port(ip_address, port, timeout).
+    check_port(ip_address, port, timeout). When an ``rtt`` estimator is
+    given, each attempt uses its current timeout and feeds it a sample;
+    a ``limiter`` paces every attempt and is told its outcome.
     """
     if not _is_valid_port(port):
         raise ValueError(f"Invalid port {port}. Port must be in the range 1-65535.")
@@ -313,7 +497,15 @@ def check_port(ip_address: str, port: int, timeout: float = 0.8, retry_count: in
     best_status = "ERROR"
 
     for attempt_index in range(attempts):
-        status = _probe_once(ip_address, port, effective_timeout)
+        if limiter is not None:
+            limiter.acquire()
+        attempt_timeout = rtt.timeout() if rtt is not None else effective_timeout
+        started = time.monotonic()
+        status = _probe_once(ip_address, port, attempt_timeout)
+        if rtt is not None and _is_rtt_sample(status):
+            rtt.update(time.monotonic() - started)
+        if limiter is not None:
+            limiter.record(status)
 
         if status == "OPEN":
             return "OPEN"
@@ -336,92 +528,608 @@ def detect_service_version(ip_address: str, port: int, timeout: float = 1.0) ->
     try:
         with socket.create_connection((ip_address, port), timeout=effective_timeout) as sock:
             sock.settimeout(effective_timeout)
-
-            if port in {80, 8080, 8000, 8888, 443}:
-                try:
-                    sock.sendall(b"HEAD / HTTP/1.0\r\nHost: target\r\n\r\n")
-                except OSError:
-                    pass
-
-            try:
-                banner = sock.recv(1024)
-            except OSError:
-                return ""
-
-            if not banner:
-                return ""
-
-            text = banner.decode("utf-8", errors="ignore")
-
-            server_line = next(
-                (
-                    line.split(":", 1)[1].strip()
-                    for line in text.splitlines()
-                    if line.lower().startswith("server:")
-                ),
-                "",
-            )
-            if server_line:
-                return server_line[:80]
-
-            match = re.search(
-                r"(OpenSSH[_\-/ ]?[0-9A-Za-z.]+|nginx[/ ]?[0-9.]+|Apache[/ ]?[0-9.]+|cloudflare|Postfix[/ ]?[0-9A-Za-z.]+|Exim[/ ]?[0-9A-Za-z.]+|Microsoft-IIS/[0-9.]+)",
-                text,
-                flags=re.IGNORECASE,
-            )
-            if match:
-                return match.group(1).replace("_", " ")[:80]
-
-            first_line = text.strip().splitlines()[0].strip() if text.strip() else ""
-            return first_line[:80]
+            return _version_from_banner(_read_banner(sock, port))
     except OSError:
         return ""
 
 
-def scan_ports(
+def _connect_once(
     ip_address: str,
-    ports: Iterable[int],
+    port: int,
+    timeout: float,
+    rtt: RttEstimator | None = None,
+    started: float = 0.0,
+) -> Tuple[str, socket.socket | None]:
+    """Connect once and return (status, socket); the socket is kept only when OPEN.
+
+    The caller owns (and must close) a returned socket. The RTT sample is
+    taken right after connect, before anything is read.
+    """
+    sock = None
+    try:
+        sock = socket.socket(address_family(ip_address), socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        result_code = sock.connect_ex((ip_address, port))
+        status = "OPEN" if result_code == 0 else _classify_errno(result_code)
+    except socket.timeout:
+        status = "FILTERED"
+    except ConnectionRefusedError:
+        status = "CLOSED"
+    except OSError as error:
+        status = _classify_errno(getattr(error, "errno", None))
+    except Exception:
+        status = "ERROR"
+
+    if rtt is not None and _is_rtt_sample(status):
+        rtt.update(time.monotonic() - started)
+    if status != "OPEN" and sock is not None:
+        sock.close()
+        sock = None
+    return status, sock
+
+
+def _identify_connected(sock: socket.socket, port: int, versions: bool = True) -> Tuple[str, str]:
+    """Identify an open port from the socket its probe connected.
+
+    With ``versions`` this is grab_service() on an existing connection;
+    without, it follows detect_service() and reads the banner only when
+    the service table has no name for the port.
+    """
+    if versions:
+        return _identify(port, _read_banner(sock, port))
+    service = _standard_service_name(port)
+    if service == "Unknown":
+        service = _service_from_banner(_read_banner(sock, port))
+    return service, ""
+
+
+def _probe_and_grab_once(
+    ip_address: str,
+    port: int,
+    timeout: float,
+    rtt: RttEstimator | None = None,
+    started: float = 0.0,
+) -> Tuple[str, str]:
+    """Connect once; on success keep the socket and read the banner from it."""
+    status, sock = _connect_once(ip_address, port, timeout, rtt, started)
+    if sock is None:
+        return status, ""
+    with sock:
+        return "OPEN", _read_banner(sock, port)
+
+
+def probe_and_grab(
+    ip_address: str,
+    port: int,
     timeout: float = 0.8,
-    max_threads: int = 100,
     retry_count: int = 1,
-) -> List[Tuple[int, str, str]]:
-    """Scan ports concurrently and return a list of (port, service, status).
+    rtt: RttEstimator | None = None,
+    limiter: RateLimiter | None = None,
+) -> Tuple[str, str, str]:
+    """Connect-scan a port and identify it over the same connection.
+
+    Returns (status, service, version). An open port costs one handshake
+    instead of the three used by check_port() + detect_service() +
+    detect_service_version(). Retries, ``rtt`` and ``limiter`` follow
+    check_port().
+    """
+    if not _is_valid_port(port):
+        raise ValueError(f"Invalid port {port}. Port must be in the range 1-65535.")
+
+    effective_timeout = _normalize_timeout(timeout)
+    attempts = max(1, int(retry_count) + 1)
+    best_status = "ERROR"
+
+    for attempt_index in range(attempts):
+        if limiter is not None:
+            limiter.acquire()
+        attempt_timeout = rtt.timeout() if rtt is not None else effective_timeout
+        started = time.monotonic()
+        status, banner = _probe_and_grab_once(ip_address, port, attempt_timeout, rtt, started)
+        if limiter is not None:
+            limiter.record(status)
 
-    The return order matches the input order.
+        if status == "OPEN":
+            service, version = _identify(port, banner)
+            return "OPEN", service, version
+
+        if _state_priority(status) > _state_priority(best_status):
+            best_status = status
+
+        if attempt_index < attempts - 1:
+            time.sleep(random.uniform(0.01, 0.05))
+
+    return best_status, "Unknown", ""
+
+
+def scan_and_identify(
+    ip_address: str,
+    port: int,
+    timeout: float = 0.8,
+    retry_count: int = 1,
+    rtt: RttEstimator | None = None,
+    limiter: RateLimiter | None = None,
+) -> Tuple[str, str, str]:
+    """Return (status, service, version) with the fewest connections.
+
+    Connect scans use probe_and_grab(); privileged SYN scans never complete
+    a handshake, so open ports get exactly one grab_service() connection.
     """
-    port_list = list(ports)
-    if not port_list:
-        return []
+    if _can_syn_probe(ip_address):
+        status = scan_port(ip_address, port, timeout, retry_count, rtt, limiter)
+        if status != "OPEN":
+            return status, "Unknown", ""
+        service, version = grab_service(ip_address, port, timeout)
+        return status, service, version
+
+    return probe_and_grab(ip_address, port, timeout, retry_count, rtt, limiter)
+
 
+def _validated_ports(ports: Iterable[int]) -> Sequence[int]:
+    """Return ``ports`` as a sequence, checking bounds unless already a PortSpec."""
+    if isinstance(ports, PortSpec):
+        return ports
+
+    port_list = list(ports)
     invalid_ports = [port for port in port_list if not _is_valid_port(port)]
     if invalid_ports:
         invalid_preview = ", ".join(str(port) for port in invalid_ports[:10])
         suffix = "..." if len(invalid_ports) > 10 else ""
         raise ValueError(f"Invalid ports found: {invalid_preview}{suffix}. Valid range is 1-65535.")
+    return port_list
 
-    effective_timeout = _normalize_timeout(timeout)
+
+def _needs_retry(status: str) -> bool:
+    return status in ("FILTERED", "ERROR")
+
+
+def _retry_delay(pass_index: int) -> float:
+    """Backoff before retry pass ``pass_index`` (1-based), with jitter."""
+    base = RETRY_BACKOFF * (2 ** (pass_index - 1))
+    return base + random.uniform(0, base / 2)
+
+
+def _interleave(hosts: Sequence[str], ports: Iterable[int]) -> Iterator[Tuple[str, int]]:
+    """Yield (host, port) work items port-major, so consecutive probes go
+    to different hosts and no single host takes the whole window."""
+    for port in ports:
+        for host in hosts:
+            yield host, port
+
+
+def _probe_keeping_socket(
+    ip_address: str,
+    port: int,
+    timeout: float,
+    rtt: RttEstimator | None,
+    limiter: RateLimiter | None,
+) -> Tuple[str, socket.socket | None]:
+    """One scan_port() attempt that hands back the connected socket of an open port.
+
+    SYN probes never complete a handshake, so they return no socket.
+    """
+    if _can_syn_probe(ip_address):
+        return scan_port(ip_address, port, timeout, 0, rtt, limiter), None
+    if limiter is not None:
+        limiter.acquire()
+    attempt_timeout = rtt.timeout() if rtt is not None else _normalize_timeout(timeout)
+    status, sock = _connect_once(ip_address, port, attempt_timeout, rtt, time.monotonic())
+    if limiter is not None:
+        limiter.record(status)
+    return status, sock
+
+
+def _thread_probe_pass(
+    items: Iterable[Tuple[str, int]],
+    count: int,
+    timeout: float,
+    max_threads: int,
+    rtt_for: Callable[[str], RttEstimator | None],
+    limiter: RateLimiter | None,
+    on_result: Callable[[str, int, str, socket.socket | None], None],
+    stop: threading.Event | None = None,
+) -> None:
+    """Probe each (host, port) exactly once on a thread pool, reporting as they finish.
+
+    At most two futures per worker exist at any time; new items are pulled
+    from ``items`` only as earlier probes complete, and none are started
+    once ``stop`` is set. ``on_result`` also gets the still-connected
+    socket of an open port found by a connect probe (None otherwise).
+    """
     safe_max_threads = max(1, min(int(max_threads), 200))
-    worker_count = max(1, min(safe_max_threads, len(port_list)))
-    results_by_index: Dict[int, Tuple[int, str, str]] = {}
-
-    with ThreadPoolExecutor(max_workers=worker_count) as executor:
-        future_to_index = {
-            executor.submit(scan_port, ip_address, port, effective_timeout, retry_count): index
-            for index, port in enumerate(port_list)
-        }
-
-        for future in as_completed(future_to_index):
-            index = future_to_index[future]
-            port = port_list[index]
+    worker_count = max(1, min(safe_max_threads, count))
+    window = worker_count * 2
+    item_iter = iter(items)
+
+    with ThreadPoolExecutor(max_workers=worker_count) as probe_pool:
+        in_flight: Dict[Future, Tuple[str, int]] = {}
+
+        def refill() -> None:
+            while len(in_flight) < window and not (stop is not None and stop.is_set()):
+                item = next(item_iter, None)
+                if item is None:
+                    return
+                host, port = item
+                future = probe_pool.submit(_probe_keeping_socket, host, port, timeout, rtt_for(host), limiter)
+                in_flight[future] = item
+
+        refill()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                host, port = in_flight.pop(future)
+                try:
+                    status, sock = future.result()
+                except Exception:
+                    status, sock = "ERROR", None
+                on_result(host, port, status, sock)
+            refill()
+
+
+def _run_scan(
+    hosts: Sequence[str],
+    ports: Sequence[int],
+    timeout: float,
+    max_threads: int,
+    retry_count: int,
+    engine: str,
+    concurrency: int,
+    limiter: RateLimiter | None,
+    service_workers: int,
+    rtt_for: Callable[[str], RttEstimator | None],
+    versions: bool,
+    emit: Callable[[tuple], None],
+    stop: threading.Event,
+    profile: ScanProfile | None = None,
+) -> None:
+    """Drive one scan, calling ``emit`` once per (host, port) with its final result.
+
+    Only probes that may still change state are remembered: FILTERED/ERROR
+    ones awaiting a retry pass. OPEN and CLOSED are final on first sight.
+    """
+    retry_states: Dict[Tuple[str, int], str] = {}
+    lock = threading.Lock()
+
+    def enrich(host: str, port: int, sock: socket.socket | None = None) -> None:
+        started = time.perf_counter()
+        try:
+            if sock is not None:
+                # Read from the probe's own connection: one handshake per open port.
+                with sock:
+                    sock.settimeout(timeout)
+                    service, version = _identify_connected(sock, port, versions)
+            elif versions:
+                service, version = grab_service(host, port, timeout)
+            else:
+                service, version = detect_service(host, port, timeout), ""
+        except Exception:
+            service, version = "Unknown", ""
+        if profile is not None:
+            profile.add_time("service", time.perf_counter() - started)
+        emit((host, port, service, version, "OPEN") if versions else (host, port, service, "OPEN"))
+
+    with ThreadPoolExecutor(max_workers=max(1, int(service_workers))) as service_pool:
+
+        def finish(host: str, port: int, status: str, sock: socket.socket | None = None) -> None:
+            if status == "OPEN":
+                service_pool.submit(enrich, host, port, sock)
+                return
+            if sock is not None:
+                sock.close()
+            if versions:
+                emit((host, port, "Unknown", "", status))
+            else:
+                emit((host, port, "Unknown", status))
+
+        if engine in ("syn", "rawsyn"):
+            if engine == "syn":
+                from .synscan import batch_syn_scan as syn_engine
+            else:
+                from .rawsyn import raw_syn_scan as syn_engine
+
+            syn_limiter = limiter or RateLimiter(DEFAULT_SYN_RATE)
+
+            # SYN engines already re-send only to unanswered ports, within
+            # one sniffer session, so they take retry_count directly. They
+            # report each reply once; silent ports surface at the end.
+            def scan_host(host: str) -> None:
+                if stop.is_set():
+                    return
+                samples: Dict[int, float] = {}
+
+                def on_result(port: int, status: str) -> None:
+                    if profile is not None:
+                        profile.record_probe(status, samples.pop(port, None))
+                    finish(host, port, status)
+
+                final_statuses = syn_engine(
+                    host,
+                    ports,
+                    timeout,
+                    retry_count=retry_count,
+                    on_result=on_result,
+                    rtt=rtt_for(host),
+                    limiter=syn_limiter,
+                    on_sample=samples.__setitem__ if profile is not None else None,
+                )
+                for port, status in final_statuses.items():
+                    if status not in ("OPEN", "CLOSED"):
+                        if profile is not None:
+                            profile.record_probe(status, None)
+                        finish(host, port, status)
+
+            # The SYN engines build IPv4 packets only, so IPv6 hosts fall
+            # through to connect probes below.
+            syn_hosts = [host for host in hosts if ":" not in host]
+            hosts = [host for host in hosts if ":" in host]
+
+            # Each host needs its own sniffer, so hosts run side by side
+            # (sharing one rate limit) rather than as interleaved items.
+            if syn_hosts:
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=min(len(syn_hosts), SYN_HOST_PARALLELISM)) as host_pool:
+                    for _ in host_pool.map(scan_host, syn_hosts):
+                        pass
+                if profile is not None:
+                    profile.add_time("probe", time.perf_counter() - started)
+            if not hosts or stop.is_set():
+                return
+            engine = "thread"
+
+        last_pass = max(0, int(retry_count))
+        taken_at: Dict[Tuple[str, int], float] = {}
+
+        def timed(items: Iterable[Tuple[str, int]]) -> Iterator[Tuple[str, int]]:
+            # Engines pull items lazily, right before probing them.
+            for item in items:
+                taken_at[item] = time.perf_counter()
+                yield item
+
+        def record(host: str, port: int, status: str, sock: socket.socket | None = None) -> None:
+            key = (host, port)
+            if profile is not None:
+                started = taken_at.pop(key, None)
+                profile.record_probe(status, None if started is None else time.perf_counter() - started)
+            with lock:
+                previous = retry_states.pop(key, "")
+                best = status if _state_priority(status) > _state_priority(previous) else previous
+                if _needs_retry(best) and pass_index < last_pass and not stop.is_set():
+                    retry_states[key] = best
+                    return
+            finish(host, port, best, sock)
+
+        pending: Iterable[Tuple[str, int]] = _interleave(hosts, ports)
+        count = len(hosts) * len(ports)
+        for pass_index in range(last_pass + 1):
+            if pass_index:
+                time.sleep(_retry_delay(pass_index))
+
+            started = time.perf_counter()
+            if profile is not None:
+                if pass_index:
+                    profile.record_retries(count)
+                pending = timed(pending)
+            if engine == "async":
+                from .asyncscan import async_probe_targets
+
+                async_probe_targets(pending, count, timeout, concurrency, rtt_for, limiter, record, stop, keep_open=True)
+            else:
+                _thread_probe_pass(pending, count, timeout, max_threads, rtt_for, limiter, record, stop)
+            if profile is not None:
+                profile.add_time("probe", time.perf_counter() - started)
+
+            with lock:
+                pending = sorted(retry_states, key=lambda key: (key[1], key[0]))
+            count = len(pending)
+            if not pending or stop.is_set():
+                break
+
+        # Anything still held back was skipped by a stop request.
+        for host, port in pending:
+            finish(host, port, retry_states.pop((host, port)))
+
+
+def _stream(
+    run: Callable[[Callable[[object], None], threading.Event], None],
+    buffer_size: int,
+) -> Iterator[tuple]:
+    """Run ``run(emit, stop)`` on a background thread and yield what it emits.
+
+    Results pass through a queue of ``buffer_size`` entries, so a slow
+    consumer throttles the producer instead of piling up results. Closing
+    the generator sets ``stop`` and waits for the producer to wind down.
+    """
+    results: queue.Queue = queue.Queue(maxsize=max(1, int(buffer_size)))
+    stop = threading.Event()
+    done = object()
+
+    def emit(item: object) -> None:
+        while not stop.is_set():
             try:
-                status = future.result()
-            except Exception:
-                status = "ERROR"
+                results.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def produce() -> None:
+        try:
+            run(emit, stop)
+        except BaseException as error:
+            emit(error)
+        else:
+            emit(done)
 
-            service = "Unknown"
-            if status == "OPEN":
-                service = detect_service(ip_address, port, effective_timeout)
+    producer = threading.Thread(target=produce, name="trinetra-scan", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = results.get()
+            if item is done:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        producer.join()
+
+
+def scan_ports_iter(
+    ip_address: str,
+    ports: Iterable[int],
+    timeout: float = 0.8,
+    max_threads: int = 100,
+    retry_count: int = 1,
+    engine: str = "auto",
+    concurrency: int = 1000,
+    rate: float | None = None,
+    service_workers: int = DEFAULT_SERVICE_WORKERS,
+    rtt: RttEstimator | None = None,
+    buffer_size: int = 256,
+    versions: bool = False,
+    limiter: RateLimiter | None = None,
+    profile: ScanProfile | None = None,
+) -> Iterator[tuple]:
+    """Scan ports concurrently, yielding (port, service, status) as each finishes.
+
+    Every port is yielded exactly once, in completion order, with its final
+    state. ``engine`` selects how probes run: "thread" uses a pool of up to
+    ``max_threads`` blocking workers, "async" keeps up to ``concurrency``
+    non-blocking connects in flight on one asyncio event loop, and "syn"
+    sends raw SYNs at ``rate`` packets per second and matches the replies
+    with a single sniffer. "rawsyn" does the same with hand-built packets
+    on Linux raw sockets when scapy is missing. "auto" picks the best
+    engine available (see resolve_engine()).
+
+    ``ports`` may be any iterable of ints or a PortSpec; a PortSpec is used
+    as-is, without copying or re-validating it.
+
+    Every port gets a single attempt in the first sweep. OPEN and CLOSED
+    ports are yielded straight away; only ports whose best state so far is
+    FILTERED or ERROR are held back and re-queued, for up to
+    ``retry_count`` later passes with a growing backoff between them.
+
+    ``rate`` caps probes (connections or SYN packets) per second through a
+    RateLimiter shared by all workers, which also backs off on its own when
+    the share of timeouts spikes; pass ``limiter`` instead to share one
+    across scans. SYN engines default to DEFAULT_SYN_RATE.
+
+    Service detection is a separate stage: every OPEN port is handed to
+    its own pool of ``service_workers`` threads as soon as it is found, so
+    slow banner grabs never hold up the probe stage. Connect probes ("thread"
+    and "async") hand over the socket they connected, so the stage reads
+    the banner from it and an open port costs one handshake; after a SYN
+    probe the stage opens one connection itself. With ``versions`` the
+    stage identifies service and version from that banner, as
+    grab_service() does, and results become (port, service, version,
+    status) tuples. Ports that are not OPEN get service "Unknown" (and
+    version "").
+
+    Passing an ``rtt`` estimator turns on adaptive timeouts: probes use its
+    smoothed-RTT timeout instead of ``timeout``, and its snapshot() holds
+    the final RTT statistics once the scan is done.
+
+    The scan runs on a background thread and hands results over through a
+    queue of ``buffer_size`` entries, so a slow consumer throttles the
+    probes instead of piling up results. Closing the generator early (for
+    example breaking out of a loop) stops new probes from being started.
+    See scan_hosts_iter() for several hosts at once.
+
+    Pass a ScanProfile as ``profile`` to collect probe and service time,
+    per-outcome probe latency histograms and retry counts (see
+    TriNetra.profiling).
+
+    Arguments are checked when this is called, so a bad ``engine`` or port
+    raises ValueError here rather than on the first next().
+    """
+    results = scan_hosts_iter(
+        [ip_address], ports, timeout, max_threads, retry_count, engine, concurrency, rate,
+        service_workers, {ip_address: rtt} if rtt is not None else None, buffer_size, versions, limiter,
+        profile,
+    )
+    return (tuple(result) for _, *result in results)
 
-            results_by_index[index] = (port, service, status)
 
-    return [results_by_index[index] for index in range(len(port_list))]
+def scan_hosts_iter(
+    hosts: Sequence[str],
+    ports: Iterable[int],
+    timeout: float = 0.8,
+    max_threads: int = 100,
+    retry_count: int = 1,
+    engine: str = "auto",
+    concurrency: int = 1000,
+    rate: float | None = None,
+    service_workers: int = DEFAULT_SERVICE_WORKERS,
+    rtt: Mapping[str, RttEstimator] | None = None,
+    buffer_size: int = 256,
+    versions: bool = False,
+    limiter: RateLimiter | None = None,
+    profile: ScanProfile | None = None,
+) -> Iterator[tuple]:
+    """Scan the same ports on several hosts, yielding (host, port, service, status).
+
+    Takes the arguments of scan_ports_iter(), except that ``rtt`` maps each
+    host address to its own RttEstimator (hosts without one use the fixed
+    timeout). Connect engines draw probes from one host-interleaved queue
+    (port 1 on every host, then port 2, ...), so the worker window is spread
+    across all hosts: none of them is flooded and throughput grows with the
+    number of hosts rather than being capped by one host's timeouts. SYN
+    engines run up to SYN_HOST_PARALLELISM hosts side by side under the
+    shared rate limit. Hosts may be IPv4 or IPv6 addresses; the SYN engines
+    build IPv4 packets only, so IPv6 hosts get connect probes on the thread
+    engine while IPv4 hosts in the same scan keep the SYN engine.
+    """
+    engine = resolve_engine(engine)
+
+    host_list = list(dict.fromkeys(hosts))
+    port_list = _validated_ports(ports)
+    if not host_list or not port_list:
+        return iter(())
+    if not isinstance(port_list, PortSpec):
+        port_list = list(dict.fromkeys(port_list))
+
+    effective_timeout = _normalize_timeout(timeout)
+    if limiter is None and rate and rate > 0:
+        limiter = RateLimiter(rate)
+    estimators = dict(rtt or {})
+
+    def run(emit: Callable[[object], None], stop: threading.Event) -> None:
+        _run_scan(
+            host_list, port_list, effective_timeout, max_threads, retry_count, engine, concurrency,
+            limiter, service_workers, estimators.get, versions, emit, stop, profile,
+        )
+
+    return _stream(run, buffer_size)
+
+
+def scan_ports(
+    ip_address: str,
+    ports: Iterable[int],
+    timeout: float = 0.8,
+    max_threads: int = 100,
+    retry_count: int = 1,
+    engine: str = "auto",
+    concurrency: int = 1000,
+    rate: float | None = None,
+    service_workers: int = DEFAULT_SERVICE_WORKERS,
+    rtt: RttEstimator | None = None,
+    profile: ScanProfile | None = None,
+) -> List[Tuple[int, str, str]]:
+    """Scan ports concurrently and return a list of (port, service, status).
+
+    Collects scan_ports_iter() (same arguments) into a list whose order
+    matches the input order. Use scan_ports_iter() directly to consume
+    results as they arrive.
+    """
+    port_list = _validated_ports(ports)
+    found: Dict[int, Tuple[str, str]] = {}
+    for port, service, status in scan_ports_iter(
+        ip_address, port_list, timeout, max_threads, retry_count, engine,
+        concurrency, rate, service_workers, rtt, profile=profile,
+    ):
+        found[port] = (service, status)
+
+    return [
+        (port, *found.get(port, ("Unknown", "ERROR")))
+        for port in port_list
+    ]
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+# Project naming for well-known ports; wins over the system services file.
+COMMON_PORT_SERVICES: Dict[int, str] = {
+    20: "FTP-Data",
+    21: "FTP",
+    22: "SSH",
+    23: "Telnet",
+    25: "SMTP",
+    53: "DNS",
+    67: "DHCP Server",
+    68: "DHCP Client",
+    80: "HTTP",
+    110: "POP3",
+    123: "NTP",
+    143: "IMAP",
+    161: "SNMP",
+    389: "LDAP",
+    443: "HTTPS",
+    445: "SMB",
+    465: "SMTPS",
+    587: "SMTP Submission",
+    993: "IMAPS",
+    995: "POP3S",
+    1433: "MSSQL",
+    1521: "Oracle DB",
+    3306: "MySQL",
+    3389: "RDP",
+    5432: "PostgreSQL",
+    5900: "VNC",
+    6379: "Redis",
+    8080: "HTTP-Alt",
+    8443: "HTTPS-Alt",
+    27017: "MongoDB",
+}
+
+_TABLE_SIZE = 65536
+
+_table: Sequence[str] | None = None
+_table_lock = threading.Lock()
+
+
+def _services_file_candidates() -> List[Path]:
+    candidates = [Path("/etc/services")]
+    system_root = os.environ.get("SystemRoot")
+    if system_root:
+        candidates.append(Path(system_root) / "System32" / "drivers" / "etc" / "services")
+    return candidates
+
+
+def _parse_services_file(path: Path) -> Dict[int, str]:
+    """Read TCP entries from a services(5) file; the first name per port wins."""
+    names: Dict[int, str] = {}
+    try:
+        lines = path.read_text(encoding="utf-8", errors="ignore").splitlines()
+    except OSError:
+        return names
+
+    for line in lines:
+        fields = line.split("#", 1)[0].split()
+        if len(fields) < 2 or "/" not in fields[1]:
+            continue
+
+        port_text, protocol = fields[1].split("/", 1)
+        if protocol.lower() != "tcp" or not port_text.isdigit():
+            continue
+
+        port = int(port_text)
+        if 0 < port < _TABLE_SIZE:
+            names.setdefault(port, fields[0].upper())
+
+    return names
+
+
+def _build_table() -> Sequence[str]:
+    table = ["Unknown"] * _TABLE_SIZE
+    for path in _services_file_candidates():
+        if path.is_file():
+            for port, name in _parse_services_file(path).items():
+                table[port] = name
+            break
+
+    for port, name in COMMON_PORT_SERVICES.items():
+        table[port] = name
+    return tuple(table)
+
+
+def service_table() -> Sequence[str]:
+    """Return the port -> service name table, built once per process.
+
+    The table has an entry for every port 0-65535, so lookups are plain
+    indexing with no getservbyport() syscalls or NSS round trips.
+    """
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                _table = _build_table()
+    return _table
+
+
+def service_name(port: int) -> str:
+    if not 0 <= port < _TABLE_SIZE:
+        return "Unknown"
+    return service_table()[port]
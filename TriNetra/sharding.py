@@ -0,0 +1,226 @@
+"""Shard large scans across worker processes.
+
+With thousands of probes in flight, the Python side of a scan (socket
+setup, errno classification, banner decoding, version regexes) saturates
+one core long before the network does. scan_sharded() splits the work
+into one shard per process, runs an ordinary scan_hosts_iter() engine in
+each, and merges the results back in input order.
+"""
+
+from __future__ import annotations
+
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Mapping, NamedTuple, Sequence, Tuple
+
+from .checkpoint import CHECKPOINT_ROWS
+from .database import finish_scan_runs
+from .portspec import PortSpec
+from .profiling import ScanProfile
+from .scanner import DEFAULT_SERVICE_WORKERS, _normalize_timeout, _validated_ports, resolve_engine, scan_hosts_iter
+from .timing import RttEstimator
+from .writer import ResultWriter
+
+
+class Shard(NamedTuple):
+    hosts: List[str]
+    ports: Sequence[int]
+
+
+class ShardOutcome(NamedTuple):
+    """What one worker sends back: its rows (unless not collected), rows saved,
+    per-status counts and, when profiling, its ScanProfile.to_dict()."""
+
+    rows: List[tuple]
+    saved_rows: int
+    status_counts: Dict[str, int]
+    profile: Dict[str, object] | None = None
+
+
+class ShardedScan(NamedTuple):
+    results: List[tuple]
+    saved_rows: int
+    status_counts: Dict[str, int]
+
+
+def default_process_count() -> int:
+    return max(1, os.cpu_count() or 1)
+
+
+def _split_ports(ports: Sequence[int], pieces: int) -> List[Sequence[int]]:
+    size = -(-len(ports) // max(1, pieces))
+    if isinstance(ports, PortSpec):
+        return list(ports.chunks(size))
+    return [ports[begin:begin + size] for begin in range(0, len(ports), size)]
+
+
+def plan_shards(hosts: Sequence[str], ports: Sequence[int], shard_count: int) -> List[Shard]:
+    """Split hosts × ports into about ``shard_count`` shards.
+
+    With at least as many hosts as shards, hosts are dealt round-robin and
+    every shard scans all ports (so interleaving across hosts still works
+    inside each shard). Otherwise each host's port list is cut into
+    consecutive chunks.
+    """
+    shard_count = max(1, int(shard_count))
+    if len(hosts) >= shard_count:
+        return [
+            Shard(list(hosts[index::shard_count]), ports)
+            for index in range(shard_count)
+        ]
+
+    pieces = -(-shard_count // len(hosts))
+    return [
+        Shard([host], chunk)
+        for host in hosts
+        for chunk in _split_ports(ports, pieces)
+        if chunk
+    ]
+
+
+def _scan_shard(
+    shard: Shard,
+    options: Dict[str, object],
+    adaptive_timeout: bool,
+    labels: Mapping[str, str],
+    db_path: str | None,
+    timestamp: str,
+    collect: bool,
+    profiled: bool = False,
+    run_parameters: Dict[str, object] | None = None,
+    compact: bool = False,
+) -> ShardOutcome:
+    """Worker entry point: scan one shard, optionally writing its rows to the database."""
+    rtt = {host: RttEstimator(options["timeout"]) for host in shard.hosts} if adaptive_timeout else None
+    profile = ScanProfile() if profiled else None
+    rows: List[tuple] = []
+    status_counts: Counter = Counter()
+    writer = None
+    if db_path:
+        writer = ResultWriter(
+            db_path,
+            timestamp,
+            addresses={labels.get(host, host): host for host in shard.hosts},
+            parameters=run_parameters,
+            batch_rows=CHECKPOINT_ROWS,
+            profile=profile,
+            compact=compact,
+        )
+
+    # Rows are stored in batches, on a writer thread, as they arrive, so
+    # a killed scan keeps what it finished (see TriNetra.checkpoint).
+    try:
+        for row in scan_hosts_iter(shard.hosts, shard.ports, rtt=rtt, profile=profile, **options):
+            status_counts[row[-1]] += 1
+            if collect:
+                rows.append(row)
+            if writer is not None:
+                writer.put((labels.get(row[0], row[0]), *row[1:]))
+    finally:
+        if writer is not None:
+            writer.close()
+    saved_rows = writer.saved_rows if writer is not None else 0
+
+    if profile is not None:
+        profile.finish()
+    return ShardOutcome(rows, saved_rows, dict(status_counts), profile.to_dict() if profile is not None else None)
+
+
+def scan_sharded(
+    hosts: Sequence[str],
+    ports: Sequence[int],
+    processes: int | None = None,
+    timeout: float = 0.8,
+    max_threads: int = 100,
+    retry_count: int = 1,
+    engine: str = "auto",
+    concurrency: int = 1000,
+    rate: float | None = None,
+    service_workers: int = DEFAULT_SERVICE_WORKERS,
+    versions: bool = False,
+    adaptive_timeout: bool = False,
+    db_path: str | None = None,
+    labels: Mapping[str, str] | None = None,
+    timestamp: str | None = None,
+    collect: bool = True,
+    on_shard: Callable[[List[tuple]], None] | None = None,
+    profile: ScanProfile | None = None,
+    run_parameters: Dict[str, object] | None = None,
+    compact: bool = False,
+) -> ShardedScan:
+    """Scan hosts × ports on a pool of ``processes`` workers (default: one per core).
+
+    Each worker runs scan_hosts_iter() on its shard. ``max_threads``,
+    ``concurrency`` and ``rate`` are totals and are divided between the
+    workers, so sharding spreads CPU work without raising network load.
+    ``adaptive_timeout`` gives every host its own RttEstimator inside its
+    worker.
+
+    Results are (host, port, service, [version,] status) tuples merged back
+    in input order (hosts, then ports). With ``db_path`` each worker writes
+    its own rows into a scan run per host, named ``labels[host]`` (default:
+    the host), started at one shared ``timestamp`` and recording
+    ``run_parameters`` (``compact`` as for insert_scan_results()); the
+    parent only stamps the runs finished at the end. Pass ``collect=False`` as well to keep rows out of the parent
+    entirely and only get counts back. ``on_shard(rows)`` is called as each shard
+    finishes. Each worker's ScanProfile is merged into ``profile``.
+    """
+    engine = resolve_engine(engine)
+    host_list = list(dict.fromkeys(hosts))
+    port_list = _validated_ports(ports)
+    if not isinstance(port_list, PortSpec):
+        port_list = list(dict.fromkeys(port_list))
+    if not host_list or not port_list:
+        return ShardedScan([], 0, {})
+
+    process_count = max(1, int(processes or default_process_count()))
+    shards = plan_shards(host_list, port_list, process_count)
+    worker_count = min(len(shards), process_count)
+    options: Dict[str, object] = {
+        "timeout": _normalize_timeout(timeout),
+        "max_threads": max(1, int(max_threads) // worker_count),
+        "retry_count": retry_count,
+        "engine": engine,
+        "concurrency": max(1, int(concurrency) // worker_count),
+        "rate": rate / worker_count if rate else None,
+        "service_workers": max(1, int(service_workers) // worker_count),
+        "versions": versions,
+    }
+    timestamp = timestamp or datetime.now(timezone.utc).isoformat()
+    labels = dict(labels or {})
+
+    found: Dict[Tuple[str, int], tuple] = {}
+    saved_rows = 0
+    status_counts: Counter = Counter()
+
+    with ProcessPoolExecutor(max_workers=worker_count) as pool:
+        futures = [
+            pool.submit(
+                _scan_shard, shard, options, adaptive_timeout, labels, db_path, timestamp, collect,
+                profile is not None, run_parameters, compact,
+            )
+            for shard in shards
+        ]
+        for future in as_completed(futures):
+            outcome = future.result()
+            saved_rows += outcome.saved_rows
+            status_counts.update(outcome.status_counts)
+            if profile is not None and outcome.profile is not None:
+                profile.merge(outcome.profile)
+            for row in outcome.rows:
+                found[(row[0], row[1])] = row
+            if on_shard is not None:
+                on_shard(outcome.rows)
+
+    if db_path:
+        finish_scan_runs(db_path, [labels.get(host, host) for host in host_list], timestamp)
+
+    results = [
+        found[(host, port)]
+        for host in host_list
+        for port in port_list
+        if (host, port) in found
+    ]
+    return ShardedScan(results, saved_rows, dict(status_counts))
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterable
+
+try:
+    from scapy.all import IP, TCP, AsyncSniffer, conf
+    from scapy.arch.common import compile_filter
+    from scapy.supersocket import L3RawSocket
+    _SCAPY_AVAILABLE = True
+except Exception:
+    IP = TCP = AsyncSniffer = conf = compile_filter = L3RawSocket = None
+    _SCAPY_AVAILABLE = False
+
+from .scanner import _normalize_timeout
+from .ratelimit import RateLimiter
+from .timing import RttEstimator
+
+# SYN-ACK and RST flag bits in the TCP header.
+_FLAG_SYN_ACK = 0x12
+_FLAG_RST = 0x04
+
+
+def _route_interface(ip_address: str):
+    try:
+        return conf.route.route(ip_address)[0]
+    except Exception:
+        return None
+
+
+def _open_sender(interface):
+    # PF_PACKET frames injected on loopback never reach the local TCP stack,
+    # so loopback targets need a plain raw IP socket (as scapy's sr() does).
+    if interface == conf.loopback_name:
+        return L3RawSocket()
+    return conf.L3socket(iface=interface) if interface else conf.L3socket()
+
+
+def _kernel_filter(expression: str, interface) -> str | None:
+    """Return ``expression`` if libpcap can compile it, else None.
+
+    Without libpcap scapy cannot install BPF filters, so the sniffer has to
+    fall back to matching packets in Python via ``lfilter``.
+    """
+    try:
+        compile_filter(expression, iface=interface)
+    except Exception:
+        return None
+    return expression
+
+
+def _send_batch(
+    sender,
+    template,
+    ports: Iterable[int],
+    limiter: RateLimiter | None,
+    sent_at: Dict[int, float] | None = None,
+) -> None:
+    """Send one SYN per port, paced by ``limiter`` when there is one."""
+    for port in ports:
+        if limiter is not None:
+            limiter.acquire()
+        template[TCP].dport = port
+        # Stamped before sending: on fast links the reply can beat the
+        # line after send().
+        if sent_at is not None:
+            sent_at[port] = time.monotonic()
+        try:
+            sender.send(template)
+        except OSError:
+            continue
+
+
+def batch_syn_scan(
+    ip_address: str,
+    ports: Iterable[int],
+    timeout: float = 0.8,
+    rate: float | None = 1000.0,
+    retry_count: int = 1,
+    on_result: Callable[[int, str], None] | None = None,
+    rtt: RttEstimator | None = None,
+    limiter: RateLimiter | None = None,
+    on_sample: Callable[[int, float], None] | None = None,
+) -> Dict[int, str]:
+    """SYN-scan many ports with one sender and one sniffer.
+
+    SYNs for the whole port list go out from a single L3 socket while an
+    AsyncSniffer matches SYN-ACK (OPEN) and RST (CLOSED) replies back to
+    their port. Sends are paced by a shared ``limiter`` or else at
+    ``rate`` packets per second; a ``rate`` of None or zero sends them
+    unpaced. Ports still unanswered ``timeout`` seconds after the last SYN
+    are re-sent up to ``retry_count`` times and finally reported as
+    FILTERED.
+    ``on_result(port, status)`` is called from the sniffer thread as soon
+    as a port's reply arrives. With an ``rtt`` estimator, reply delays
+    are sampled and the post-send wait follows its adaptive timeout.
+    ``on_sample(port, seconds)`` sees each reply delay just before its
+    on_result() call.
+
+    Requires root and scapy; returns a {port: status} mapping.
+    """
+    if not _SCAPY_AVAILABLE:
+        raise RuntimeError("Batched SYN scanning requires scapy.")
+
+    port_list = list(dict.fromkeys(ports))
+    statuses: Dict[int, str] = {}
+    if not port_list:
+        return statuses
+
+    effective_timeout = _normalize_timeout(timeout)
+    if limiter is None and rate and rate > 0:
+        limiter = RateLimiter(rate)
+    source_port = random.randint(40000, 60000)
+    wanted = set(port_list)
+    lock = threading.Lock()
+    sniffer_ready = threading.Event()
+    sent_at: Dict[int, float] = {}
+
+    def handle_reply(packet) -> None:
+        if not packet.haslayer(TCP):
+            return
+        tcp_layer = packet.getlayer(TCP)
+        port = int(tcp_layer.sport)
+        if port not in wanted:
+            return
+
+        flags = int(tcp_layer.flags)
+        if flags & _FLAG_SYN_ACK == _FLAG_SYN_ACK:
+            status = "OPEN"
+        elif flags & _FLAG_RST:
+            status = "CLOSED"
+        else:
+            return
+
+        with lock:
+            # The first reply is final, so on_result fires once per port.
+            previous = statuses.get(port)
+            if previous is not None:
+                return
+            statuses[port] = status
+        if port in sent_at:
+            delay = time.monotonic() - sent_at[port]
+            if rtt is not None:
+                rtt.update(delay)
+            if on_sample is not None:
+                on_sample(port, delay)
+        if on_result is not None:
+            on_result(port, status)
+
+    def is_reply(packet) -> bool:
+        return (
+            packet.haslayer(IP)
+            and packet.haslayer(TCP)
+            and packet[IP].src == ip_address
+            and int(packet[TCP].dport) == source_port
+        )
+
+    interface = _route_interface(ip_address)
+    sniffer = AsyncSniffer(
+        iface=interface,
+        filter=_kernel_filter(f"tcp and src host {ip_address} and dst port {source_port}", interface),
+        lfilter=is_reply,
+        prn=handle_reply,
+        store=False,
+        started_callback=sniffer_ready.set,
+    )
+    sniffer.start()
+    sniffer_ready.wait(timeout=2.0)
+
+    sender = _open_sender(interface)
+    template = IP(dst=ip_address) / TCP(sport=source_port, flags="S", seq=random.getrandbits(32))
+
+    try:
+        pending = port_list
+        for _ in range(max(1, int(retry_count) + 1)):
+            _send_batch(sender, template, pending, limiter, sent_at if rtt is not None or on_sample is not None else None)
+            time.sleep(rtt.timeout() if rtt is not None else effective_timeout)
+            with lock:
+                if limiter is not None:
+                    for port in pending:
+                        limiter.record(statuses.get(port, "FILTERED"))
+                pending = [port for port in pending if port not in statuses]
+            if not pending:
+                break
+    finally:
+        sender.close()
+        try:
+            sniffer.stop()
+        except Exception:
+            pass
+
+    for port in port_list:
+        statuses.setdefault(port, "FILTERED")
+    return statuses
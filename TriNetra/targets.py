@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import ipaddress
+import re
+from typing import Iterator, List, NamedTuple
+
+from .resolver import default_resolver
+
+# Upper bound on expanded addresses per scan (a /16).
+MAX_TARGETS = 65536
+
+_SEPARATORS = re.compile(r"[,\s]+")
+
+
+class ScanTarget(NamedTuple):
+    """One host to scan: ``label`` is what the user typed (or the expanded
+    address), ``address`` is the IP address probes go to."""
+
+    label: str
+    address: str
+
+
+def _parse_ipv4(text: str) -> ipaddress.IPv4Address | None:
+    try:
+        return ipaddress.IPv4Address(text)
+    except ValueError:
+        return None
+
+
+def _expand_network(entry: str) -> Iterator[ipaddress.IPv4Address]:
+    try:
+        network = ipaddress.ip_network(entry, strict=False)
+    except ValueError as error:
+        raise ValueError(f"Invalid network '{entry}': {error}") from None
+    if network.version != 4:
+        raise ValueError(f"Only IPv4 networks are supported: '{entry}'.")
+    # hosts() drops the network and broadcast addresses, except for /31 and /32.
+    return iter(network.hosts()) if network.prefixlen < 31 else iter(network)
+
+
+def _expand_range(start: ipaddress.IPv4Address, end_text: str, entry: str) -> Iterator[ipaddress.IPv4Address]:
+    end = _parse_ipv4(end_text)
+    if end is None and end_text.isdigit():
+        # Short form: '10.0.0.5-20' ends at 10.0.0.20.
+        last_octet = int(end_text)
+        if last_octet > 255:
+            raise ValueError(f"Invalid address range '{entry}'.")
+        end = ipaddress.IPv4Address((int(start) & 0xFFFFFF00) | last_octet)
+    if end is None or end < start:
+        raise ValueError(f"Invalid address range '{entry}': end must be an address after the start.")
+    return (ipaddress.IPv4Address(value) for value in range(int(start), int(end) + 1))
+
+
+def _is_address_pattern(entry: str) -> bool:
+    """True for CIDR blocks and IPv4 ranges, which expand without DNS."""
+    if "/" in entry:
+        return True
+    return "-" in entry and _parse_ipv4(entry.split("-", 1)[0]) is not None
+
+
+def _expand_pattern(entry: str) -> Iterator[ScanTarget]:
+    if "/" in entry:
+        addresses = _expand_network(entry)
+    else:
+        start_text, end_text = entry.split("-", 1)
+        addresses = _expand_range(_parse_ipv4(start_text), end_text, entry)
+    for address in addresses:
+        yield ScanTarget(str(address), str(address))
+
+
+def _named_targets(entry: str, addresses: List[str], all_addresses: bool) -> Iterator[ScanTarget]:
+    # By default a name is one target at its first (IPv4-preferred) address;
+    # with all_addresses, multi-homed names label each address.
+    if len(addresses) == 1 or not all_addresses:
+        yield ScanTarget(entry, addresses[0])
+        return
+    for address in addresses:
+        yield ScanTarget(f"{entry} ({address})", address)
+
+
+def parse_targets(spec: str, max_targets: int = MAX_TARGETS, all_addresses: bool = False) -> List[ScanTarget]:
+    """Expand a target specification into the hosts to scan.
+
+    ``spec`` holds comma- or space-separated entries, each a hostname, an
+    IPv4 or IPv6 address, an IPv4 CIDR block ('10.0.0.0/24') or an IPv4
+    address range ('10.0.0.5-10.0.0.20' or '10.0.0.5-20'). Hostnames are
+    resolved in one parallel batch through the shared resolver cache. Each
+    becomes one target at its first address, IPv4 preferred; with
+    ``all_addresses`` it expands to every A/AAAA address instead.
+    Duplicates are dropped, keeping first-seen order. Raises ValueError
+    for malformed entries or when more than ``max_targets`` hosts would
+    result, and socket.gaierror for names that do not resolve.
+    """
+    entries = [entry for entry in _SEPARATORS.split(spec.strip()) if entry]
+    names = [entry for entry in entries if not _is_address_pattern(entry)]
+    resolved = default_resolver().resolve_many(names)
+
+    targets: List[ScanTarget] = []
+    seen = set()
+
+    for entry in entries:
+        if _is_address_pattern(entry):
+            expanded = _expand_pattern(entry)
+        else:
+            addresses = resolved[entry]
+            if isinstance(addresses, OSError):
+                raise addresses
+            expanded = _named_targets(entry, addresses, all_addresses)
+
+        for target in expanded:
+            if target.address in seen:
+                continue
+            seen.add(target.address)
+            targets.append(target)
+            if len(targets) > max_targets:
+                raise ValueError(f"Too many targets: at most {max_targets} hosts can be scanned at once.")
+
+    if not targets:
+        raise ValueError("No targets were provided.")
+    return targets
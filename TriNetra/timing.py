@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict
+
+
+class RttEstimator:
+    """Per-target round-trip-time estimator in the style of Nmap / RFC 6298.
+
+    Every completed handshake (OPEN) or RST (CLOSED) is a sample. The
+    smoothed RTT and its variance drive the probe timeout, which is
+    ``srtt + 4 * rttvar`` clamped to [min_timeout, max_timeout]. Until the
+    first sample arrives the caller's initial timeout is used unchanged.
+    Both the initial and the minimum timeout must be greater than zero: a
+    zero timeout would turn probe sockets non-blocking.
+    """
+
+    def __init__(self, initial_timeout: float, min_timeout: float = 0.1, max_timeout: float = 10.0) -> None:
+        if initial_timeout <= 0 or min_timeout <= 0:
+            raise ValueError("Timeouts must be greater than zero.")
+
+        self.initial_timeout = float(initial_timeout)
+        self.min_timeout = min(float(min_timeout), self.initial_timeout)
+        self.max_timeout = max(float(max_timeout), self.initial_timeout)
+        self.srtt: float | None = None
+        self.rttvar: float | None = None
+        self.samples = 0
+        self.min_rtt: float | None = None
+        self.max_rtt: float | None = None
+        self._timeout = self.initial_timeout
+        self._lock = threading.Lock()
+
+    def update(self, rtt: float) -> None:
+        if rtt < 0:
+            return
+
+        with self._lock:
+            if self.srtt is None or self.rttvar is None:
+                self.srtt = rtt
+                self.rttvar = rtt / 2
+            else:
+                delta = rtt - self.srtt
+                self.srtt += delta / 8
+                self.rttvar += (abs(delta) - self.rttvar) / 4
+
+            self.samples += 1
+            self.min_rtt = rtt if self.min_rtt is None else min(self.min_rtt, rtt)
+            self.max_rtt = rtt if self.max_rtt is None else max(self.max_rtt, rtt)
+            self._timeout = min(self.max_timeout, max(self.min_timeout, self.srtt + 4 * self.rttvar))
+
+    def timeout(self) -> float:
+        return self._timeout
+
+    def snapshot(self) -> Dict[str, float | int | None]:
+        with self._lock:
+            return {
+                "samples": self.samples,
+                "srtt": self.srtt,
+                "rttvar": self.rttvar,
+                "min_rtt": self.min_rtt,
+                "max_rtt": self.max_rtt,
+                "timeout": self._timeout,
+            }
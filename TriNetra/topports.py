@@ -0,0 +1,125 @@
+"""Port rankings by how often they are found open in the wild.
+
+The first hundred entries follow Nmap's published top-100 TCP ordering
+(the list behind ``nmap -F``). After them comes a short curated list of
+services that are common today but rare in that older data (databases,
+caches, container and cluster APIs). Only these MAX_TOP_PORTS ports are
+ranked by frequency, so --top-ports is capped at that size and picks from
+them alone. Ports beyond the bundled table are not measured; for
+likely-first ordering they follow in a fixed fallback order: ports with a
+name in the service table first, then everything else, each group in
+ascending order.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Iterable, List, Sequence, Tuple
+
+from .portspec import PortSpec
+from .services import service_table
+
+# Nmap top-100 TCP ports, most frequently open first.
+_NMAP_TOP_100: Tuple[int, ...] = (
+    80, 23, 443, 21, 22, 25, 3389, 110, 445, 139,
+    143, 53, 135, 3306, 8080, 1723, 111, 995, 993, 5900,
+    1025, 587, 8888, 199, 1720, 465, 548, 113, 81, 6001,
+    10000, 514, 5060, 179, 1026, 2000, 8443, 8000, 32768, 554,
+    26, 1433, 49152, 2001, 515, 8008, 49154, 1027, 5666, 646,
+    5000, 5631, 631, 49153, 8081, 2049, 88, 79, 5800, 106,
+    2121, 1110, 49155, 6000, 513, 990, 5357, 427, 49156, 543,
+    544, 5101, 144, 7, 389, 8009, 3128, 444, 9999, 5009,
+    7070, 5190, 3000, 5432, 1900, 3986, 13, 1029, 9, 5051,
+    6646, 49157, 1028, 873, 1755, 2717, 4899, 9100, 119, 37,
+)
+
+# Curated additions: widely deployed services under-represented above.
+_MODERN_SERVICES: Tuple[int, ...] = (
+    6379, 27017, 9200, 11211, 5672, 15672, 9090, 9000, 1521, 5985,
+    5986, 6443, 10250, 2375, 2376, 2379, 8500, 5984, 9092, 2181,
+    8086, 3307, 50000, 8880, 8088, 7001, 9043, 9443, 8161, 61616,
+    1883, 8883, 5601, 9300, 3268, 636, 989, 992, 1194, 1812,
+    4443, 5222, 5269, 6667, 8010, 8181, 8222, 8834, 9418, 25565,
+)
+
+_BUNDLED: Tuple[int, ...] = tuple(dict.fromkeys(_NMAP_TOP_100 + _MODERN_SERVICES))
+
+# Largest top-ports count the bundled frequency table can answer.
+MAX_TOP_PORTS = len(_BUNDLED)
+
+_ranking: Sequence[int] | None = None
+_ranking_lock = threading.Lock()
+
+
+def _build_ranking() -> Sequence[int]:
+    ranked = list(_BUNDLED)
+    bundled = set(ranked)
+    names = service_table()
+    named = [port for port in range(1, 65536) if port not in bundled and names[port] != "Unknown"]
+    named_set = set(named)
+    rest = [port for port in range(1, 65536) if port not in bundled and port not in named_set]
+    return tuple(ranked + named + rest)
+
+
+def port_ranking() -> Sequence[int]:
+    """Every port 1-65535, most likely open first; built once per process."""
+    global _ranking
+    if _ranking is None:
+        with _ranking_lock:
+            if _ranking is None:
+                _ranking = _build_ranking()
+    return _ranking
+
+
+def bundled_count() -> int:
+    """How many leading entries of port_ranking() come from the bundled table."""
+    return MAX_TOP_PORTS
+
+
+def _check_top_count(count: int) -> int:
+    count = int(count)
+    if not 1 <= count <= MAX_TOP_PORTS:
+        raise ValueError(
+            f"Top ports must be between 1 and {MAX_TOP_PORTS}, the number of ports ranked by open frequency."
+        )
+    return count
+
+
+def top_ports(count: int) -> List[int]:
+    """Return the ``count`` most likely open ports, most likely first (at most MAX_TOP_PORTS)."""
+    return list(_BUNDLED[:_check_top_count(count)])
+
+
+def order_by_likelihood(ports: Iterable[int]) -> List[int]:
+    """Reorder ``ports`` so the most likely open ones are scanned first.
+
+    Any port selection works (a list or a PortSpec); duplicates are
+    dropped. Ports are ranked by port_ranking().
+    """
+    wanted = set(ports)
+    return [port for port in port_ranking() if port in wanted]
+
+
+def select_ports(port_range: str | None = None, top: int | None = None, likely_first: bool = False) -> Sequence[int]:
+    """Turn a port range string and/or a top-ports count into the ports to scan.
+
+    ``top`` alone gives the ``top`` most likely ports; together with
+    ``port_range`` it keeps the ``top`` most likely ports inside that
+    range, which may be fewer when the range holds fewer ranked ports.
+    Either way the result is ordered most likely first. A plain range
+    stays a PortSpec unless ``likely_first`` reorders it.
+    """
+    if not port_range and not top:
+        raise ValueError("Give a port range, a number of top ports, or both.")
+
+    spec = PortSpec.parse(port_range) if port_range else None
+    if top:
+        if spec is None:
+            return top_ports(top)
+        count = _check_top_count(top)
+        ranked = [port for port in _BUNDLED if port in spec]
+        if not ranked:
+            raise ValueError(f"None of the ports in '{port_range}' are ranked by open frequency.")
+        return ranked[:count]
+
+    return order_by_likelihood(spec) if likely_first else spec
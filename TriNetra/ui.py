@@ -1,3 +1,5 @@
+from typing import Sequence
+
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
@@ -65,11 +67,12 @@ def print_scan_mode(message: str) -> None:
     console.print()
 
 
-def print_results_header() -> None:
-    console.print("[bold]Port   Service      Version                      Status[/bold]")
+def print_results_header(show_host: bool = False) -> None:
+    host_heading = f"{'Host':<17}" if show_host else ""
+    console.print(f"[bold]{host_heading}Port   Service      Version                      Status[/bold]")
 
 
-def print_result_row(port: int, service: str, version: str, status: str) -> None:
+def print_result_row(port: int, service: str, version: str, status: str, host: str = "") -> None:
     if status == "OPEN":
         color = "bold green"
     elif status == "CLOSED":
@@ -81,12 +84,58 @@ def print_result_row(port: int, service: str, version: str, status: str) -> None
 
     service_text = (service or "Unknown")[:12]
     version_text = (version or "-")[:28]
+    host_text = f"{host[:16]:<17}" if host else ""
+    console.print(
+        f"[{color}]{host_text}{port:<6}{service_text:<13}{version_text:<29}{status}[/{color}]"
+    )
+
+
+def print_discovery(live_count: int, skipped_hosts: Sequence[str], limit: int = 20) -> None:
+    total = live_count + len(skipped_hosts)
     console.print(
-        f"[{color}]{port:<6}{service_text:<13}{version_text:<29}{status}[/{color}]"
+        f"[bold bright_cyan]Host discovery:[/bold bright_cyan] "
+        f"[bold green]{live_count}[/bold green] of {total} hosts up"
     )
+    if skipped_hosts:
+        table = Table(
+            title="[bold bright_yellow]◈ Skipped Hosts (no reply)[/bold bright_yellow]",
+            show_header=False,
+            box=box.ROUNDED,
+            border_style="yellow",
+            padding=(0, 2),
+        )
+        table.add_column("Host", style="dim")
+        for host in skipped_hosts[:limit]:
+            table.add_row(host)
+        if len(skipped_hosts) > limit:
+            table.add_row(f"… and {len(skipped_hosts) - limit} more")
+        console.print(table)
+    console.print()
+
+
+def print_checkpoint(scan_id: int, resumed_rows: int | None = None) -> None:
+    if resumed_rows is not None:
+        console.print(
+            f"[bold bright_cyan]Resuming scan {scan_id}:[/bold bright_cyan] "
+            f"[bold green]{resumed_rows}[/bold green] results already saved"
+        )
+    else:
+        console.print(
+            f"[bold bright_cyan]Scan ID:[/bold bright_cyan] [bold]{scan_id}[/bold] "
+            f"[dim](progress is checkpointed; continue an interrupted run with --resume {scan_id})[/dim]"
+        )
+    console.print()
 
 
-def print_summary(target: str, ip_address: str, open_count: int, closed_count: int, saved_rows: int, db_path: str) -> None:
+def print_summary(
+    target: str,
+    ip_address: str,
+    open_count: int,
+    closed_count: int,
+    saved_rows: int,
+    db_path: str,
+    skipped_count: int = 0,
+) -> None:
     console.print()
 
     table = Table(
@@ -104,6 +153,8 @@ def print_summary(target: str, ip_address: str, open_count: int, closed_count: i
     table.add_row("Resolved IP", f"[cyan]{ip_address}[/cyan]")
     table.add_row("Open Ports", f"[bold green]{open_count}[/bold green]")
     table.add_row("Closed Ports", f"[red]{closed_count}[/red]")
+    if skipped_count:
+        table.add_row("Hosts Skipped", f"[dim]{skipped_count}[/dim]")
     table.add_row("Rows Saved", f"[yellow]{saved_rows}[/yellow]")
     table.add_row("Database", f"[dim]{db_path}[/dim]")
 
@@ -113,6 +164,33 @@ def print_summary(target: str, ip_address: str, open_count: int, closed_count: i
     console.print()
 
 
+def _format_ms(seconds: float | None) -> str:
+    return "-" if seconds is None else f"{seconds * 1000:.2f} ms"
+
+
+def print_rtt_stats(stats: dict, host: str = "") -> None:
+    host_suffix = f" — {host}" if host else ""
+    table = Table(
+        title=f"[bold bright_yellow]◈ Round-Trip Timing{host_suffix}[/bold bright_yellow]",
+        show_header=True,
+        header_style="bold bright_blue",
+        box=box.ROUNDED,
+        border_style="bright_blue",
+        padding=(0, 2),
+    )
+    table.add_column("Metric", style="bold white", no_wrap=True)
+    table.add_column("Value", style="bold cyan")
+
+    table.add_row("Samples", str(stats.get("samples", 0)))
+    table.add_row("Smoothed RTT", _format_ms(stats.get("srtt")))
+    table.add_row("RTT Variance", _format_ms(stats.get("rttvar")))
+    table.add_row("Min / Max RTT", f"{_format_ms(stats.get('min_rtt'))} / {_format_ms(stats.get('max_rtt'))}")
+    table.add_row("Final Timeout", _format_ms(stats.get("timeout")))
+
+    console.print(table)
+    console.print()
+
+
 def print_error(message: str) -> None:
     console.print(
         Panel(
@@ -123,3 +201,89 @@ def print_error(message: str) -> None:
             padding=(0, 2),
         )
     )
+
+
+def print_benchmark(results: Sequence) -> None:
+    table = Table(
+        title="[bold bright_yellow]◈ Benchmark[/bold bright_yellow]",
+        show_header=True,
+        header_style="bold bright_blue",
+        box=box.ROUNDED,
+        border_style="bright_blue",
+        padding=(0, 1),
+    )
+    for column in ("Path", "Engine", "Ports", "Seconds", "Ports/s", "p50", "p99", "Threads", "FDs", "RSS MB", "Wrong"):
+        table.add_column(column, no_wrap=True)
+
+    for result in results:
+        wrong_style = "red" if result.mismatches else "green"
+        table.add_row(
+            result.target,
+            result.engine,
+            str(result.ports),
+            f"{result.seconds:.2f}",
+            f"[bold cyan]{result.ports_per_second:,.0f}[/bold cyan]",
+            "-" if result.p50_ms is None else f"{result.p50_ms:.2f} ms",
+            "-" if result.p99_ms is None else f"{result.p99_ms:.2f} ms",
+            str(result.peak_threads),
+            "-" if result.peak_fds is None else str(result.peak_fds),
+            "-" if result.peak_rss_mb is None else f"{result.peak_rss_mb:.1f}",
+            f"[{wrong_style}]{result.mismatches}[/{wrong_style}]",
+        )
+
+    console.print(table)
+    console.print()
+
+
+def print_profile(report: dict) -> None:
+    wall = report["wall_seconds"]
+    table = Table(
+        title=f"[bold bright_yellow]◈ Profile — {wall:.2f} s wall[/bold bright_yellow]",
+        show_header=True,
+        header_style="bold bright_blue",
+        box=box.ROUNDED,
+        border_style="bright_blue",
+        padding=(0, 2),
+    )
+    table.add_column("Phase", style="bold white", no_wrap=True)
+    table.add_column("Time", style="bold cyan", justify="right")
+    table.add_column("Calls", justify="right")
+    table.add_column("Share of Wall", justify="right")
+
+    for phase, values in report["phases"].items():
+        if not values["calls"]:
+            continue
+        share = values["seconds"] / wall * 100 if wall > 0 else 0.0
+        table.add_row(phase, f"{values['seconds']:.3f} s", str(values["calls"]), f"{share:.1f}%")
+    console.print(table)
+
+    latency = Table(
+        title="[bold bright_yellow]◈ Probe Latency by Outcome[/bold bright_yellow]",
+        show_header=True,
+        header_style="bold bright_blue",
+        box=box.ROUNDED,
+        border_style="bright_blue",
+        padding=(0, 2),
+    )
+    latency.add_column("Outcome", style="bold white", no_wrap=True)
+    latency.add_column("Probes", justify="right")
+    latency.add_column("No Reply", justify="right")
+    latency.add_column("p50", justify="right")
+    latency.add_column("p99", justify="right")
+    latency.add_column("Max", justify="right")
+
+    for status, values in report["latency"].items():
+        latency.add_row(
+            status,
+            str(values["count"] + values["unanswered"]),
+            str(values["unanswered"]),
+            "-" if values["p50_ms"] is None else f"≤ {values['p50_ms']:.2f} ms",
+            "-" if values["p99_ms"] is None else f"≤ {values['p99_ms']:.2f} ms",
+            f"{values['max_ms']:.2f} ms" if values["count"] else "-",
+        )
+    console.print(latency)
+    console.print(
+        f"[bold white]Retries:[/bold white] [cyan]{report['retries']}[/cyan] probes re-sent "
+        f"over {report['retry_passes']} retry passes"
+    )
+    console.print()
@@ -0,0 +1,178 @@
+"""Store scan results while the scan is still running.
+
+A ResultWriter takes rows from the scan stream and writes them to the
+database on its own thread, in batches. The scan only hands rows over,
+so database latency (a busy lock, a slow disk, an fsync) never holds up
+the probes. Memory stays bounded by the queue size, not the scan size,
+and a killed process loses at most one batch.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Mapping
+
+from .database import finish_scan_runs, insert_scan_results
+from .profiling import ScanProfile
+
+# Commit as soon as this many rows are waiting ...
+BATCH_ROWS = 1000
+
+# ... or at least this often (seconds).
+COMMIT_INTERVAL = 2.0
+
+
+def _chain(exc: BaseException, error: BaseException) -> None:
+    """Attach ``error`` to the end of ``exc``'s context chain so the traceback shows both."""
+    seen = {id(exc)}
+    while exc.__context__ is not None and id(exc.__context__) not in seen:
+        exc = exc.__context__
+        seen.add(id(exc))
+    if exc is not error:
+        exc.__context__ = error
+
+
+class ResultWriter:
+    """Write (label, port, ..., status) rows into scan runs from a background thread.
+
+    put() queues a row and returns at once, unless ``max_pending`` rows
+    are already waiting (default: eight batches), which keeps memory
+    bounded if the database falls behind. The writer commits once
+    ``batch_rows`` rows are waiting or ``interval`` seconds have passed,
+    whichever comes first. Each label's rows go into its run started at
+    ``timestamp`` (see insert_scan_results(), which also explains
+    ``compact``), and ``on_commit(count)`` runs on the writer thread
+    after every batch.
+
+    flush() waits until everything queued so far is stored; close() also
+    stops the thread and, with ``finished``, stamps the runs finished. A
+    database error on the writer thread is raised again from the next
+    put(), flush() or close(); if the ``with`` block is already leaving
+    with an exception, the error is chained onto that one instead.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        timestamp: str,
+        addresses: Mapping[str, str] | None = None,
+        parameters: Dict[str, object] | None = None,
+        batch_rows: int = BATCH_ROWS,
+        interval: float = COMMIT_INTERVAL,
+        max_pending: int | None = None,
+        on_commit: Callable[[int], None] | None = None,
+        profile: ScanProfile | None = None,
+        compact: bool = False,
+    ) -> None:
+        self.db_path = db_path
+        self.timestamp = timestamp
+        # label -> resolved address, and the scan parameters, for new runs.
+        self.addresses = dict(addresses or {})
+        self.parameters = parameters
+        self.batch_rows = max(1, int(batch_rows))
+        self.interval = max(0.0, float(interval))
+        self.on_commit = on_commit
+        self.profile = profile
+        self.compact = compact
+        self.saved_rows = 0
+        self._labels: Dict[str, None] = {}
+        self._error: BaseException | None = None
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending or self.batch_rows * 8)
+        self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            self.close(finished=True)
+        else:
+            self._stop()
+            error, self._error = self._error, None
+            if error is not None and exc is not None:
+                _chain(exc, error)
+
+    def put(self, row: tuple) -> None:
+        self._raise_error()
+        self._queue.put(row)
+
+    def flush(self) -> None:
+        """Block until every row queued so far is committed."""
+        if self._thread.is_alive():
+            done = threading.Event()
+            self._queue.put(done)
+            done.wait()
+        self._raise_error()
+
+    def close(self, finished: bool = False) -> None:
+        self._stop()
+        self._raise_error()
+        if finished and self._labels:
+            finish_scan_runs(self.db_path, list(self._labels), self.timestamp)
+
+    def _stop(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _run(self) -> None:
+        batch: List[tuple] = []
+        deadline = time.monotonic() + self.interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = ()
+            if item is None:
+                self._write(batch)
+                return
+            if isinstance(item, threading.Event):
+                self._write(batch)
+                item.set()
+            elif item:
+                batch.append(item)
+            if len(batch) >= self.batch_rows or time.monotonic() >= deadline:
+                self._write(batch)
+            if not batch:
+                deadline = time.monotonic() + self.interval
+
+    def _write(self, batch: List[tuple]) -> None:
+        # After an error the thread keeps draining (and dropping) rows so
+        # put() and flush() never block on a dead writer.
+        if not batch or self._error is not None:
+            batch.clear()
+            return
+        started = time.perf_counter()
+        by_label: Dict[str, List[tuple]] = {}
+        for label, *result in batch:
+            by_label.setdefault(label, []).append(tuple(result))
+        batch.clear()
+        try:
+            saved = 0
+            for label, rows in by_label.items():
+                self._labels[label] = None
+                saved += insert_scan_results(
+                    self.db_path,
+                    label,
+                    rows,
+                    timestamp=self.timestamp,
+                    resolved_ip=self.addresses.get(label, ""),
+                    parameters=self.parameters,
+                    finished=False,
+                    compact=self.compact,
+                )
+            self.saved_rows += saved
+            if self.on_commit is not None:
+                self.on_commit(saved)
+        except Exception as error:  # re-raised on the caller's thread
+            self._error = error
+        if self.profile is not None:
+            self.profile.add_time("database", time.perf_counter() - started)
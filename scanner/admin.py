@@ -1,10 +1,17 @@
 from django.contrib import admin
 
-from .models import Scan
+from .models import ScanResult, ScanRun
 
 
-@admin.register(Scan)
-class ScanAdmin(admin.ModelAdmin):
-    list_display = ("target", "port", "status", "timestamp")
-    search_fields = ("target", "status")
+@admin.register(ScanRun)
+class ScanRunAdmin(admin.ModelAdmin):
+    list_display = ("target", "resolved_ip", "started_at", "finished_at")
+    search_fields = ("target", "resolved_ip")
+
+
+@admin.register(ScanResult)
+class ScanResultAdmin(admin.ModelAdmin):
+    list_display = ("run", "port", "status", "service", "version")
+    search_fields = ("run__target", "status", "service")
     list_filter = ("status",)
+    list_select_related = ("run",)
@@ -1,5 +1,7 @@
 from django import forms
 
+from TriNetra.topports import MAX_TOP_PORTS
+
 # Shared CSS class from trinetra-fx.css
 _INPUT_CLASS = "tri-input"
 
@@ -7,16 +9,18 @@ _INPUT_CLASS = "tri-input"
 class ScanForm(forms.Form):
     target = forms.CharField(
         max_length=255,
+        help_text="Host, IP, CIDR (10.0.0.0/28) or range (10.0.0.5-20); comma-separated for several",
         widget=forms.TextInput(
             attrs={
                 "class": _INPUT_CLASS,
-                "placeholder": "e.g. 127.0.0.1 or scanme.nmap.org",
+                "placeholder": "e.g. 127.0.0.1, scanme.nmap.org or 192.168.1.0/28",
             }
         ),
     )
     ports = forms.CharField(
+        required=False,
         max_length=255,
-        help_text="Use range (1-1024) or list (22,80,443)",
+        help_text="Use range (1-1024) or list (22,80,443); optional with Top Ports",
         widget=forms.TextInput(
             attrs={
                 "class": _INPUT_CLASS,
@@ -24,6 +28,18 @@ class ScanForm(forms.Form):
             }
         ),
     )
+    top_ports = forms.IntegerField(
+        required=False,
+        min_value=1,
+        max_value=MAX_TOP_PORTS,
+        help_text="Scan the N most commonly open ports (within the range above, if given)",
+        widget=forms.NumberInput(
+            attrs={
+                "class": _INPUT_CLASS,
+                "placeholder": "e.g. 100",
+            }
+        ),
+    )
     timeout = forms.FloatField(
         initial=0.5,
         min_value=0.05,
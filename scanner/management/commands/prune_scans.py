@@ -0,0 +1,73 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from TriNetra.database import initialize_database
+from TriNetra.retention import PRUNE_BATCH, enable_incremental_vacuum, prune_scans
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply the scan history retention policy: roll runs older than --detail-days up to their "
+        "open ports and per-status counts, delete runs older than --delete-days, and reclaim the "
+        "freed space with incremental vacuum."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--detail-days",
+            type=float,
+            default=settings.TRINETRA_DETAIL_DAYS,
+            help="Keep every port of a run for this many days (default: %(default)s)",
+        )
+        parser.add_argument(
+            "--delete-days",
+            type=float,
+            default=settings.TRINETRA_RETENTION_DAYS,
+            help="Delete runs older than this many days (default: keep rolled-up runs forever)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=PRUNE_BATCH,
+            help="Rows deleted per transaction (default: %(default)s)",
+        )
+        parser.add_argument(
+            "--no-vacuum",
+            action="store_true",
+            help="Skip the incremental vacuum after pruning",
+        )
+        parser.add_argument(
+            "--enable-incremental-vacuum",
+            action="store_true",
+            help="Switch an older database to auto_vacuum=INCREMENTAL first (runs one full VACUUM)",
+        )
+
+    def handle(self, *args, **options):
+        db_path = str(Path(settings.DATABASES["default"]["NAME"]))
+        initialize_database(db_path)
+
+        if options["enable_incremental_vacuum"]:
+            if enable_incremental_vacuum(db_path):
+                self.stdout.write("Switched the database to auto_vacuum=INCREMENTAL.")
+            else:
+                self.stdout.write("The database already uses auto_vacuum=INCREMENTAL.")
+
+        try:
+            report = prune_scans(
+                db_path,
+                detail_days=options["detail_days"],
+                delete_days=options["delete_days"],
+                batch_size=options["batch_size"],
+                vacuum=not options["no_vacuum"],
+            )
+        except ValueError as error:
+            raise CommandError(str(error)) from error
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rolled up {report.runs_rolled_up} runs, deleted {report.runs_deleted} runs and "
+                f"{report.rows_deleted} result rows, freed {report.pages_freed} pages."
+            )
+        )
@@ -1,16 +1,46 @@
 from django.db import models
 
 
-class Scan(models.Model):
+class ScanRun(models.Model):
     target = models.TextField()
+    resolved_ip = models.TextField(default="")
+    parameters = models.TextField(default="{}")
+    started_at = models.TextField()
+    finished_at = models.TextField(null=True)
+
+    class Meta:
+        db_table = "scan_runs"
+        managed = False
+        ordering = ["-id"]
+
+    def __str__(self) -> str:
+        return f"{self.target} @ {self.started_at}"
+
+
+class ScanResult(models.Model):
+    run = models.ForeignKey(ScanRun, on_delete=models.CASCADE, related_name="results", db_column="run_id")
     port = models.IntegerField()
     status = models.TextField()
-    timestamp = models.TextField()
+    service = models.TextField(default="")
+    version = models.TextField(default="")
 
     class Meta:
-        db_table = "scans"
+        db_table = "scan_results"
         managed = False
         ordering = ["-id"]
 
     def __str__(self) -> str:
-        return f"{self.target}:{self.port} {self.status}"
+        return f"{self.run.target}:{self.port} {self.status}"
+
+
+class ScanPortStates(models.Model):
+    """Packed CLOSED / FILTERED states of a compact run (see TriNetra.database.expand_port_states)."""
+
+    run = models.OneToOneField(
+        ScanRun, on_delete=models.CASCADE, primary_key=True, related_name="port_states", db_column="run_id"
+    )
+    states = models.BinaryField()
+
+    class Meta:
+        db_table = "scan_port_states"
+        managed = False
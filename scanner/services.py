@@ -1,36 +1,7 @@
-COMMON_PORT_SERVICES = {
-    20: "FTP-Data",
-    21: "FTP",
-    22: "SSH",
-    23: "Telnet",
-    25: "SMTP",
-    53: "DNS",
-    67: "DHCP Server",
-    68: "DHCP Client",
-    80: "HTTP",
-    110: "POP3",
-    123: "NTP",
-    143: "IMAP",
-    161: "SNMP",
-    389: "LDAP",
-    443: "HTTPS",
-    445: "SMB",
-    465: "SMTPS",
-    587: "SMTP Submission",
-    993: "IMAPS",
-    995: "POP3S",
-    1433: "MSSQL",
-    1521: "Oracle DB",
-    3306: "MySQL",
-    3389: "RDP",
-    5432: "PostgreSQL",
-    5900: "VNC",
-    6379: "Redis",
-    8080: "HTTP-Alt",
-    8443: "HTTPS-Alt",
-    27017: "MongoDB",
-}
+from TriNetra.services import COMMON_PORT_SERVICES, service_name
+
+__all__ = ["COMMON_PORT_SERVICES", "get_service_name"]
 
 
 def get_service_name(port: int) -> str:
-    return COMMON_PORT_SERVICES.get(port, "Unknown")
+    return service_name(port)
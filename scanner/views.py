@@ -1,5 +1,6 @@
 import csv
 import json
+from itertools import count
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
 
@@ -8,13 +9,21 @@ from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render
 from django.views.decorators.http import require_POST
 
-from TriNetra.database import initialize_database, insert_scan_results
-from TriNetra.scanner import parse_port_range, resolve_target, scan_ports
+from TriNetra.database import expand_port_states, initialize_database
+from TriNetra.discovery import discover_hosts
+from TriNetra.scanner import scan_hosts_iter
+from TriNetra.targets import parse_targets
+from TriNetra.topports import select_ports
+from TriNetra.writer import ResultWriter
 
 from .forms import HistoryFilterForm, ScanForm
-from .models import Scan
+from .models import ScanResult, ScanRun
 from .services import get_service_name
 
+# Upper bound on hosts × ports for one synchronous web scan.
+MAX_PROBES_PER_REQUEST = 4096
+
+
 def scan_view(request):
     form = ScanForm(request.POST or None)
     is_async_request = (
@@ -29,6 +38,7 @@ def scan_view(request):
         "saved_rows": 0,
         "resolved_ip": "",
         "target": "",
+        "skipped_hosts": [],
         "error": "",
     }
 
@@ -38,17 +48,48 @@ def scan_view(request):
     if request.method == "POST" and form.is_valid():
         target = form.cleaned_data["target"].strip()
         ports_raw = form.cleaned_data["ports"].strip()
+        top_count = form.cleaned_data["top_ports"]
         timeout = form.cleaned_data["timeout"]
 
         try:
-            ports = parse_port_range(ports_raw)
-            if len(ports) > 4096:
+            ports = select_ports(ports_raw, top_count)
+            if len(ports) > MAX_PROBES_PER_REQUEST:
                 raise ValueError("Port list too large. Please scan 4096 ports or fewer per request.")
 
-            resolved_ip = resolve_target(target)
-            results = scan_ports(resolved_ip, ports, timeout)
+            targets = parse_targets(target, max_targets=MAX_PROBES_PER_REQUEST)
+            if len(targets) * len(ports) > MAX_PROBES_PER_REQUEST:
+                raise ValueError(
+                    f"Scan too large: {len(targets)} hosts × {len(ports)} ports. "
+                    "Please keep hosts × ports at 4096 or fewer per request."
+                )
+
+            labels = {item.address: item.label for item in targets}
+            skipped_hosts = []
+            if len(labels) > 1:
+                discovery = discover_hosts(list(labels), timeout=timeout)
+                skipped_hosts = [labels.pop(address) for address in discovery.down]
+                if not labels:
+                    raise ValueError(f"No live hosts found among {len(skipped_hosts)} targets; nothing was scanned.")
             scan_timestamp = datetime.now(timezone.utc).isoformat()
-            saved_rows = insert_scan_results(db_path, target, results, timestamp=scan_timestamp)
+            parameters = {"ports": ports_raw, "top_ports": top_count, "timeout": timeout}
+            found = {}
+            # Results are stored while the scan runs, not after it.
+            with ResultWriter(
+                db_path,
+                scan_timestamp,
+                addresses={label: address for address, label in labels.items()},
+                parameters=parameters,
+                compact=settings.TRINETRA_COMPACT_STORAGE,
+            ) as writer:
+                for address, port, service, status in scan_hosts_iter(list(labels), ports, timeout):
+                    found[(address, port)] = (service, status)
+                    writer.put((labels[address], port, service, status))
+            saved_rows = writer.saved_rows
+            results = [
+                (label, port, *found[(address, port)])
+                for address, label in labels.items()
+                for port in ports
+            ]
         except ValueError as error:
             context["error"] = str(error)
             if is_async_request:
@@ -60,18 +101,21 @@ def scan_view(request):
                 return JsonResponse({"ok": False, "error": context["error"]}, status=400)
             return render(request, "scanner/scan.html", context)
 
-        open_count = sum(1 for _, _, status in results if status == "OPEN")
+        resolved_ip = targets[0].address if len(targets) == 1 else f"{len(targets)} hosts"
+        open_count = sum(1 for *_, status in results if status == "OPEN")
         closed_count = len(results) - open_count
         request.session["latest_scan_target"] = target
+        request.session["latest_scan_targets"] = list(labels.values())
         request.session["latest_scan_timestamp"] = scan_timestamp
         ui_results = [
             {
+                "target": host,
                 "port": port,
                 "status": status,
                 "service": service or get_service_name(port),
                 "timestamp": scan_timestamp,
             }
-            for port, service, status in results
+            for host, port, service, status in results
         ]
 
         context.update(
@@ -82,6 +126,7 @@ def scan_view(request):
                 "saved_rows": saved_rows,
                 "resolved_ip": resolved_ip,
                 "target": target,
+                "skipped_hosts": skipped_hosts,
             }
         )
 
@@ -95,6 +140,7 @@ def scan_view(request):
                     "saved_rows": saved_rows,
                     "resolved_ip": resolved_ip,
                     "target": target,
+                    "skipped_hosts": skipped_hosts,
                 }
             )
 
@@ -111,33 +157,7 @@ def scan_view(request):
 def history_view(request):
     initialize_database(str(Path(settings.DATABASES["default"]["NAME"])))
     form = HistoryFilterForm(request.GET or None)
-    scans = Scan.objects.all().only("target", "port", "status", "timestamp")
-
-    if form.is_valid():
-        target = (form.cleaned_data.get("target") or "").strip()
-        start_date = form.cleaned_data.get("start_date")
-        end_date = form.cleaned_data.get("end_date")
-
-        if target:
-            scans = scans.filter(target__icontains=target)
-        if start_date:
-            scans = scans.filter(timestamp__gte=start_date.isoformat())
-        if end_date:
-            end_exclusive = (end_date + timedelta(days=1)).isoformat()
-            scans = scans.filter(timestamp__lt=end_exclusive)
-
-    rows = scans[:500]
-    history_rows = [
-        {
-            "id": item.id,
-            "target": item.target,
-            "port": item.port,
-            "status": item.status,
-            "timestamp": item.timestamp,
-            "service": get_service_name(item.port),
-        }
-        for item in rows
-    ]
+    history_rows = _run_rows(_filter_runs(form, ScanRun.objects.all()), limit=500, with_id=True)
 
     return render(
         request,
@@ -149,23 +169,77 @@ def history_view(request):
     )
 
 
-def _build_filtered_queryset(request):
-    form = HistoryFilterForm(request.GET or None)
-    scans = Scan.objects.all().only("target", "port", "status", "timestamp")
-
+def _filter_runs(form, runs):
     if form.is_valid():
         target = (form.cleaned_data.get("target") or "").strip()
         start_date = form.cleaned_data.get("start_date")
         end_date = form.cleaned_data.get("end_date")
 
         if target:
-            scans = scans.filter(target__icontains=target)
+            runs = runs.filter(target__icontains=target)
         if start_date:
-            scans = scans.filter(timestamp__gte=start_date.isoformat())
+            runs = runs.filter(started_at__gte=start_date.isoformat())
         if end_date:
-            scans = scans.filter(timestamp__lt=(end_date + timedelta(days=1)).isoformat())
+            runs = runs.filter(started_at__lt=(end_date + timedelta(days=1)).isoformat())
 
-    return scans.order_by("-id")[:2000]
+    return runs
+
+
+def _result_payload(run, port, status, service="", version="", row_id=None):
+    payload = {
+        "target": run.target,
+        "port": port,
+        "status": status,
+        "service": service or get_service_name(port),
+        "version": version,
+        "timestamp": run.started_at,
+    }
+    if row_id is not None:
+        payload["id"] = row_id
+    return payload
+
+
+# Runs read per query while collecting history rows.
+RUN_CHUNK = 50
+
+
+def _run_rows(runs, limit=None, with_id=False):
+    """Result payloads for ``runs`` (newest run first), up to ``limit`` rows.
+
+    Compact runs are expanded from their port-state blob: CLOSED and
+    FILTERED ports come back without a row id, merged with the run's
+    stored rows in descending port order.
+    """
+    runs = runs.select_related("port_states").order_by("-id")
+    payload = []
+    for begin in count(0, RUN_CHUNK):
+        chunk = list(runs[begin:begin + RUN_CHUNK])
+        if not chunk:
+            break
+        details = ScanResult.objects.filter(run__in=chunk).order_by("-run_id", "-id")
+        if limit is not None:
+            # Earlier runs always use up at least their own stored rows.
+            details = details[:limit - len(payload)]
+        by_run = {}
+        for item in details:
+            by_run.setdefault(item.run_id, []).append(item)
+
+        for run in chunk:
+            rows = [
+                _result_payload(run, item.port, item.status, item.service, item.version, item.id if with_id else None)
+                for item in by_run.get(run.id, [])
+            ]
+            port_states = getattr(run, "port_states", None)
+            if port_states is not None:
+                rows.extend(
+                    _result_payload(run, port, status)
+                    for port, status in expand_port_states(bytes(port_states.states))
+                )
+                rows.sort(key=lambda row: row["port"], reverse=True)
+            payload.extend(rows)
+            if limit is not None and len(payload) >= limit:
+                return payload[:limit]
+    return payload
 
 
 def export_scans_view(request):
@@ -174,28 +248,15 @@ def export_scans_view(request):
     scope = (request.GET.get("scope") or "history").lower()
 
     if scope == "latest":
-        latest_target = request.session.get("latest_scan_target")
+        latest_targets = request.session.get("latest_scan_targets") or [request.session.get("latest_scan_target")]
         latest_timestamp = request.session.get("latest_scan_timestamp")
-        queryset = Scan.objects.none()
-        if latest_target and latest_timestamp:
-            queryset = Scan.objects.filter(
-                target=latest_target,
-                timestamp=latest_timestamp,
-            ).only("target", "port", "status", "timestamp")
+        payload = []
+        if any(latest_targets) and latest_timestamp:
+            # Served by the (target, started_at) and (run_id, port) indexes.
+            payload = _run_rows(ScanRun.objects.filter(target__in=latest_targets, started_at=latest_timestamp))
     else:
-        queryset = _build_filtered_queryset(request)
-
-    rows = list(queryset)
-    payload = [
-        {
-            "target": item.target,
-            "port": item.port,
-            "status": item.status,
-            "service": get_service_name(item.port),
-            "timestamp": item.timestamp,
-        }
-        for item in rows
-    ]
+        form = HistoryFilterForm(request.GET or None)
+        payload = _run_rows(_filter_runs(form, ScanRun.objects.all()), limit=2000)
 
     timestamp_label = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
 
@@ -210,9 +271,9 @@ def export_scans_view(request):
     response = HttpResponse(content_type="text/csv")
     response["Content-Disposition"] = f'attachment; filename="trinetra_export_{timestamp_label}.csv"'
     writer = csv.writer(response)
-    writer.writerow(["target", "port", "status", "service", "timestamp"])
+    writer.writerow(["target", "port", "status", "service", "version", "timestamp"])
     for item in payload:
-        writer.writerow([item["target"], item["port"], item["status"], item["service"], item["timestamp"]])
+        writer.writerow([item["target"], item["port"], item["status"], item["service"], item["version"], item["timestamp"]])
 
     return response
 
@@ -220,7 +281,7 @@ def export_scans_view(request):
 @require_POST
 def delete_scan_view(request, scan_id: int):
     initialize_database(str(Path(settings.DATABASES["default"]["NAME"])))
-    deleted_count, _ = Scan.objects.filter(id=scan_id).delete()
+    deleted_count, _ = ScanResult.objects.filter(id=scan_id).delete()
 
     if deleted_count == 0:
         return JsonResponse({"ok": False, "error": "Scan row not found."}, status=404)
@@ -231,5 +292,6 @@ def delete_scan_view(request, scan_id: int):
 @require_POST
 def delete_all_scans_view(request):
     initialize_database(str(Path(settings.DATABASES["default"]["NAME"])))
-    deleted_count, _ = Scan.objects.all().delete()
+    deleted_count, _ = ScanResult.objects.all().delete()
+    ScanRun.objects.all().delete()
     return JsonResponse({"ok": True, "deleted_count": deleted_count})
@@ -0,0 +1,78 @@
+import errno
+import socket
+
+import pytest
+
+from TriNetra import asyncscan
+from TriNetra.asyncscan import async_probe_ports, async_probe_targets
+
+
+@pytest.fixture
+def loopback_ports():
+    """An (open, closed) pair of loopback ports."""
+    with socket.socket() as listener, socket.socket() as reserved:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(8)
+        reserved.bind(("127.0.0.1", 0))
+        closed_port = reserved.getsockname()[1]
+        reserved.close()
+        yield listener.getsockname()[1], closed_port
+
+
+def test_open_and_closed_loopback_ports(loopback_ports):
+    open_port, closed_port = loopback_ports
+
+    assert async_probe_ports("127.0.0.1", [open_port, closed_port], timeout=0.5) == {
+        open_port: "OPEN",
+        closed_port: "CLOSED",
+    }
+
+
+def test_on_result_streams_instead_of_collecting(loopback_ports):
+    open_port, closed_port = loopback_ports
+    seen = {}
+
+    statuses = async_probe_ports(
+        "127.0.0.1", [open_port, closed_port], timeout=0.5, on_result=lambda port, status: seen.update({port: status})
+    )
+
+    assert statuses == {}
+    assert seen == {open_port: "OPEN", closed_port: "CLOSED"}
+
+
+def test_keep_open_hands_over_only_open_sockets(loopback_ports):
+    open_port, closed_port = loopback_ports
+    results = {}
+
+    async_probe_targets(
+        [("127.0.0.1", open_port), ("127.0.0.1", closed_port)],
+        2,
+        timeout=0.5,
+        on_result=lambda host, port, status, sock: results.update({port: (status, sock)}),
+        keep_open=True,
+    )
+
+    status, sock = results[open_port]
+    assert status == "OPEN"
+    assert sock.getpeername()[1] == open_port
+    sock.close()
+    assert results[closed_port] == ("CLOSED", None)
+
+
+def test_running_out_of_descriptors_is_an_error_not_a_crash(monkeypatch, loopback_ports):
+    open_port, closed_port = loopback_ports
+
+    real_socket = socket.socket
+
+    def exhausted(family=-1, *args, **kwargs):
+        # Only the probe sockets fail; the event loop's own socketpair is spared.
+        if family == socket.AF_INET:
+            raise OSError(errno.EMFILE, "Too many open files")
+        return real_socket(family, *args, **kwargs)
+
+    monkeypatch.setattr(asyncscan.socket, "socket", exhausted)
+
+    assert async_probe_ports("127.0.0.1", [open_port, closed_port], timeout=0.5) == {
+        open_port: "ERROR",
+        closed_port: "ERROR",
+    }
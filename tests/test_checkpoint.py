@@ -0,0 +1,24 @@
+from TriNetra.checkpoint import remaining_work
+from TriNetra.targets import ScanTarget
+
+A = ScanTarget("a.example", "10.0.0.1")
+B = ScanTarget("10.0.0.2", "10.0.0.2")
+
+
+def test_nothing_done_is_one_batch_for_every_target():
+    assert remaining_work([A, B], [22, 80, 443], []) == [([A, B], [22, 80, 443])]
+
+
+def test_targets_stopped_at_the_same_port_share_a_batch():
+    done = [("a.example", 22), ("10.0.0.2", 22)]
+    assert remaining_work([A, B], [22, 80, 443], done) == [([A, B], [80, 443])]
+
+
+def test_targets_with_different_progress_get_their_own_batches():
+    done = [("a.example", 22), ("a.example", 80), ("10.0.0.2", 22)]
+    assert remaining_work([A, B], [22, 80, 443], done) == [([A], [443]), ([B], [80, 443])]
+
+
+def test_done_pairs_match_by_label_and_finished_targets_drop_out():
+    done = [("10.0.0.1", 22), ("10.0.0.2", 22), ("10.0.0.2", 80)]
+    assert remaining_work([A, B], [22, 80], done) == [([A], [22, 80])]
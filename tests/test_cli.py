@@ -0,0 +1,68 @@
+import pytest
+
+pytest.importorskip("rich")
+
+from TriNetra.cli import _apply_defaults, _restore_settings, _scan_settings, build_argument_parser
+from TriNetra.database import ScanCheckpoint
+
+STORED = {
+    "timeout": 0.8,
+    "adaptive_timeout": True,
+    "rate": 500.0,
+    "engine": "async",
+    "threads": 50,
+    "concurrency": 200,
+    "processes": 1,
+    "discovery": False,
+    "compact": False,
+}
+
+
+def _checkpoint(settings):
+    return ScanCheckpoint(7, "10.0.0.1", {}, [("10.0.0.1", "10.0.0.1")], [], "t1", 0, "running", settings)
+
+
+def _resume(*flags):
+    args = build_argument_parser().parse_args(["--resume", "7", *flags])
+    _restore_settings(args, _checkpoint(STORED))
+    _apply_defaults(args)
+    return args
+
+
+def test_a_resumed_scan_keeps_every_stored_option():
+    assert _scan_settings(_resume()) == STORED
+
+
+def test_repeating_a_stored_option_is_allowed():
+    assert _resume("--timeout", "0.8", "--engine", "async").timeout == 0.8
+
+
+@pytest.mark.parametrize("flags", [["--timeout", "0.5"], ["--threads", "100"], ["--compact"], ["--rate", "100"]])
+def test_an_explicit_flag_that_contradicts_the_checkpoint_is_rejected(flags):
+    with pytest.raises(ValueError):
+        _resume(*flags)
+
+
+def test_a_new_scan_gets_the_documented_defaults():
+    args = build_argument_parser().parse_args(["127.0.0.1", "80"])
+    _apply_defaults(args)
+    assert (args.timeout, args.engine, args.threads, args.adaptive_timeout) == (0.5, "auto", 100, False)
+
+
+def test_a_database_error_mid_scan_points_at_resume(monkeypatch, tmp_path):
+    import sqlite3
+    import sys
+
+    from TriNetra import cli
+
+    def failing_scan(*args, **kwargs):
+        raise sqlite3.OperationalError("database or disk is full")
+
+    errors = []
+    monkeypatch.setattr(cli, "perform_scan", failing_scan)
+    monkeypatch.setattr(cli, "print_error", errors.append)
+    monkeypatch.setattr(sys, "argv", ["trinetra", "127.0.0.1", "9", "--db", str(tmp_path / "scan.db")])
+
+    assert cli.run() == 1
+    assert "database or disk is full" in errors[-1]
+    assert "--resume" in errors[-1]
@@ -0,0 +1,89 @@
+import multiprocessing
+import random
+import sqlite3
+
+from TriNetra.database import (
+    PORT_STATES_SIZE,
+    encode_port_states,
+    expand_port_states,
+    fetch_scan_rows,
+    initialize_database,
+    insert_scan_results,
+    merge_port_states,
+)
+
+
+def test_encode_and_expand_round_trip():
+    randomizer = random.Random(7)
+    results = [(port, randomizer.choice(["OPEN", "CLOSED", "FILTERED", "ERROR"])) for port in range(65536)]
+    states = encode_port_states(results)
+
+    assert len(states) == PORT_STATES_SIZE
+    assert dict(expand_port_states(states)) == {port: status for port, status in results if status in ("CLOSED", "FILTERED")}
+
+
+def test_encode_overwrites_and_unscanned_ports_are_skipped():
+    states = encode_port_states([(1, "CLOSED"), (2, "FILTERED"), (65535, "CLOSED")])
+    states = encode_port_states([(2, "CLOSED"), (3, "OPEN")], states)
+
+    assert list(expand_port_states(states)) == [(1, "CLOSED"), (2, "CLOSED"), (65535, "CLOSED")]
+
+
+def test_merge_keeps_ports_the_other_blob_never_scanned():
+    first = encode_port_states([(10, "CLOSED"), (11, "FILTERED")])
+    second = encode_port_states([(11, "CLOSED"), (12, "FILTERED")])
+
+    assert list(expand_port_states(merge_port_states(first, second))) == [(10, "CLOSED"), (11, "CLOSED"), (12, "FILTERED")]
+
+
+def test_compact_run_stores_only_open_rows_and_expands_on_fetch(tmp_path):
+    db = str(tmp_path / "compact.db")
+    initialize_database(db)
+    insert_scan_results(
+        db,
+        "a",
+        [(22, "SSH", "OpenSSH 9", "OPEN"), (23, "", "", "CLOSED"), (24, "", "", "FILTERED"), (25, "", "", "ERROR")],
+        timestamp="t1",
+        compact=True,
+    )
+
+    connection = sqlite3.connect(db)
+    assert connection.execute("SELECT port, status FROM scan_results ORDER BY port").fetchall() == [(22, "OPEN"), (25, "ERROR")]
+    assert sorted(fetch_scan_rows(db, ["a"], "t1")) == [
+        ("a", 22, "SSH", "OpenSSH 9", "OPEN"),
+        ("a", 23, "", "", "CLOSED"),
+        ("a", 24, "", "", "FILTERED"),
+        ("a", 25, "", "", "ERROR"),
+    ]
+
+
+def _compact_writer(db_path, barrier, ports):
+    barrier.wait()
+    for begin in range(0, len(ports), 25):
+        insert_scan_results(
+            db_path,
+            "host",
+            [(port, "CLOSED") for port in ports[begin:begin + 25]],
+            timestamp="t1",
+            finished=False,
+            compact=True,
+        )
+
+
+def test_concurrent_compact_writers_keep_every_port(tmp_path):
+    db = str(tmp_path / "race.db")
+    initialize_database(db)
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(4)
+    processes = [
+        context.Process(target=_compact_writer, args=(db, barrier, list(range(1 + index * 500, 501 + index * 500))))
+        for index in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(30)
+        assert process.exitcode == 0
+
+    ports = [port for _, port, *_ in fetch_scan_rows(db, ["host"], "t1")]
+    assert sorted(ports) == list(range(1, 2001))
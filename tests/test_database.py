@@ -0,0 +1,164 @@
+import multiprocessing
+import sqlite3
+
+from TriNetra.database import (
+    create_checkpoint,
+    fetch_scan_rows,
+    finish_scan_runs,
+    initialize_database,
+    insert_scan_results,
+    load_checkpoint,
+)
+
+
+def _writer(db_path, barrier, ports):
+    barrier.wait()
+    for begin in range(0, len(ports), 50):
+        insert_scan_results(
+            db_path,
+            "host",
+            [(port, "CLOSED") for port in ports[begin:begin + 50]],
+            timestamp="2026-01-01T00:00:00+00:00",
+            finished=False,
+        )
+
+
+def _run_writers(db_path, workers=4, ports_each=500, target=_writer):
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(workers)
+    processes = [
+        context.Process(target=target, args=(db_path, barrier, list(range(1 + index * ports_each, 1 + (index + 1) * ports_each))))
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(30)
+        assert process.exitcode == 0
+
+
+def test_insert_and_fetch_batches_share_one_run(tmp_path):
+    db = str(tmp_path / "scans.db")
+    initialize_database(db)
+    insert_scan_results(db, "a", [(22, "SSH", "OpenSSH 9", "OPEN")], timestamp="t1", finished=False)
+    insert_scan_results(db, "a", [(23, "CLOSED")], timestamp="t1", finished=False)
+    insert_scan_results(db, "b", [(80, "HTTP", "CLOSED")], timestamp="t1")
+    finish_scan_runs(db, ["a"], "t1")
+
+    connection = sqlite3.connect(db)
+    assert connection.execute("SELECT COUNT(*), COUNT(finished_at) FROM scan_runs").fetchone() == (2, 2)
+    assert sorted(fetch_scan_rows(db, ["a", "b"], "t1")) == [
+        ("a", 22, "SSH", "OpenSSH 9", "OPEN"),
+        ("a", 23, "", "", "CLOSED"),
+        ("b", 80, "HTTP", "", "CLOSED"),
+    ]
+
+
+def test_legacy_scans_table_is_migrated(tmp_path):
+    db = str(tmp_path / "legacy.db")
+    connection = sqlite3.connect(db)
+    connection.execute("CREATE TABLE scans (id INTEGER PRIMARY KEY, target TEXT, port INTEGER, status TEXT, timestamp TEXT)")
+    connection.executemany(
+        "INSERT INTO scans(target, port, status, timestamp) VALUES (?, ?, ?, ?)",
+        [("a", 22, "OPEN", "t1"), ("a", 23, "CLOSED", "t1"), ("a", 22, "OPEN", "t2"), ("b", 80, "CLOSED", "t1")],
+    )
+    connection.commit()
+    connection.close()
+
+    initialize_database(db)
+    connection = sqlite3.connect(db)
+    assert connection.execute("SELECT COUNT(*) FROM scan_runs").fetchone() == (3,)
+    assert connection.execute("SELECT COUNT(*) FROM scan_results").fetchone() == (4,)
+    assert connection.execute("SELECT type FROM sqlite_master WHERE name = 'scans'").fetchone() == ("view",)
+    assert sorted(connection.execute("SELECT target, port, status, timestamp FROM scans")) == [
+        ("a", 22, "OPEN", "t1"),
+        ("a", 22, "OPEN", "t2"),
+        ("a", 23, "CLOSED", "t1"),
+        ("b", 80, "CLOSED", "t1"),
+    ]
+
+
+def test_duplicate_runs_are_merged_before_the_unique_index(tmp_path):
+    db = str(tmp_path / "dups.db")
+    connection = sqlite3.connect(db)
+    connection.execute(
+        """
+        CREATE TABLE scan_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, target TEXT NOT NULL, resolved_ip TEXT NOT NULL DEFAULT '',
+            parameters TEXT NOT NULL DEFAULT '{}', started_at TEXT NOT NULL, finished_at TEXT
+        )
+        """
+    )
+    connection.execute(
+        """
+        CREATE TABLE scan_results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, run_id INTEGER NOT NULL, port INTEGER NOT NULL,
+            status TEXT NOT NULL, service TEXT NOT NULL DEFAULT '', version TEXT NOT NULL DEFAULT ''
+        )
+        """
+    )
+    connection.executemany(
+        "INSERT INTO scan_runs(id, target, started_at, finished_at) VALUES (?, 'a', 't1', ?)",
+        [(1, None), (2, "t2"), (3, None)],
+    )
+    connection.executemany("INSERT INTO scan_results(run_id, port, status) VALUES (?, ?, 'CLOSED')", [(1, 1), (2, 2), (3, 3)])
+    connection.commit()
+    connection.close()
+
+    initialize_database(db)
+    connection = sqlite3.connect(db)
+    assert connection.execute("SELECT id, finished_at FROM scan_runs").fetchall() == [(1, "t2")]
+    assert connection.execute("SELECT run_id, port FROM scan_results ORDER BY port").fetchall() == [(1, 1), (1, 2), (1, 3)]
+
+
+def test_checkpoint_settings_survive_an_old_checkpoint_table(tmp_path):
+    db = str(tmp_path / "old_checkpoints.db")
+    connection = sqlite3.connect(db)
+    connection.execute(
+        """
+        CREATE TABLE scan_checkpoints (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, target_spec TEXT NOT NULL, port_spec TEXT NOT NULL,
+            targets TEXT NOT NULL, skipped TEXT NOT NULL DEFAULT '[]', timestamp TEXT NOT NULL,
+            completed INTEGER NOT NULL DEFAULT 0, status TEXT NOT NULL, updated_at TEXT NOT NULL
+        )
+        """
+    )
+    connection.execute(
+        "INSERT INTO scan_checkpoints(target_spec, port_spec, targets, timestamp, status, updated_at) "
+        "VALUES ('a', '{}', '[]', 't1', 'running', 't1')"
+    )
+    connection.commit()
+    connection.close()
+
+    initialize_database(db)
+    assert load_checkpoint(db, 1).settings == {}
+    settings = {"engine": "async", "timeout": 1.5, "rate": None, "processes": 2, "compact": True}
+    scan_id = create_checkpoint(db, "b", {}, [("b", "10.0.0.2")], "t2", settings=settings)
+    assert load_checkpoint(db, scan_id).settings == settings
+
+
+def _run_creator(db_path, barrier, ports):
+    barrier.wait()
+    # Every worker races to create the same 50 runs.
+    for scan in range(50):
+        insert_scan_results(db_path, "host", [(ports[0], "CLOSED")], timestamp=f"t{scan}", finished=False)
+
+
+def test_concurrent_writers_share_one_run(tmp_path):
+    db = str(tmp_path / "race.db")
+    initialize_database(db)
+    _run_writers(db)
+
+    connection = sqlite3.connect(db)
+    assert connection.execute("SELECT COUNT(*) FROM scan_runs").fetchone() == (1,)
+    assert connection.execute("SELECT COUNT(DISTINCT port) FROM scan_results").fetchone() == (2000,)
+
+
+def test_concurrent_run_creation_makes_one_run_per_scan(tmp_path):
+    db = str(tmp_path / "create.db")
+    initialize_database(db)
+    _run_writers(db, workers=8, ports_each=1, target=_run_creator)
+
+    connection = sqlite3.connect(db)
+    assert connection.execute("SELECT COUNT(*) FROM scan_runs").fetchone() == (50,)
+    assert connection.execute("SELECT COUNT(*) FROM scan_results").fetchone() == (400,)
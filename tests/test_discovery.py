@@ -0,0 +1,56 @@
+import socket
+import struct
+
+from TriNetra.discovery import _echo_reply_source, build_echo_request, discover_hosts
+from TriNetra.rawsyn import _checksum
+
+
+def _ip_packet(source, payload):
+    header = struct.pack(
+        "!BBHHHBBH4s4s", 0x45, 0, 20 + len(payload), 0, 0, 64, socket.IPPROTO_ICMP, 0,
+        socket.inet_aton(source), socket.inet_aton("10.0.0.9"),
+    )
+    return header + payload
+
+
+def test_echo_requests_carry_a_valid_checksum():
+    request = build_echo_request(0x1234, 7)
+
+    assert request[0] == 8
+    assert _checksum(request) == 0
+
+
+def test_only_echo_replies_with_our_identifier_count():
+    reply = b"\x00" + build_echo_request(0x1234, 7)[1:]
+
+    assert _echo_reply_source(_ip_packet("10.0.0.5", reply), 0x1234) == "10.0.0.5"
+    assert _echo_reply_source(_ip_packet("10.0.0.5", reply), 0x4321) is None
+    assert _echo_reply_source(_ip_packet("10.0.0.5", build_echo_request(0x1234, 7)), 0x1234) is None
+
+
+def test_a_refused_connect_proves_a_host_is_up(monkeypatch):
+    from TriNetra import asyncscan
+
+    with socket.socket() as reserved:
+        reserved.bind(("127.0.0.1", 0))
+        closed_port = reserved.getsockname()[1]
+
+    real_probe = asyncscan._async_probe_once
+
+    async def probe(ip_address, port, timeout, keep_open=False):
+        # Stand-in for a host that never answers, whatever this network does.
+        if ip_address == "192.0.2.1":
+            return "FILTERED", None
+        return await real_probe(ip_address, port, timeout, keep_open)
+
+    monkeypatch.setattr(asyncscan, "_async_probe_once", probe)
+    result = discover_hosts(
+        ["192.0.2.1", "127.0.0.1", "127.0.0.1"], timeout=0.3, ports=[closed_port], privileged=False
+    )
+
+    assert result.live == ["127.0.0.1"]
+    assert result.down == ["192.0.2.1"]
+
+
+def test_no_hosts_means_no_probes():
+    assert discover_hosts([], privileged=False) == ([], [])
@@ -0,0 +1,58 @@
+import pytest
+
+from TriNetra.portspec import PortSpec
+
+
+def test_parse_merges_overlapping_and_adjacent_ranges():
+    spec = PortSpec.parse("80, 20-25,26,22,443,79")
+
+    assert spec.intervals() == [(20, 26), (79, 80), (443, 443)]
+    assert str(spec) == "20-26,79-80,443"
+    assert len(spec) == 10
+    assert list(spec) == [20, 21, 22, 23, 24, 25, 26, 79, 80, 443]
+
+
+def test_the_full_range_is_one_interval():
+    spec = PortSpec.parse("1-65535")
+
+    assert spec.intervals() == [(1, 65535)]
+    assert len(spec) == 65535
+    assert spec[0] == 1 and spec[-1] == 65535
+
+
+@pytest.mark.parametrize("text", ["", " , ", "0", "1-65536", "90-80", "http", "1-x"])
+def test_parse_rejects_bad_specs(text):
+    with pytest.raises(ValueError):
+        PortSpec.parse(text)
+
+
+def test_indexing_and_membership_follow_the_intervals():
+    spec = PortSpec.parse("20-22,80,443")
+
+    assert [spec[i] for i in range(len(spec))] == [20, 21, 22, 80, 443]
+    assert spec[-2] == 80
+    assert 80 in spec and 23 not in spec and "80" not in spec
+    with pytest.raises(IndexError):
+        spec[5]
+
+
+def test_slices_stay_port_specs_across_interval_boundaries():
+    spec = PortSpec.parse("20-22,80,443")
+
+    assert spec[2:4] == PortSpec.parse("22,80")
+    assert spec[1:] == [21, 22, 80, 443]
+    assert spec[3:3] == PortSpec()
+    assert spec[::2] == [20, 22, 443]
+
+
+def test_chunks_cover_every_port_once():
+    spec = PortSpec.parse("1-10,100")
+    chunks = list(spec.chunks(4))
+
+    assert [len(chunk) for chunk in chunks] == [4, 4, 3]
+    assert [port for chunk in chunks for port in chunk] == list(spec)
+
+
+def test_equality_with_plain_port_lists():
+    assert PortSpec.from_ports([443, 22, 22, 80]) == [22, 80, 443]
+    assert PortSpec.parse("22") != [22, 23]
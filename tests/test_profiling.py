@@ -0,0 +1,72 @@
+import socket
+
+import pytest
+
+from TriNetra.profiling import ScanProfile
+from TriNetra.scanner import scan_ports
+
+
+def test_latencies_land_in_buckets_with_percentiles():
+    profile = ScanProfile()
+    for seconds in (0.0003, 0.0004, 0.0015, 0.3):
+        profile.record_probe("OPEN", seconds)
+    profile.record_probe("FILTERED", None)
+
+    latency = profile.to_dict()["latency"]
+    assert latency["OPEN"]["count"] == 4
+    assert latency["OPEN"]["p50_ms"] == 0.5
+    assert latency["OPEN"]["p99_ms"] == pytest.approx(300)
+    assert latency["OPEN"]["max_ms"] == pytest.approx(300)
+    assert (latency["FILTERED"]["count"], latency["FILTERED"]["unanswered"]) == (0, 1)
+    assert latency["FILTERED"]["p50_ms"] is None
+
+
+def test_phases_and_retries_are_counted():
+    profile = ScanProfile()
+    with profile.phase("render"):
+        pass
+    profile.add_time("database", 0.25, calls=3)
+    profile.record_retries(5)
+    profile.record_retries(2)
+    profile.finish()
+
+    data = profile.to_dict()
+    assert data["phases"]["render"]["calls"] == 1
+    assert data["phases"]["database"] == {"seconds": 0.25, "calls": 3}
+    assert (data["retries"], data["retry_passes"]) == (7, 2)
+    assert data["wall_seconds"] == profile.to_dict()["wall_seconds"]
+
+
+def test_worker_profiles_merge_into_one():
+    worker = ScanProfile()
+    worker.add_time("probe", 1.5)
+    worker.record_probe("CLOSED", 0.002)
+    worker.record_retries(4)
+    parent = ScanProfile()
+    parent.add_time("probe", 0.5)
+    parent.record_probe("CLOSED", 0.004)
+
+    parent.merge(worker.to_dict())
+
+    data = parent.to_dict()
+    assert data["phases"]["probe"] == {"seconds": 2.0, "calls": 2}
+    assert data["latency"]["CLOSED"]["count"] == 2
+    assert data["latency"]["CLOSED"]["max_ms"] == pytest.approx(4)
+    assert data["retries"] == 4
+
+
+def test_a_scan_records_one_outcome_per_probe():
+    with socket.socket() as listener, socket.socket() as reserved:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(8)
+        reserved.bind(("127.0.0.1", 0))
+        open_port = listener.getsockname()[1]
+        closed_port = reserved.getsockname()[1]
+        reserved.close()
+
+        profile = ScanProfile()
+        scan_ports("127.0.0.1", [open_port, closed_port], timeout=0.5, engine="thread", retry_count=0, profile=profile)
+
+    latency = profile.to_dict()["latency"]
+    assert latency["OPEN"]["count"] == 1
+    assert latency["CLOSED"]["count"] == 1
@@ -0,0 +1,64 @@
+import pytest
+
+from TriNetra import ratelimit
+from TriNetra.ratelimit import RateLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _window(limiter, timeouts):
+    for index in range(limiter.window):
+        limiter.record("FILTERED" if index < timeouts else "CLOSED")
+
+
+def test_the_burst_is_free_then_probes_are_spaced_at_the_rate(clock):
+    limiter = RateLimiter(100, burst=5)
+
+    assert [limiter.reserve() for _ in range(5)] == [0.0] * 5
+    assert limiter.reserve() == pytest.approx(0.01)
+    assert limiter.reserve() == pytest.approx(0.02)
+
+    clock[0] += 1.0
+    assert limiter.reserve() == 0.0
+
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        RateLimiter(0)
+
+
+def test_a_timeout_spike_halves_the_rate_down_to_the_floor(clock):
+    limiter = RateLimiter(1000, min_rate=200, window=8)
+    _window(limiter, 0)
+
+    _window(limiter, 8)
+    assert limiter.rate == 500
+    _window(limiter, 8)
+    _window(limiter, 8)
+    assert limiter.rate == 200
+    assert limiter.snapshot()["backoffs"] == 3
+
+
+def test_calm_windows_recover_toward_the_configured_rate(clock):
+    limiter = RateLimiter(1000, window=8)
+    _window(limiter, 0)
+    _window(limiter, 8)
+    assert limiter.rate == 500
+
+    for _ in range(20):
+        _window(limiter, 0)
+    assert limiter.rate == 1000
+
+
+def test_a_steadily_firewalled_target_does_not_keep_backing_off(clock):
+    limiter = RateLimiter(1000, window=8)
+
+    for _ in range(20):
+        _window(limiter, 8)
+    assert limiter.backoffs == 0
+    assert limiter.rate == 1000
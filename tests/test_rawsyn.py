@@ -0,0 +1,118 @@
+import os
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from TriNetra.rawsyn import build_syn_packet, parse_reply, raw_syn_scan, raw_syn_scan_port, syn_cookie
+
+needs_raw_sockets = pytest.mark.skipif(
+    not sys.platform.startswith("linux") or os.geteuid() != 0,
+    reason="raw-socket SYN scanning needs root on Linux",
+)
+
+
+def _reply(source, destination, source_port, destination_port, ack, flags):
+    tcp = (
+        source_port.to_bytes(2, "big")
+        + destination_port.to_bytes(2, "big")
+        + (0).to_bytes(4, "big")
+        + ack.to_bytes(4, "big")
+        + bytes([5 << 4, flags])
+        + bytes(6)
+    )
+    ip = bytes([0x45, 0, 0, 40, 0, 0, 0, 0, 64, socket.IPPROTO_TCP, 0, 0])
+    return ip + socket.inet_aton(source) + socket.inet_aton(destination) + tcp
+
+
+def test_only_replies_acknowledging_the_cookie_are_accepted():
+    cookie = syn_cookie("10.0.0.1", "10.0.0.2", 45000, 443)
+    packet = build_syn_packet("10.0.0.1", "10.0.0.2", 45000, 443)
+    assert int.from_bytes(packet[24:28], "big") == cookie
+
+    syn_ack = _reply("10.0.0.2", "10.0.0.1", 443, 45000, cookie + 1, 0x12)
+    rst_ack = _reply("10.0.0.2", "10.0.0.1", 443, 45000, cookie + 1, 0x14)
+    assert parse_reply(syn_ack, "10.0.0.1") == (443, "OPEN")
+    assert parse_reply(rst_ack, "10.0.0.1") == (443, "CLOSED")
+    assert parse_reply(_reply("10.0.0.2", "10.0.0.1", 443, 45000, cookie + 2, 0x12), "10.0.0.1") is None
+    assert parse_reply(syn_ack, "10.0.0.9") is None
+
+
+@pytest.fixture
+def loopback_ports():
+    """Three listening ports and three ports nothing listens on."""
+    listeners = []
+    expected = {}
+    for _ in range(3):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(8)
+        listeners.append(listener)
+        expected[listener.getsockname()[1]] = "OPEN"
+    for _ in range(3):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as reserved:
+            reserved.bind(("127.0.0.1", 0))
+            expected[reserved.getsockname()[1]] = "CLOSED"
+    yield expected
+    for listener in listeners:
+        listener.close()
+
+
+@needs_raw_sockets
+def test_loopback_ports_get_their_real_state(loopback_ports):
+    assert raw_syn_scan("127.0.0.1", loopback_ports, timeout=2.0) == loopback_ports
+
+
+@needs_raw_sockets
+def test_a_single_port_returns_once_it_is_answered(loopback_ports):
+    started = time.monotonic()
+    for port, status in loopback_ports.items():
+        assert raw_syn_scan_port("127.0.0.1", port, timeout=2.0) == status
+    assert time.monotonic() - started < 2.0
+
+
+@needs_raw_sockets
+@pytest.mark.parametrize("rate", [0, None, -5])
+def test_a_rate_of_zero_or_less_sends_unpaced(loopback_ports, rate):
+    assert raw_syn_scan("127.0.0.1", loopback_ports, timeout=2.0, rate=rate) == loopback_ports
+
+
+def _closed_ports(count):
+    ports = set()
+    while len(ports) < count:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as reserved:
+            reserved.bind(("127.0.0.1", 0))
+            ports.add(reserved.getsockname()[1])
+    return sorted(ports)
+
+
+@needs_raw_sockets
+def test_concurrent_single_port_probes_keep_their_own_replies(loopback_ports):
+    expected = dict(loopback_ports)
+    expected.update((port, "CLOSED") for port in _closed_ports(200) if port not in expected)
+
+    with ThreadPoolExecutor(max_workers=100) as pool:
+        statuses = dict(zip(expected, pool.map(lambda port: raw_syn_scan_port("127.0.0.1", port, 2.0), expected)))
+    assert statuses == expected
+
+
+@needs_raw_sockets
+def test_concurrent_scans_of_one_host_only_report_their_own_ports():
+    ports = _closed_ports(400)
+    halves = [ports[:200], ports[200:]]
+    reported = [[], []]
+
+    def scan(index):
+        def on_result(port, status):
+            reported[index].append(port)
+
+        return raw_syn_scan("127.0.0.1", halves[index], timeout=2.0, rate=None, on_result=on_result)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(scan, range(2)))
+
+    for index in range(2):
+        assert results[index] == {port: "CLOSED" for port in halves[index]}
+        assert sorted(reported[index]) == halves[index]
@@ -0,0 +1,31 @@
+import socket
+
+import pytest
+
+from TriNetra import resolver
+from TriNetra.resolver import Resolver
+
+
+def _dns_has_no_records(self, name):
+    raise socket.gaierror(socket.EAI_NONAME, f"No A or AAAA records for {name}")
+
+
+def test_names_unknown_to_dns_fall_back_to_the_system_resolver(monkeypatch):
+    monkeypatch.setattr(resolver, "_DNSPYTHON_AVAILABLE", True)
+    monkeypatch.setattr(Resolver, "_lookup_dnspython", _dns_has_no_records)
+    monkeypatch.setattr(Resolver, "_lookup_system", lambda self, name: (["10.1.2.3"], self.default_ttl))
+
+    assert Resolver(use_dnspython=True).resolve("only-in-etc-hosts") == ["10.1.2.3"]
+
+
+def test_dns_failures_other_than_a_missing_name_are_raised(monkeypatch):
+    def dns_timeout(self, name):
+        raise socket.gaierror(socket.EAI_AGAIN, "DNS lookup failed")
+
+    monkeypatch.setattr(resolver, "_DNSPYTHON_AVAILABLE", True)
+    monkeypatch.setattr(Resolver, "_lookup_dnspython", dns_timeout)
+    monkeypatch.setattr(Resolver, "_lookup_system", lambda self, name: (["10.1.2.3"], self.default_ttl))
+
+    with pytest.raises(socket.gaierror) as raised:
+        Resolver(use_dnspython=True).resolve("example.test")
+    assert raised.value.errno == socket.EAI_AGAIN
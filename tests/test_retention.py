@@ -0,0 +1,121 @@
+import json
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from TriNetra.database import create_checkpoint, initialize_database, insert_scan_results
+from TriNetra.retention import enable_incremental_vacuum, prune_scans
+
+NOW = datetime(2026, 6, 1, tzinfo=timezone.utc)
+
+
+def _rows(count=2000):
+    return [
+        (port, "svc", "", "OPEN" if port % 500 == 0 else ("FILTERED" if port % 7 == 0 else "CLOSED"))
+        for port in range(1, count + 1)
+    ]
+
+
+def _ago(days):
+    return (NOW - timedelta(days=days)).isoformat()
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "scans.db")
+    initialize_database(path)
+    return path
+
+
+def _runs(db):
+    connection = sqlite3.connect(db)
+    return {
+        target: (results, json.loads(summary) if summary else None)
+        for target, results, summary in connection.execute(
+            """
+            SELECT target, (SELECT COUNT(*) FROM scan_results WHERE run_id = scan_runs.id),
+                   (SELECT status_counts FROM scan_run_summaries WHERE run_id = scan_runs.id)
+            FROM scan_runs
+            """
+        )
+    }
+
+
+def test_old_runs_are_rolled_up_to_open_ports_and_counts(db):
+    insert_scan_results(db, "old", _rows(), timestamp=_ago(40))
+    insert_scan_results(db, "old-compact", _rows(), timestamp=_ago(40), compact=True)
+    insert_scan_results(db, "recent", _rows(), timestamp=_ago(5))
+    insert_scan_results(db, "unfinished", _rows(), timestamp=_ago(40), finished=False)
+
+    report = prune_scans(db, detail_days=30, batch_size=7, now=NOW)
+
+    counts = {"OPEN": 4, "FILTERED": 285, "CLOSED": 1711}
+    assert _runs(db) == {
+        "old": (4, counts),
+        "old-compact": (4, counts),
+        "recent": (2000, None),
+        "unfinished": (2000, None),
+    }
+    assert report.runs_rolled_up == 2
+    assert report.rows_deleted == 1996
+    assert sqlite3.connect(db).execute("SELECT COUNT(*) FROM scan_port_states").fetchone() == (0,)
+    assert prune_scans(db, detail_days=30, now=NOW).runs_rolled_up == 0
+
+
+def test_runs_past_the_retention_period_are_deleted_with_their_rows(db):
+    insert_scan_results(db, "ancient", _rows(), timestamp=_ago(400), compact=True)
+    insert_scan_results(db, "old", _rows(), timestamp=_ago(40))
+    create_checkpoint(db, "ancient", {}, [("ancient", "10.0.0.1")], _ago(400))
+    prune_scans(db, detail_days=30, now=NOW)
+
+    report = prune_scans(db, detail_days=30, delete_days=365, batch_size=3, now=NOW)
+
+    connection = sqlite3.connect(db)
+    assert report.runs_deleted == 1
+    assert list(_runs(db)) == ["old"]
+    assert connection.execute("SELECT COUNT(*) FROM scan_results WHERE run_id NOT IN (SELECT id FROM scan_runs)").fetchone() == (0,)
+    assert connection.execute("SELECT COUNT(*) FROM scan_run_summaries").fetchone() == (1,)
+    assert connection.execute("SELECT COUNT(*) FROM scan_port_states").fetchone() == (0,)
+    assert connection.execute("SELECT COUNT(*) FROM scan_checkpoints").fetchone() == (0,)
+
+
+def test_deleting_a_run_cascades_to_its_rows(db):
+    insert_scan_results(db, "a", _rows(10), timestamp="t1", compact=True)
+    from TriNetra.database import get_connection
+
+    with get_connection(db) as connection:
+        connection.execute("DELETE FROM scan_runs")
+
+    connection = sqlite3.connect(db)
+    assert connection.execute("SELECT COUNT(*) FROM scan_results").fetchone() == (0,)
+    assert connection.execute("SELECT COUNT(*) FROM scan_port_states").fetchone() == (0,)
+
+
+def test_freed_pages_are_reclaimed(db):
+    insert_scan_results(db, "old", _rows(20000), timestamp=_ago(40))
+
+    report = prune_scans(db, detail_days=30, now=NOW)
+
+    connection = sqlite3.connect(db)
+    assert report.pages_freed > 0
+    assert connection.execute("PRAGMA freelist_count").fetchone() == (0,)
+
+
+def test_older_databases_can_be_switched_to_incremental_vacuum(tmp_path):
+    path = str(tmp_path / "old.db")
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE unrelated (x)")
+    connection.commit()
+    connection.close()
+    initialize_database(path)
+
+    assert enable_incremental_vacuum(path) is True
+    assert enable_incremental_vacuum(path) is False
+    assert sqlite3.connect(path).execute("PRAGMA auto_vacuum").fetchone() == (2,)
+
+
+@pytest.mark.parametrize("detail_days, delete_days", [(-1, None), (30, -1), (30, 10)])
+def test_invalid_periods_are_rejected(db, detail_days, delete_days):
+    with pytest.raises(ValueError):
+        prune_scans(db, detail_days=detail_days, delete_days=delete_days, now=NOW)
@@ -0,0 +1,89 @@
+import os
+import socket
+import sys
+import threading
+
+import pytest
+
+from TriNetra.scanner import scan_hosts_iter, scan_ports, scan_ports_iter
+
+
+def test_bad_arguments_raise_when_the_iterator_is_created():
+    with pytest.raises(ValueError):
+        scan_ports_iter("127.0.0.1", [80], engine="warp")
+    with pytest.raises(ValueError):
+        scan_hosts_iter(["127.0.0.1"], [0])
+
+
+def test_ports_that_are_not_open_report_an_unknown_service():
+    with socket.socket() as listener, socket.socket() as reserved:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(8)
+        reserved.bind(("127.0.0.1", 0))
+        open_port = listener.getsockname()[1]
+        closed_port = reserved.getsockname()[1]
+        reserved.close()
+
+        results = scan_ports("127.0.0.1", [open_port, closed_port, 22], timeout=0.5, engine="thread", retry_count=0)
+
+    assert results[0][2] == "OPEN"
+    assert all(service == "Unknown" for _, service, status in results if status != "OPEN")
+
+
+@pytest.mark.skipif(
+    not sys.platform.startswith("linux") or os.geteuid() != 0 or not socket.has_ipv6,
+    reason="the raw SYN engine needs root on Linux",
+)
+def test_ipv6_hosts_do_not_take_ipv4_hosts_off_the_syn_engine(monkeypatch):
+    from TriNetra import rawsyn
+
+    syn_hosts = []
+    real_scan = rawsyn.raw_syn_scan
+
+    def recording_scan(host, *args, **kwargs):
+        syn_hosts.append(host)
+        return real_scan(host, *args, **kwargs)
+
+    monkeypatch.setattr(rawsyn, "raw_syn_scan", recording_scan)
+    with socket.socket(socket.AF_INET6) as reserved:
+        reserved.bind(("::1", 0))
+        port = reserved.getsockname()[1]
+
+    results = sorted(scan_hosts_iter(["127.0.0.1", "::1"], [port], 0.5, engine="rawsyn", retry_count=0))
+    assert syn_hosts == ["127.0.0.1"]
+    assert [(host, status) for host, _, _, status in results] == [("127.0.0.1", "CLOSED"), ("::1", "CLOSED")]
+
+
+def _connect_probe_host():
+    # As root, IPv4 hosts get SYN probes on the thread engine; IPv6 stays on connect().
+    return "::1" if os.geteuid() == 0 and socket.has_ipv6 else "127.0.0.1"
+
+
+@pytest.mark.parametrize("engine", ["thread", "async"])
+def test_an_open_port_is_probed_and_identified_over_one_connection(engine):
+    host = _connect_probe_host() if engine == "thread" else "127.0.0.1"
+    listener = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+    listener.bind((host, 0))
+    listener.listen(8)
+    port = listener.getsockname()[1]
+    accepted = []
+
+    def serve():
+        while True:
+            try:
+                connection, _ = listener.accept()
+            except OSError:
+                return
+            accepted.append(connection)
+            connection.sendall(b"SSH-2.0-OpenSSH_9.6\r\n")
+
+    threading.Thread(target=serve, daemon=True).start()
+    try:
+        results = list(scan_hosts_iter([host], [port], timeout=1.0, engine=engine, versions=True))
+    finally:
+        listener.close()
+        for connection in accepted:
+            connection.close()
+
+    assert results == [(host, port, "SSH", "OpenSSH 9.6", "OPEN")]
+    assert len(accepted) == 1
@@ -0,0 +1,60 @@
+import socket
+import sys
+
+import pytest
+
+from TriNetra.portspec import PortSpec
+from TriNetra.sharding import plan_shards, scan_sharded
+
+
+def test_many_hosts_are_dealt_round_robin_with_every_port():
+    shards = plan_shards(["a", "b", "c", "d", "e"], [22, 80], 2)
+
+    assert [shard.hosts for shard in shards] == [["a", "c", "e"], ["b", "d"]]
+    assert all(shard.ports == [22, 80] for shard in shards)
+
+
+def test_few_hosts_have_their_ports_cut_into_consecutive_chunks():
+    shards = plan_shards(["a"], list(range(1, 11)), 3)
+
+    assert [shard.hosts for shard in shards] == [["a"]] * 3
+    assert [list(shard.ports) for shard in shards] == [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10]]
+
+
+def test_port_spec_chunks_stay_port_specs_and_cover_every_port():
+    ports = PortSpec.parse("1-1000,8080")
+    shards = plan_shards(["a", "b"], ports, 4)
+
+    assert len(shards) == 4
+    assert all(isinstance(shard.ports, PortSpec) for shard in shards)
+    for host in ("a", "b"):
+        covered = [port for shard in shards if shard.hosts == [host] for port in shard.ports]
+        assert covered == list(ports)
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="uses 127.0.0.2 on the loopback interface")
+def test_sharded_results_merge_back_in_input_order():
+    with socket.socket() as listener, socket.socket() as reserved:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(8)
+        reserved.bind(("127.0.0.1", 0))
+        open_port = listener.getsockname()[1]
+        closed_port = reserved.getsockname()[1]
+        reserved.close()
+
+        scan = scan_sharded(
+            ["127.0.0.1", "127.0.0.2"],
+            [closed_port, open_port],
+            processes=2,
+            timeout=0.5,
+            engine="thread",
+            retry_count=0,
+        )
+
+    assert [(host, port, status) for host, port, _, status in scan.results] == [
+        ("127.0.0.1", closed_port, "CLOSED"),
+        ("127.0.0.1", open_port, "OPEN"),
+        ("127.0.0.2", closed_port, "CLOSED"),
+        ("127.0.0.2", open_port, "CLOSED"),
+    ]
+    assert scan.status_counts == {"CLOSED": 3, "OPEN": 1}
@@ -0,0 +1,31 @@
+import pytest
+
+from TriNetra import targets
+from TriNetra.targets import ScanTarget, parse_targets
+
+
+class _FakeResolver:
+    def resolve_many(self, names):
+        return {name: ["127.0.0.1", "::1"] for name in names}
+
+
+@pytest.fixture(autouse=True)
+def dual_stack_names(monkeypatch):
+    monkeypatch.setattr(targets, "default_resolver", _FakeResolver)
+
+
+def test_a_hostname_is_one_target_at_its_ipv4_address():
+    assert parse_targets("dual.example") == [ScanTarget("dual.example", "127.0.0.1")]
+
+
+def test_every_address_is_scanned_only_on_request():
+    assert parse_targets("dual.example", all_addresses=True) == [
+        ScanTarget("dual.example (127.0.0.1)", "127.0.0.1"),
+        ScanTarget("dual.example (::1)", "::1"),
+    ]
+
+
+def test_patterns_expand_without_dns():
+    assert [target.address for target in parse_targets("10.0.0.1-3, 10.0.0.8/31")] == [
+        "10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.8", "10.0.0.9",
+    ]
@@ -0,0 +1,41 @@
+import os
+import socket
+import sys
+
+import pytest
+
+from TriNetra.scanner import scan_port
+from TriNetra.timing import RttEstimator
+
+
+@pytest.mark.parametrize("initial, minimum", [(0, 0.1), (-1, 0.1), (0.5, 0)])
+def test_timeouts_must_be_positive(initial, minimum):
+    with pytest.raises(ValueError):
+        RttEstimator(initial, min_timeout=minimum)
+
+
+def test_timeout_follows_samples_within_bounds():
+    rtt = RttEstimator(0.5, min_timeout=0.1, max_timeout=2.0)
+    assert rtt.timeout() == 0.5
+    for _ in range(20):
+        rtt.update(0.001)
+    assert rtt.timeout() == 0.1
+    for _ in range(20):
+        rtt.update(5.0)
+    assert rtt.timeout() == 2.0
+
+
+@pytest.mark.skipif(
+    not sys.platform.startswith("linux") or os.geteuid() != 0,
+    reason="the SYN probe path needs root on Linux",
+)
+def test_syn_probes_sample_the_reply_delay_not_the_call():
+    rtt = RttEstimator(0.5)
+    with socket.socket() as reserved:
+        reserved.bind(("127.0.0.1", 0))
+        port = reserved.getsockname()[1]
+
+    for _ in range(5):
+        assert scan_port("127.0.0.1", port, 0.5, retry_count=0, rtt=rtt) == "CLOSED"
+    assert rtt.samples == 5
+    assert rtt.timeout() <= 0.5
@@ -0,0 +1,35 @@
+import pytest
+
+from TriNetra.topports import MAX_TOP_PORTS, order_by_likelihood, select_ports, top_ports
+
+
+def test_top_ports_starts_with_the_most_common():
+    assert top_ports(3) == [80, 23, 443]
+
+
+def test_top_ports_accepts_the_whole_ranked_table():
+    ports = top_ports(MAX_TOP_PORTS)
+    assert len(ports) == MAX_TOP_PORTS
+    assert len(set(ports)) == MAX_TOP_PORTS
+
+
+@pytest.mark.parametrize("count", [0, MAX_TOP_PORTS + 1, 1000])
+def test_top_ports_rejects_counts_outside_the_ranked_table(count):
+    with pytest.raises(ValueError, match="Top ports must be between"):
+        top_ports(count)
+
+
+def test_select_ports_keeps_ranked_ports_inside_the_range():
+    assert select_ports("1-100", 3) == [80, 23, 21]
+    assert len(select_ports("1-30", MAX_TOP_PORTS)) < MAX_TOP_PORTS
+
+
+def test_select_ports_rejects_too_many_or_unranked_ranges():
+    with pytest.raises(ValueError):
+        select_ports("1-1024", MAX_TOP_PORTS + 1)
+    with pytest.raises(ValueError, match="ranked"):
+        select_ports("65000-65001", 5)
+
+
+def test_order_by_likelihood_puts_ranked_ports_first():
+    assert order_by_likelihood([65000, 443, 80])[:2] == [80, 443]
@@ -0,0 +1,41 @@
+import sqlite3
+
+import pytest
+
+from TriNetra.database import fetch_scan_rows, initialize_database
+from TriNetra.writer import ResultWriter
+
+STARTED = "2026-01-01T00:00:00+00:00"
+
+
+def test_rows_are_written_in_batches_and_runs_finished(tmp_path):
+    db = str(tmp_path / "scans.db")
+    initialize_database(db)
+    commits = []
+
+    with ResultWriter(db, STARTED, batch_rows=10, on_commit=commits.append) as writer:
+        for port in range(1, 26):
+            writer.put(("host", port, "svc", "", "OPEN"))
+        writer.flush()
+        assert len(fetch_scan_rows(db, ["host"], STARTED)) == 25
+
+    assert sum(commits) == writer.saved_rows == 25
+    assert sqlite3.connect(db).execute("SELECT finished_at IS NOT NULL FROM scan_runs").fetchone() == (1,)
+
+
+def test_a_database_error_is_raised_on_close(tmp_path):
+    # No initialize_database(), so the first insert fails on the writer thread.
+    writer = ResultWriter(str(tmp_path / "scans.db"), STARTED)
+    writer.put(("host", 80, "http", "", "OPEN"))
+
+    with pytest.raises(sqlite3.OperationalError):
+        writer.close()
+
+
+def test_a_database_error_is_chained_onto_the_exception_in_flight(tmp_path):
+    with pytest.raises(KeyboardInterrupt) as raised:
+        with ResultWriter(str(tmp_path / "scans.db"), STARTED) as writer:
+            writer.put(("host", 80, "http", "", "OPEN"))
+            raise KeyboardInterrupt
+
+    assert isinstance(raised.value.__context__, sqlite3.OperationalError)
@@ -18,6 +18,13 @@ def env_list(key: str, default: str) -> list[str]:
     return [item.strip() for item in raw_value.split(",") if item.strip()]
 
 
+def env_float(key: str, default: float | None) -> float | None:
+    raw_value = os.getenv(key)
+    if raw_value is None or not raw_value.strip():
+        return default
+    return float(raw_value)
+
+
 SECRET_KEY = os.getenv("SECRET_KEY", "django-insecure-change-me-for-production")
 DEBUG = env_bool("DEBUG", True)  # ⚠️ WARN: Must be False in production! Set DEBUG=false on Render/Heroku/PythonAnywhere
 ALLOWED_HOSTS: list[str] = env_list("ALLOWED_HOSTS", "127.0.0.1,localhost,testserver")
@@ -89,9 +96,29 @@ else:
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": default_sqlite_path,
+            "CONN_MAX_AGE": 600,
+            # Same settings as TriNetra.database: WAL so history pages can be
+            # read while a scan writes, and a busy timeout instead of
+            # "database is locked" errors between gunicorn workers.
+            "OPTIONS": {
+                "init_command": "PRAGMA auto_vacuum=INCREMENTAL; PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;",
+                "timeout": 10,
+                "transaction_mode": "IMMEDIATE",
+            },
         }
     }
 
+# Store CLOSED/FILTERED ports of web scans as a 2-bit-per-port bitmap per
+# run instead of one row each (the CLI equivalent is --compact).
+TRINETRA_COMPACT_STORAGE = env_bool("TRINETRA_COMPACT_STORAGE", False)
+
+# Scan history retention, applied by `manage.py prune_scans`: runs keep
+# every port for TRINETRA_DETAIL_DAYS, then only their open ports and
+# per-status counts; runs older than TRINETRA_RETENTION_DAYS (if set)
+# are deleted.
+TRINETRA_DETAIL_DAYS = env_float("TRINETRA_DETAIL_DAYS", 30.0)
+TRINETRA_RETENTION_DAYS = env_float("TRINETRA_RETENTION_DAYS", None)
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},